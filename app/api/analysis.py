@@ -5,9 +5,9 @@ import logging
 
 from app.models.database import get_database
 from app.api.users import get_current_user
+from app.core.metrics import snapshot_all
+from app.services.parser.document_store import document_store
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
@@ -95,7 +95,7 @@ async def get_analysis(
         "id": analysis["resume_id"],
         "candidate_name": resume["candidate_name"] if resume else "未知",
         "position": resume["position"] if resume else "未知",
-        "content": resume["content"] if resume else ""
+        "content": await document_store.load_content(db, resume) if resume else ""
     }
     
     return {
@@ -158,4 +158,13 @@ async def get_analysis_summary(
         "matched_resumes": matched_resumes,
         "match_rate": matched_resumes / total_analyses if total_analyses > 0 else 0,
         "position_statistics": position_stats
-    } 
\ No newline at end of file
+    } 
+
+@router.get("/statistics/counters", response_model=Dict[str, Any])
+async def get_runtime_counters(
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    获取运行时统计计数（如分析结果缓存命中/未命中次数）
+    """
+    return await snapshot_all()
\ No newline at end of file
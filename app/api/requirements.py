@@ -1,14 +1,14 @@
 from fastapi import APIRouter, HTTPException, Depends, Body
 from typing import Dict, Any, List, Optional
 from datetime import datetime
+import asyncio
 from bson.objectid import ObjectId
 import logging
 
 from app.models.database import get_database
-from app.schemas.requirements import RequirementCreate, RequirementResponse, RequirementUpdate
+from app.schemas.requirements import RequirementCreate, RequirementResponse, RequirementUpdate, ScreeningRequest, ScreeningJobResponse
+from app.services.analyzer.bulk_screening import bulk_screening_service
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
@@ -35,6 +35,7 @@ async def create_requirement(
         "skills": requirement.skills,
         "description": requirement.description,
         "user_id": requirement.user_id,
+        "version": 1,
         "created_at": datetime.now(),
         "updated_at": datetime.now(),
     }
@@ -48,6 +49,7 @@ async def create_requirement(
     return {
         "id": requirement_id,
         **requirement.dict(),
+        "version": 1,
         "created_at": requirement_data["created_at"],
         "updated_at": requirement_data["updated_at"],
     }
@@ -85,6 +87,7 @@ async def list_requirements(
             "skills": req["skills"],
             "description": req["description"],
             "user_id": req["user_id"],
+            "version": req.get("version", 1),
             "created_at": req["created_at"],
             "updated_at": req["updated_at"],
         })
@@ -111,6 +114,7 @@ async def get_requirement(
         "skills": requirement["skills"],
         "description": requirement["description"],
         "user_id": requirement["user_id"],
+        "version": requirement.get("version", 1),
         "created_at": requirement["created_at"],
         "updated_at": requirement["updated_at"],
     }
@@ -133,11 +137,11 @@ async def update_requirement(
     update_data = requirement.dict(exclude_unset=True)
     update_data["updated_at"] = datetime.now()
     
-    # 更新数据库
+    # 更新数据库（递增版本号，按职位要求版本去重的分析结果随之失效）
     try:
         await db["requirements"].update_one(
             {"_id": requirement_id},
-            {"$set": update_data}
+            {"$set": update_data, "$inc": {"version": 1}}
         )
     except Exception as e:
         logger.error(f"更新职位要求失败: {e}")
@@ -154,6 +158,7 @@ async def update_requirement(
         "skills": updated_requirement["skills"],
         "description": updated_requirement["description"],
         "user_id": updated_requirement["user_id"],
+        "version": updated_requirement.get("version", 1),
         "created_at": updated_requirement["created_at"],
         "updated_at": updated_requirement["updated_at"],
     }
@@ -178,4 +183,63 @@ async def delete_requirement(
         logger.error(f"删除职位要求失败: {e}")
         raise HTTPException(status_code=500, detail=f"删除职位要求失败: {str(e)}")
     
-    return {"message": "职位要求已删除"} 
\ No newline at end of file
+    return {"message": "职位要求已删除"} 
+
+@router.post("/{requirement_id}/screen", response_model=ScreeningJobResponse, status_code=202)
+async def screen_resumes(
+    requirement_id: str,
+    screening_request: ScreeningRequest,
+    db = Depends(get_database)
+):
+    """
+    使用职位要求批量筛选简历，立即返回任务ID，分析由Celery worker分组并发执行
+    """
+    requirement = await db["requirements"].find_one({"_id": requirement_id})
+    if not requirement:
+        raise HTTPException(status_code=404, detail="职位要求不存在")
+    
+    resume_query = bulk_screening_service.build_resume_query(
+        resume_ids=screening_request.resume_ids,
+        position=screening_request.position,
+        status=screening_request.status,
+        uploaded_from=screening_request.uploaded_from,
+        uploaded_to=screening_request.uploaded_to,
+        education=screening_request.education,
+        min_experience_years=screening_request.min_experience_years,
+        skills=screening_request.skills
+    )
+    if not resume_query:
+        raise HTTPException(status_code=400, detail="请指定简历ID列表或筛选条件")
+    
+    try:
+        job = await bulk_screening_service.create_job(
+            db,
+            requirement=requirement,
+            user_id=screening_request.user_id or requirement["user_id"],
+            resume_query=resume_query,
+            concurrency=screening_request.concurrency
+        )
+    except Exception as e:
+        logger.error(f"创建批量筛选任务失败: {e}")
+        raise HTTPException(status_code=500, detail=f"创建批量筛选任务失败: {str(e)}")
+    
+    if job["chunks"]:
+        from app.tasks.resume_tasks import start_screening_job
+        await asyncio.to_thread(start_screening_job, job)
+    
+    return await bulk_screening_service.get_progress(db, job["_id"])
+
+@router.get("/{requirement_id}/screen/{job_id}", response_model=ScreeningJobResponse)
+async def get_screening_progress(
+    requirement_id: str,
+    job_id: str,
+    db = Depends(get_database)
+):
+    """
+    获取批量筛选任务进度
+    """
+    progress = await bulk_screening_service.get_progress(db, job_id)
+    if not progress or progress["requirement_id"] != requirement_id:
+        raise HTTPException(status_code=404, detail="批量筛选任务不存在")
+    
+    return progress
\ No newline at end of file
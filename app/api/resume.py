@@ -1,17 +1,27 @@
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, Form, BackgroundTasks, Query
 from fastapi.responses import JSONResponse
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Literal
 import uuid
+import asyncio
 from datetime import datetime
 import os
 from bson.objectid import ObjectId
 
 from app.services.parser.resume_parser import default_parser
-from app.services.analyzer.resume_analyzer import default_analyzer
+from app.services.parser.document_store import document_store
+from app.services.parser.bulk_ingest import bulk_ingest_service
+from app.services.parser.direct_upload import direct_upload_service
+from app.services.parser.field_extractor import resume_fields, stored_fields, build_field_query
+from app.services.analyzer.resume_analyzer import get_default_analyzer
+from app.services.analyzer.rate_limiter import LLMUnavailableError
+from app.services.analyzer.idempotency import SYNC_OWNER_PREFIX, analysis_idempotency_key, analysis_deduplicator
 from app.services.notifier.notification_service import notification_service
 from app.core.config import settings
 from app.models.database import get_database
-from app.schemas.resume import ResumeCreate, ResumeResponse, ResumeAnalysisRequest
+from app.schemas.resume import (
+    ResumeCreate, ResumeResponse, ResumeAnalysisRequest,
+    UploadUrlRequest, UploadUrlResponse, UploadStatusResponse
+)
 
 router = APIRouter(
     prefix="/api/v1/resumes",
@@ -35,31 +45,50 @@ async def upload_resume(
     if file_ext[1:] not in settings.ALLOWED_EXTENSIONS:
         raise HTTPException(status_code=400, detail=f"不支持的文件格式: {file_ext}")
     
-    # 保存文件
+    # 流式保存文件，超过大小限制时返回413
     try:
-        file_path = await default_parser.save_upload_file(file)
+        saved_file = await default_parser.save_upload_file(file)
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"保存文件失败: {str(e)}")
+    storage_key = saved_file["key"]
+    file_hash = saved_file["sha256"]
     
-    # 解析简历
-    try:
-        parsed_resume = default_parser.parse_resume(file_path)
-    except Exception as e:
-        # 清理文件
-        if os.path.exists(file_path):
-            os.remove(file_path)
-        raise HTTPException(status_code=500, detail=f"解析简历失败: {str(e)}")
+    async def remove_new_file():
+        # 只清理本次新保存的文件，已有文件可能被其他简历引用
+        if saved_file["created"]:
+            await asyncio.to_thread(default_parser.storage.delete, storage_key)
     
-    # 准备存储数据
+    # 相同文件已经解析过时直接复用解析结果，否则在解析进程池中解析
+    parsed_document = await document_store.get(db, file_hash)
+    if parsed_document is None:
+        try:
+            parsed_resume = await default_parser.parse_resume_async(storage_key)
+            parsed_document = await document_store.save(db, file_hash, parsed_resume, saved_file["size"])
+        except HTTPException:
+            await remove_new_file()
+            raise
+        except Exception as e:
+            await remove_new_file()
+            raise HTTPException(status_code=500, detail=f"解析简历失败: {str(e)}")
+    
+    # 准备存储数据，简历内容通过document_id引用共享的解析结果
     resume_id = str(ObjectId())
     resume_data = {
         "_id": resume_id,
         "candidate_name": candidate_name,
         "position": position,
-        "file_path": file_path,
+        # 文件通过存储后端读取（见STORAGE_BACKEND），任何节点都可以重新解析
+        "storage_key": storage_key,
+        "storage_backend": default_parser.storage.name,
         "file_name": file.filename,
         "file_type": file_ext[1:],
-        "content": parsed_resume["content"],
+        "file_size": saved_file["size"],
+        "file_hash": file_hash,
+        "document_id": parsed_document["_id"],
+        # 解析时提取的学历、工作年限、技能和联系方式，用于在分析前直接在数据库中筛选
+        **resume_fields(parsed_document),
         "uploaded_at": datetime.now(),
         "status": "pending",  # pending, analyzed, matched
     }
@@ -68,9 +97,6 @@ async def upload_resume(
     try:
         await db["resumes"].insert_one(resume_data)
     except Exception as e:
-        # 清理文件
-        if os.path.exists(file_path):
-            os.remove(file_path)
         raise HTTPException(status_code=500, detail=f"保存简历数据失败: {str(e)}")
     
     # 响应结果
@@ -84,39 +110,200 @@ async def upload_resume(
         "message": "简历上传成功，等待分析"
     }
 
+@router.post("/bulk-upload", response_model=Dict[str, Any])
+async def bulk_upload_resumes(
+    file: UploadFile = File(...),
+    position: str = Form(...),
+    requirement_id: Optional[str] = Form(None),
+    user_id: Optional[str] = Form(None),
+    db = Depends(get_database)
+):
+    """
+    批量上传ZIP压缩包中的简历，返回每个文件的导入结果；
+    指定requirement_id时为导入成功的简历提交分析任务
+    """
+    if os.path.splitext(file.filename)[1].lower() != ".zip":
+        raise HTTPException(status_code=400, detail="只支持ZIP格式的压缩包")
+
+    requirement = None
+    if requirement_id:
+        requirement = await db["requirements"].find_one({"_id": requirement_id})
+        if not requirement:
+            raise HTTPException(status_code=404, detail="找不到指定的职位要求")
+
+    # 压缩包只在导入期间使用，写入本地临时文件，导入后删除
+    spooled_archive = await default_parser.spool_upload_file(file, max_size=settings.BULK_UPLOAD_MAX_SIZE)
+    try:
+        return await bulk_ingest_service.ingest_zip(
+            db,
+            spooled_archive["path"],
+            position,
+            requirement=requirement,
+            user_id=user_id
+        )
+    finally:
+        if os.path.exists(spooled_archive["path"]):
+            os.remove(spooled_archive["path"])
+
+@router.post("/upload-url", response_model=UploadUrlResponse)
+async def create_upload_url(
+    request: UploadUrlRequest,
+    db = Depends(get_database)
+):
+    """
+    申请直传地址：客户端用返回的预签名地址把文件直接PUT到对象存储，
+    上传完成后调用 /uploads/{upload_id}/complete，文件内容不经过API服务器
+    """
+    return await direct_upload_service.create_upload(
+        db,
+        file_name=request.file_name,
+        candidate_name=request.candidate_name,
+        position=request.position,
+        size=request.size,
+        content_type=request.content_type,
+        user_id=request.user_id
+    )
+
+@router.post("/uploads/{upload_id}/complete", response_model=UploadStatusResponse, status_code=202)
+async def complete_direct_upload(
+    upload_id: str,
+    db = Depends(get_database)
+):
+    """确认直传完成，提交后台解析任务；解析结果通过 GET /uploads/{upload_id} 查询"""
+    return await direct_upload_service.complete_upload(db, upload_id)
+
+@router.get("/uploads/{upload_id}", response_model=UploadStatusResponse)
+async def get_direct_upload(
+    upload_id: str,
+    db = Depends(get_database)
+):
+    """查询直传上传的处理状态，完成后返回简历ID"""
+    status = await direct_upload_service.get_status(db, upload_id)
+    if status is None:
+        raise HTTPException(status_code=404, detail="找不到指定的上传记录")
+    return status
+
 @router.post("/{resume_id}/analyze", response_model=Dict[str, Any])
 async def analyze_resume(
     resume_id: str,
     analysis_request: ResumeAnalysisRequest,
+    stream: bool = Query(False, description="是否通过WebSocket推送分析进度（analysis_progress消息）"),
+    mode: Literal["sync", "async"] = Query("sync", description="sync: 等待分析完成；async: 提交后台任务，立即返回任务ID"),
     db = Depends(get_database)
 ):
     """
     根据特定要求分析简历
+
+    mode=async时提交Celery分析流水线并返回202，通过 GET /api/v1/tasks/{task_id} 查询进度和分析结果ID；
+    同一简历和同一版本的职位要求已有分析结果时直接返回该结果，不重复分析
     """
     # 查找简历
     resume = await db["resumes"].find_one({"_id": resume_id})
     if not resume:
         raise HTTPException(status_code=404, detail="找不到指定的简历")
     
-    # 分析简历
-    try:
-        analysis_result = await default_analyzer.analyze_resume(
-            resume_content=resume["content"],
-            requirements=analysis_request.requirements.dict()
+    requirements = analysis_request.requirements.dict()
+    if requirements.get("id") and requirements.get("version") is None:
+        # 引用已保存的职位要求时按当前版本去重，职位要求修改后会重新分析
+        saved = await db["requirements"].find_one({"_id": requirements["id"]}, {"version": 1})
+        requirements["version"] = saved.get("version", 1) if saved else 1
+    idempotency_key = analysis_idempotency_key(resume_id, requirements)
+    
+    existing = await analysis_deduplicator.find_existing(db, idempotency_key)
+    if existing is not None:
+        await analysis_deduplicator.stats.incr("existing_results")
+        return _deduplicated_response(resume, existing)
+    
+    if mode == "async":
+        if stream:
+            raise HTTPException(status_code=400, detail="异步模式不支持stream参数")
+        from app.tasks.resume_tasks import enqueue_resume_analysis
+        task_id = await asyncio.to_thread(
+            enqueue_resume_analysis,
+            resume_id,
+            requirements,
+            analysis_request.user_id
+        )
+        if task_id.startswith(SYNC_OWNER_PREFIX):
+            # 相同的分析正在一个同步请求中执行，没有可查询的任务，等待它的结果
+            existing = await analysis_deduplicator.wait_for_result(db, idempotency_key, settings.ANALYSIS_CLAIM_WAIT)
+            if existing is None:
+                raise HTTPException(status_code=409, detail="相同的分析正在进行中，请稍后重试")
+            await analysis_deduplicator.stats.incr("waited_results")
+            return _deduplicated_response(resume, existing)
+        return JSONResponse(
+            status_code=202,
+            content={
+                "resume_id": resume_id,
+                "task_id": task_id,
+                "status_url": f"/api/v1/tasks/{task_id}",
+                "message": "分析任务已提交"
+            }
         )
-    except Exception as e:
-        raise HTTPException(status_code=500, detail=f"分析简历失败: {str(e)}")
     
-    # 将分析结果保存到数据库
-    analysis_data = {
-        "resume_id": resume_id,
-        "requirements": analysis_request.requirements.dict(),
-        "result": analysis_result.dict(),
-        "user_id": analysis_request.user_id,
-        "created_at": datetime.now()
-    }
+    # 流式模式下，每个字段解析完成后立即推送给用户
+    progress_callback = None
+    if stream:
+        async def progress_callback(event: Dict[str, Any]):
+            await notification_service.connection_manager.send_personal_message(
+                {
+                    "type": "analysis_progress",
+                    "resume_id": resume_id,
+                    **event,
+                    "timestamp": datetime.now().isoformat()
+                },
+                analysis_request.user_id
+            )
+    
+    # 认领幂等键后再调用LLM：相同的并发请求等待第一个请求的结果，不重复调用LLM
+    claim_owner = f"{SYNC_OWNER_PREFIX}{uuid.uuid4()}"
+    while True:
+        owner = await asyncio.to_thread(analysis_deduplicator.claim, idempotency_key, claim_owner)
+        if owner is None:
+            break
+        existing = await analysis_deduplicator.wait_for_result(db, idempotency_key, settings.ANALYSIS_CLAIM_WAIT)
+        if existing is not None:
+            await analysis_deduplicator.stats.incr("waited_results")
+            return _deduplicated_response(resume, existing)
+        if await asyncio.to_thread(analysis_deduplicator.owner, idempotency_key) is not None:
+            raise HTTPException(status_code=409, detail="相同的分析正在进行中，请稍后重试")
+        # 持有认领的请求或任务失败，由本请求重新分析
     
-    await db["analyses"].insert_one(analysis_data)
+    try:
+        # 分析简历
+        try:
+            analysis_result = await get_default_analyzer().analyze_resume(
+                resume_content=await document_store.load_content(db, resume),
+                requirements=requirements,
+                progress_callback=progress_callback,
+                fields=stored_fields(resume)
+            )
+        except LLMUnavailableError as e:
+            raise HTTPException(status_code=503, detail=f"AI服务繁忙，请稍后重试: {str(e)}")
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=f"分析简历失败: {str(e)}")
+        
+        if progress_callback is not None:
+            await progress_callback({"stage": "completed", "result": analysis_result.dict()})
+        
+        # 将分析结果保存到数据库
+        analysis_data = {
+            "_id": str(ObjectId()),
+            "resume_id": resume_id,
+            "requirements": requirements,
+            "result": analysis_result.dict(),
+            "user_id": analysis_request.user_id,
+            "created_at": datetime.now()
+        }
+        
+        analysis_id, created = await analysis_deduplicator.save(db, idempotency_key, analysis_data)
+    finally:
+        # 结果已保存或分析失败，释放认领；等待中的相同请求随后读到结果或重新认领
+        await asyncio.to_thread(analysis_deduplicator.release, idempotency_key, claim_owner)
+    
+    if not created:
+        # 认领过期后并发的相同请求先保存了结果，以它为准，不重复通知
+        return _deduplicated_response(resume, await db["analyses"].find_one({"_id": analysis_id}))
     
     # 更新简历状态
     update_data = {
@@ -160,24 +347,42 @@ async def analyze_resume(
     return {
         "resume_id": resume_id,
         "candidate_name": resume["candidate_name"],
+        "analysis_id": analysis_id,
         "analysis_result": analysis_result.dict(),
         "message": "简历分析完成"
     }
 
+def _deduplicated_response(resume: Dict[str, Any], analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """复用已有分析结果时的响应"""
+    return {
+        "resume_id": resume["_id"],
+        "candidate_name": resume["candidate_name"],
+        "analysis_id": analysis["_id"],
+        "analysis_result": analysis["result"],
+        "deduplicated": True,
+        "message": "已有相同的分析结果"
+    }
+
 @router.get("/", response_model=List[ResumeResponse])
 async def list_resumes(
     status: Optional[str] = None,
+    position: Optional[str] = None,
+    education: Optional[str] = Query(None, description="最低学历，如'本科'"),
+    min_experience_years: Optional[float] = Query(None, ge=0, description="最低工作年限"),
+    skill: Optional[List[str]] = Query(None, description="必须具备的技能，可重复指定"),
     limit: int = 20,
     skip: int = 0,
     db = Depends(get_database)
 ):
     """
-    获取简历列表
+    获取简历列表，可按解析时提取的学历、工作年限和技能筛选
     """
     # 构建查询条件
-    query = {}
+    query = build_field_query(education, min_experience_years, skill)
     if status:
         query["status"] = status
+    if position:
+        query["position"] = position
     
     # 查询数据库
     cursor = db["resumes"].find(query).skip(skip).limit(limit).sort("uploaded_at", -1)
@@ -194,7 +399,10 @@ async def list_resumes(
             "file_type": resume["file_type"],
             "uploaded_at": resume["uploaded_at"],
             "status": resume["status"],
-            "match_score": resume.get("match_score", None)
+            "match_score": resume.get("match_score", None),
+            "education_level": resume.get("education_level"),
+            "experience_years": resume.get("experience_years"),
+            "skills": resume.get("skills")
         })
     
     return result
@@ -227,7 +435,8 @@ async def get_resume(
         "file_type": resume["file_type"],
         "uploaded_at": resume["uploaded_at"],
         "status": resume["status"],
-        "content": resume["content"],
+        "content": await document_store.load_content(db, resume),
+        "fields": stored_fields(resume),
         "analysis_result": analysis["result"] if analysis else None
     }
     
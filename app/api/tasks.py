@@ -0,0 +1,92 @@
+from fastapi import APIRouter
+from typing import Dict, Any
+import asyncio
+import logging
+
+from celery.result import AsyncResult
+
+from app.core.celery_app import celery_app
+from app.core.fair_dispatch import fair_dispatcher
+from app.schemas.task import TaskStatusResponse
+from app.tasks.resume_tasks import ANALYSIS_STAGES, stage_task_id
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter(
+    prefix="/api/v1/tasks",
+    tags=["tasks"],
+    responses={404: {"description": "Not found"}},
+)
+
+# 结果中单独列出的字段，其余字段放在result中
+_SUMMARY_KEYS = ("resume_id", "analysis_id", "started_at", "duration_seconds", "error")
+
+def _read_result(task_id: str) -> Dict[str, Any]:
+    """读取单个任务的状态，info在STARTED状态下是任务写入的元数据，在SUCCESS状态下是返回值"""
+    result = AsyncResult(task_id, app=celery_app)
+    state = result.state
+    info = result.info
+    status = {
+        "task_id": task_id,
+        "state": state,
+        "ready": state in ("SUCCESS", "FAILURE", "REVOKED"),
+        "completed_at": result.date_done,
+    }
+
+    if state == "FAILURE" or isinstance(info, Exception):
+        status["error"] = str(info)
+    elif isinstance(info, dict):
+        status["started_at"] = info.get("started_at")
+        status["resume_id"] = info.get("resume_id")
+        if state == "SUCCESS":
+            status["analysis_id"] = info.get("analysis_id")
+            status["duration_seconds"] = info.get("duration_seconds")
+            status["error"] = info.get("error")
+            status["result"] = {key: value for key, value in info.items() if key not in _SUMMARY_KEYS}
+    return status
+
+def _read_pipeline_status(pipeline_id: str, first_stage: Dict[str, Any]) -> Dict[str, Any]:
+    """汇总分析流水线各阶段的状态：报告第一个未成功的阶段，全部成功时报告最终结果"""
+    status = {"task_id": pipeline_id, "started_at": first_stage.get("started_at"), "resume_id": first_stage.get("resume_id")}
+    current = first_stage
+    for stage in ANALYSIS_STAGES:
+        current = first_stage if stage == ANALYSIS_STAGES[0] else _read_result(stage_task_id(pipeline_id, stage))
+        status["stage"] = stage
+        if current["state"] != "SUCCESS":
+            break
+
+    if current["state"] == "SUCCESS":
+        status.update({key: current.get(key) for key in ("analysis_id", "duration_seconds", "result", "error", "completed_at")})
+    elif current["state"] in ("FAILURE", "REVOKED"):
+        status["error"] = current.get("error")
+    # 前一阶段已完成、下一阶段还在排队时，流水线整体仍处于执行中
+    state = current["state"]
+    if state == "PENDING":
+        state = "STARTED"
+    status.update(state=state, ready=state in ("SUCCESS", "FAILURE", "REVOKED"))
+    return status
+
+def _read_task_status(task_id: str) -> Dict[str, Any]:
+    """从Redis结果后端读取任务或分析流水线的状态（同步调用，在线程中执行）"""
+    first_stage = _read_result(stage_task_id(task_id, ANALYSIS_STAGES[0]))
+    if first_stage["state"] != "PENDING":
+        return _read_pipeline_status(task_id, first_stage)
+    return _read_result(task_id)
+
+@router.get("/queues", response_model=Dict[str, Any])
+async def get_queue_metrics():
+    """
+    各优先级通道的队列深度和等待时间：窗口大小、执行中和待提交的任务数、
+    最近任务从提交到开始执行的等待时间分位数，以及按租户（用户ID）的统计
+    """
+    return await asyncio.to_thread(fair_dispatcher.snapshot)
+
+@router.get("/{task_id}", response_model=TaskStatusResponse)
+async def get_task_status(task_id: str):
+    """
+    查询异步任务的状态、耗时和分析结果ID，task_id可以是分析流水线ID或单个任务ID
+
+    结果后端无法区分排队中的任务和不存在的任务，两者都返回PENDING；
+    任务结果在Redis中保留的时间由Celery的result_expires决定（默认1天）。
+    """
+    return await asyncio.to_thread(_read_task_status, task_id)
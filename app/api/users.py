@@ -14,8 +14,6 @@ from app.models.database import get_database
 from app.schemas.user import UserCreate, UserResponse, UserUpdate, Token
 from app.core.config import settings
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # 密码处理
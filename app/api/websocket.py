@@ -5,8 +5,6 @@ from app.api.users import get_current_user
 import logging
 import json
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 router = APIRouter(
@@ -1,20 +1,14 @@
 from celery import Celery
 import os
 from app.core.config import settings
+from app.core.redis_client import get_redis_url
+from app.core.logging_config import setup_logging
 import logging
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
+# 配置日志（整个进程只配置一次）
+setup_logging()
 logger = logging.getLogger(__name__)
 
-# 创建Redis URL，包含密码和DB选择
-def get_redis_url(db_number):
-    # 构建Redis URL，如果有密码则添加
-    if settings.REDIS_PASSWORD:
-        return f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{db_number}"
-    else:
-        return f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{db_number}"
-
 # 创建Celery实例
 try:
     celery_app = Celery(
@@ -36,16 +30,29 @@ try:
         timezone="Asia/Shanghai",
         enable_utc=False,
         task_track_started=True,
-        worker_prefetch_multiplier=1,  # 一次只处理一个任务，避免一个worker占用过多资源
+        worker_prefetch_multiplier=1,  # 每个执行线程只预取一个任务，并发度由执行池大小决定
         task_acks_late=True,  # 任务完成后再确认，这样如果worker中断任务会重新分配
+        result_extended=True,  # 结果中保存任务名称、参数和执行的worker，便于状态查询
+        # 启用Redis消息优先级（0最高），interactive通道的任务排在bulk和backfill之前
+        # 未指定优先级的任务（如直传解析）按最高优先级处理
+        broker_transport_options={"priority_steps": list(range(10)), "sep": ":"},
     )
 
     # 创建任务队列
     celery_app.conf.task_routes = {
+        # 分析流水线按阶段路由，各阶段的Worker独立扩缩容
+        "app.tasks.resume_tasks.prepare_analysis_task": {"queue": "parse"},
+        "app.tasks.resume_tasks.llm_analysis_task": {"queue": "llm"},
+        "app.tasks.resume_tasks.notify_analysis_task": {"queue": "notify"},
+        "app.tasks.resume_tasks.parse_uploaded_resume_task": {"queue": "parse"},
+        # 批量筛选的每组简历都要等待LLM响应
+        "app.tasks.resume_tasks.screen_chunk_task": {"queue": "llm"},
+        # 升级前提交的单任务分析
         "app.tasks.resume_tasks.analyze_resume_task": {"queue": "resume_analysis"},
     }
 
     # 配置任务默认过期时间（30分钟）
+    # threads池不支持这两个限制，此时由WorkerRuntime按WORKER_TASK_TIMEOUT取消超时的协程
     celery_app.conf.task_soft_time_limit = 1800
     celery_app.conf.task_time_limit = 1800
 
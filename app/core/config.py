@@ -1,4 +1,5 @@
 import os
+import json
 from pydantic_settings import BaseSettings
 from typing import Optional, Dict, Any, List
 
@@ -15,6 +16,7 @@ class Settings(BaseSettings):
     REDIS_PORT: int = int(os.getenv("REDIS_PORT", 6379))
     REDIS_PASSWORD: str = os.getenv("REDIS_PASSWORD", "")
     REDIS_DB: int = int(os.getenv("REDIS_DB", 0))  # 添加Redis数据库选择
+    REDIS_CACHE_DB: int = int(os.getenv("REDIS_CACHE_DB", int(os.getenv("REDIS_DB", 0)) + 2))  # 缓存和统计计数使用的数据库
     
     # AI提供商配置
     AI_PROVIDER: str = os.getenv("AI_PROVIDER", "openai")  # 默认使用OpenAI
@@ -27,6 +29,70 @@ class Settings(BaseSettings):
     ZHIPUAI_API_KEY: str = os.getenv("ZHIPUAI_API_KEY", "")
     ZHIPUAI_MODEL: str = os.getenv("ZHIPUAI_MODEL", "glm-4")
     
+    # LLM限流与故障转移配置
+    LLM_FAILOVER_ENABLED: bool = os.getenv("LLM_FAILOVER_ENABLED", "True").lower() == "true"  # 在openai和zhipuai之间故障转移
+    LLM_RPM_LIMITS: Dict[str, int] = json.loads(os.getenv("LLM_RPM_LIMITS", '{"openai": 500, "zhipuai": 300}'))  # 每分钟请求数上限
+    LLM_TPM_LIMITS: Dict[str, int] = json.loads(os.getenv("LLM_TPM_LIMITS", '{"openai": 300000, "zhipuai": 300000}'))  # 每分钟token数上限
+    LLM_INITIAL_CONCURRENCY: int = int(os.getenv("LLM_INITIAL_CONCURRENCY", 4))  # 每个进程的初始并发上限
+    LLM_MIN_CONCURRENCY: int = int(os.getenv("LLM_MIN_CONCURRENCY", 1))
+    LLM_MAX_CONCURRENCY: int = int(os.getenv("LLM_MAX_CONCURRENCY", 32))
+    LLM_TARGET_LATENCY: float = float(os.getenv("LLM_TARGET_LATENCY", 45.0))  # 目标延迟（秒），超过时降低并发
+    LLM_REQUEST_TIMEOUT: float = float(os.getenv("LLM_REQUEST_TIMEOUT", 120.0))  # 单次调用超时（秒）
+    LLM_COOLDOWN_SECONDS: int = int(os.getenv("LLM_COOLDOWN_SECONDS", 30))  # 收到429后暂停使用该提供商的时间（秒）
+    LLM_ACQUIRE_TIMEOUT: float = float(os.getenv("LLM_ACQUIRE_TIMEOUT", 60.0))  # 等待调用额度的最长时间（秒）
+    LLM_TASK_MAX_RETRIES: int = int(os.getenv("LLM_TASK_MAX_RETRIES", 3))  # Celery任务在提供商不可用时的重试次数
+    LLM_TASK_RETRY_DELAY: int = int(os.getenv("LLM_TASK_RETRY_DELAY", 60))  # 重试间隔（秒）
+    
+    # 分析结果缓存配置
+    ANALYSIS_CACHE_ENABLED: bool = os.getenv("ANALYSIS_CACHE_ENABLED", "True").lower() == "true"
+    ANALYSIS_CACHE_TTL: int = int(os.getenv("ANALYSIS_CACHE_TTL", 7 * 24 * 3600))  # Redis缓存过期时间（秒）
+    ANALYSIS_CACHE_MAX_SIZE: int = int(os.getenv("ANALYSIS_CACHE_MAX_SIZE", 1024))  # 进程内LRU缓存条目数
+    ANALYSIS_CLAIM_TTL: int = int(os.getenv("ANALYSIS_CLAIM_TTL", 3600))  # 同一简历和职位要求的分析任务去重时间窗口（秒）
+    ANALYSIS_CLAIM_WAIT: float = float(os.getenv("ANALYSIS_CLAIM_WAIT", 120))  # 同步分析请求等待相同的进行中分析的最长时间（秒）
+    
+    # 简历压缩配置（发送给LLM前按token预算压缩简历内容）
+    RESUME_COMPACTION_ENABLED: bool = os.getenv("RESUME_COMPACTION_ENABLED", "True").lower() == "true"
+    RESUME_TOKEN_BUDGET: int = int(os.getenv("RESUME_TOKEN_BUDGET", 6000))  # 默认简历token预算
+    # 按 "provider/model"、模型名或提供商配置的token预算，JSON格式
+    RESUME_TOKEN_BUDGETS: Dict[str, int] = json.loads(os.getenv(
+        "RESUME_TOKEN_BUDGETS",
+        '{"gpt-4": 4000, "gpt-3.5-turbo": 8000, "glm-4": 8000}'
+    ))
+    
+    # 批量分析配置（多份短简历打包到一次LLM调用）
+    ANALYSIS_BATCH_MAX_RESUMES: int = int(os.getenv("ANALYSIS_BATCH_MAX_RESUMES", 4))  # 一次调用最多打包的简历数
+    ANALYSIS_BATCH_TOKEN_BUDGET: int = int(os.getenv("ANALYSIS_BATCH_TOKEN_BUDGET", 6000))  # 一次调用中简历内容的token预算
+    ANALYSIS_BATCH_SHORT_RESUME_TOKENS: int = int(os.getenv("ANALYSIS_BATCH_SHORT_RESUME_TOKENS", 1500))  # 参与打包的短简历上限
+    
+    # 预筛选配置（规则评分低于阈值的简历不调用LLM）
+    PREFILTER_ENABLED: bool = os.getenv("PREFILTER_ENABLED", "True").lower() == "true"
+    PREFILTER_THRESHOLD: float = float(os.getenv("PREFILTER_THRESHOLD", 30.0))  # 规则评分阈值 (0-100)
+    
+    # 批量筛选配置
+    SCREENING_CONCURRENCY: int = int(os.getenv("SCREENING_CONCURRENCY", 5))  # 默认并发分析数量
+    SCREENING_MAX_CONCURRENCY: int = int(os.getenv("SCREENING_MAX_CONCURRENCY", 20))  # 单个任务允许的最大并发数
+    
+    # Celery Worker配置（任务在常驻事件循环中并发执行）
+    WORKER_POOL: str = os.getenv("WORKER_POOL", "threads")  # Worker执行池类型
+    WORKER_MAX_INFLIGHT: int = int(os.getenv("WORKER_MAX_INFLIGHT", 20))  # 每个Worker进程同时执行的分析任务数
+    WORKER_TASK_TIMEOUT: float = float(os.getenv("WORKER_TASK_TIMEOUT", 1800))  # 单个任务超时时间（秒）
+    # 分析流水线各阶段Worker的并发数（worker_start.py --stages）
+    WORKER_PARSE_CONCURRENCY: int = int(os.getenv("WORKER_PARSE_CONCURRENCY", 4))  # parse队列：预筛选、压缩和文件解析
+    WORKER_LLM_CONCURRENCY: int = int(os.getenv("WORKER_LLM_CONCURRENCY", 20))  # llm队列：等待LLM响应
+    WORKER_NOTIFY_CONCURRENCY: int = int(os.getenv("WORKER_NOTIFY_CONCURRENCY", 4))  # notify队列：邮件和WebSocket通知
+    # Worker自动扩缩容（worker_start.py --autoscale），按阶段配置进程数范围
+    AUTOSCALE_MIN_PROCESSES: Dict[str, int] = json.loads(os.getenv("AUTOSCALE_MIN_PROCESSES", '{"parse": 1, "llm": 1, "notify": 1}'))
+    AUTOSCALE_MAX_PROCESSES: Dict[str, int] = json.loads(os.getenv("AUTOSCALE_MAX_PROCESSES", '{"parse": 4, "llm": 8, "notify": 2}'))
+    AUTOSCALE_INTERVAL: float = float(os.getenv("AUTOSCALE_INTERVAL", 5.0))  # 检查队列长度的间隔（秒）
+    AUTOSCALE_SCALE_DOWN_DELAY: float = float(os.getenv("AUTOSCALE_SCALE_DOWN_DELAY", 120.0))  # 负载持续偏低多久后缩容（秒）
+    AUTOSCALE_SCALE_DOWN_RATIO: float = float(os.getenv("AUTOSCALE_SCALE_DOWN_RATIO", 0.5))  # 需求低于缩容后容量的该比例时才缩容
+    
+    # 分析任务的优先级通道和租户公平调度（interactive直接提交，bulk和backfill按租户加权轮转提交）
+    FAIR_DISPATCH_WINDOWS: Dict[str, int] = json.loads(os.getenv("FAIR_DISPATCH_WINDOWS", '{"bulk": 20, "backfill": 5}'))  # 各通道同时在Celery中排队和执行的任务数上限
+    FAIR_DISPATCH_QUANTUM: float = float(os.getenv("FAIR_DISPATCH_QUANTUM", 1))  # 每轮为权重为1的租户提交的任务数
+    FAIR_TENANT_WEIGHTS: Dict[str, float] = json.loads(os.getenv("FAIR_TENANT_WEIGHTS", "{}"))  # 租户（用户ID）权重，未配置的租户权重为1
+    FAIR_DISPATCH_LEASE: int = int(os.getenv("FAIR_DISPATCH_LEASE", 3600))  # 已提交任务占用名额的最长时间（秒），防止Worker崩溃后名额无法释放
+    
     # 邮件通知配置
     MAIL_SERVER: str = os.getenv("MAIL_SERVER", "")
     MAIL_PORT: int = int(os.getenv("MAIL_PORT", 587))
@@ -38,7 +104,36 @@ class Settings(BaseSettings):
     # 文件上传配置
     UPLOAD_DIR: str = os.getenv("UPLOAD_DIR", "uploads")
     MAX_UPLOAD_SIZE: int = int(os.getenv("MAX_UPLOAD_SIZE", 10 * 1024 * 1024))  # 10MB
+    UPLOAD_CHUNK_SIZE: int = int(os.getenv("UPLOAD_CHUNK_SIZE", 1024 * 1024))  # 流式保存上传文件的分块大小，1MB
     ALLOWED_EXTENSIONS: List[str] = ["pdf", "html", "txt", "docx"]
+    
+    # 上传文件存储后端: local（UPLOAD_DIR下按哈希分目录）, gridfs, s3（S3兼容存储，如MinIO，需要安装boto3）
+    STORAGE_BACKEND: str = os.getenv("STORAGE_BACKEND", "local")
+    GRIDFS_BUCKET: str = os.getenv("GRIDFS_BUCKET", "uploads")
+    S3_BUCKET: str = os.getenv("S3_BUCKET", "resumes")
+    S3_PREFIX: str = os.getenv("S3_PREFIX", "")
+    S3_ENDPOINT_URL: str = os.getenv("S3_ENDPOINT_URL", "")  # 如 http://localhost:9000 (MinIO)，为空时使用AWS
+    S3_ACCESS_KEY_ID: str = os.getenv("S3_ACCESS_KEY_ID", "")
+    S3_SECRET_ACCESS_KEY: str = os.getenv("S3_SECRET_ACCESS_KEY", "")
+    S3_REGION: str = os.getenv("S3_REGION", "")
+    # 客户端直传（预签名PUT）：上传地址有效期（秒）和对象键前缀，只有s3后端支持
+    PRESIGNED_UPLOAD_EXPIRES: int = int(os.getenv("PRESIGNED_UPLOAD_EXPIRES", 900))
+    DIRECT_UPLOAD_PREFIX: str = os.getenv("DIRECT_UPLOAD_PREFIX", "direct")
+    
+    # ZIP批量导入配置
+    BULK_UPLOAD_MAX_SIZE: int = int(os.getenv("BULK_UPLOAD_MAX_SIZE", 500 * 1024 * 1024))  # 压缩包大小上限，500MB
+    BULK_INGEST_BATCH_SIZE: int = int(os.getenv("BULK_INGEST_BATCH_SIZE", 500))  # 每批insert_many写入的简历数
+    BULK_INGEST_MAX_FILES: int = int(os.getenv("BULK_INGEST_MAX_FILES", 10000))  # 单个压缩包允许的最大文件数
+    
+    # 文档解析进程池配置（解析是CPU密集型操作，不在事件循环中执行）
+    PARSE_POOL_ENABLED: bool = os.getenv("PARSE_POOL_ENABLED", "True").lower() == "true"
+    PARSE_POOL_WORKERS: int = int(os.getenv("PARSE_POOL_WORKERS", 2))  # 解析进程数
+    PARSE_POOL_MAX_QUEUE: int = int(os.getenv("PARSE_POOL_MAX_QUEUE", 32))  # 所有进程都忙时允许排队的任务数
+    PARSE_POOL_MAX_TASKS_PER_CHILD: int = int(os.getenv("PARSE_POOL_MAX_TASKS_PER_CHILD", 100))  # 子进程执行多少个任务后被替换
+    PARSE_TIMEOUT: float = float(os.getenv("PARSE_TIMEOUT", 60.0))  # 单个文件解析超时时间（秒）
+    # PDF提取引擎的尝试顺序（pypdf2, pdfminer, pdfium），前一个引擎出错或提取不到文本时使用下一个
+    # 以逗号分隔的字符串保存：pydantic-settings会把环境变量中List类型的值当作JSON解析
+    PDF_ENGINES: str = os.getenv("PDF_ENGINES", "pypdf2,pdfminer")
 
     # 添加缺失的字段定义
     JWT_SECRET_KEY: str = os.getenv("JWT_SECRET_KEY", "your_jwt_secret_key_here")
@@ -47,6 +142,10 @@ class Settings(BaseSettings):
     
     LOG_LEVEL: str = os.getenv("LOG_LEVEL", "INFO")
     
+    # 启动预热：进程启动时预先建立LLM连接并加载tiktoken编码
+    WARM_UP_ON_STARTUP: bool = os.getenv("WARM_UP_ON_STARTUP", "True").lower() == "true"
+    WARM_UP_TIMEOUT: float = float(os.getenv("WARM_UP_TIMEOUT", 10.0))  # 预热超时时间（秒）
+    
     SERVER_HOST: str = os.getenv("SERVER_HOST", "0.0.0.0")
     SERVER_PORT: int = int(os.getenv("SERVER_PORT", 8000))
     DEBUG: bool = os.getenv("DEBUG", "False").lower() == "true"
@@ -58,6 +157,11 @@ class Settings(BaseSettings):
         "extra": "ignore"  # 允许额外的环境变量
     }
 
+    @property
+    def pdf_engine_order(self) -> List[str]:
+        """PDF提取引擎的尝试顺序"""
+        return [name.strip() for name in self.PDF_ENGINES.split(",") if name.strip()]
+
 settings = Settings()
 
 # 确保上传目录存在
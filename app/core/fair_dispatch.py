@@ -0,0 +1,286 @@
+import json
+import time
+import logging
+from typing import Any, Callable, Dict, List, Optional
+from app.core.config import settings
+from app.core.redis_client import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+# 分析任务的优先级通道
+LANES = ("interactive", "bulk", "backfill")
+# 各通道的Celery消息优先级（Redis传输中数字越小优先级越高）
+LANE_PRIORITIES = {"interactive": 0, "bulk": 3, "backfill": 6}
+# 未指定用户的任务归入的租户
+ANONYMOUS_TENANT = "anonymous"
+# 每个通道保留的最近等待时间样本数，用于计算分位数
+WAIT_SAMPLE_SIZE = 1000
+
+class FairDispatcher:
+    """
+    按租户加权公平地向Celery提交分析任务（Deficit Round Robin）
+
+    interactive通道的任务直接提交；bulk和backfill通道的任务先进入Redis中按租户划分的待提交队列，
+    再按租户轮转、每轮按权重累加额度的方式提交到Celery，每个通道同时在Celery中的任务数不超过窗口大小。
+    这样一个租户提交的上万份简历不会占满Celery队列，其他租户的任务和交互式分析不会排在它们后面。
+    有任务提交或完成时调用refill补充名额，状态全部保存在Redis中，API和所有Worker进程共享。
+    """
+
+    def __init__(
+        self,
+        windows: Optional[Dict[str, int]] = None,
+        quantum: float = 1.0,
+        weights: Optional[Dict[str, float]] = None,
+        lease_seconds: int = 3600,
+        key_prefix: str = "fair"
+    ):
+        """
+        初始化调度器
+
+        Args:
+            windows: 各通道同时在Celery中的任务数上限，未配置的通道不限流（直接提交）
+            quantum: 每轮为权重为1的租户累加的提交额度
+            weights: 租户权重，未配置的租户权重为1
+            lease_seconds: 已提交任务占用名额的最长时间，超时后视为已结束
+            key_prefix: Redis键前缀
+        """
+        self.windows = windows or {}
+        self.quantum = quantum
+        self.weights = weights or {}
+        self.lease_seconds = lease_seconds
+        self.key_prefix = key_prefix
+
+    def is_fair_lane(self, lane: str) -> bool:
+        """该通道的任务是否经过公平调度"""
+        return self.windows.get(lane, 0) > 0
+
+    def weight(self, tenant: str) -> float:
+        return float(self.weights.get(tenant, 1.0))
+
+    def _key(self, lane: str, *parts: str) -> str:
+        return ":".join((self.key_prefix, lane) + parts)
+
+    def submit(self, lane: str, tenant: Optional[str], job: Dict[str, Any], send: Callable[[Dict[str, Any]], None]) -> None:
+        """
+        提交任务：非公平调度通道直接发送，否则进入租户的待提交队列并补充名额
+
+        Args:
+            lane: 优先级通道
+            tenant: 租户（用户ID）
+            job: 任务数据（可JSON序列化，包含pipeline_id）
+            send: 把任务真正提交到Celery的函数
+        """
+        if not self.is_fair_lane(lane):
+            send(job)
+            return
+
+        tenant = tenant or ANONYMOUS_TENANT
+        redis = get_sync_redis()
+        try:
+            # 先写入队列再加入轮转，与refill中移出空队列的顺序配合，保证任务不会滞留
+            redis.rpush(self._key(lane, "queue", tenant), json.dumps(job))
+            if redis.sadd(self._key(lane, "active"), tenant):
+                redis.rpush(self._key(lane, "ring"), tenant)
+        except Exception as e:
+            # Redis不可用时退化为直接提交
+            logger.warning(f"写入公平调度队列失败，直接提交任务: {e}")
+            send(job)
+            return
+        self.refill(lane, send)
+
+    def refill(self, lane: str, send: Callable[[Dict[str, Any]], None]) -> int:
+        """
+        按DRR从各租户的待提交队列中取任务提交，直到窗口占满或队列为空
+
+        Args:
+            lane: 优先级通道
+            send: 把任务提交到Celery的函数
+
+        Returns:
+            int: 本次提交的任务数
+        """
+        if not self.is_fair_lane(lane):
+            return 0
+        redis = get_sync_redis()
+        # 同一时间只有一个进程执行提交。拿不到锁的进程先留下补充请求再返回，持有锁的进程
+        # 释放锁后检查到请求会再执行一轮，不会因为错过最后一次容量检查而让排队的任务一直等待
+        request_key = self._key(lane, "refill_requested")
+        redis.set(request_key, 1)
+        sent = 0
+        while True:
+            lock = redis.lock(self._key(lane, "lock"), timeout=30)
+            if not lock.acquire(blocking=False):
+                return sent
+            try:
+                redis.delete(request_key)
+                sent += self._refill_locked(redis, lane, send)
+            except Exception as e:
+                logger.error(f"公平调度提交任务失败 ({lane}): {e}")
+                return sent
+            finally:
+                try:
+                    lock.release()
+                except Exception:
+                    pass
+            if not redis.delete(request_key):
+                return sent
+
+    def _refill_locked(self, redis, lane: str, send: Callable[[Dict[str, Any]], None]) -> int:
+        ring_key, deficit_key = self._key(lane, "ring"), self._key(lane, "deficit")
+        sent = 0
+        while True:
+            capacity = self.windows[lane] - self._inflight_count(redis, lane)
+            if capacity <= 0:
+                break
+            tenant = redis.lindex(ring_key, 0)
+            if tenant is None:
+                break
+
+            queue_key = self._key(lane, "queue", tenant)
+            deficit = float(redis.hget(deficit_key, tenant) or 0)
+            # 额度不足一个任务时才开始新的一轮（上次因窗口占满而中断时保留剩余额度）
+            if deficit < 1:
+                # 权重配置得过小时也保证有进展
+                deficit += max(self.quantum * self.weight(tenant), 0.1)
+
+            while deficit >= 1 and capacity > 0:
+                raw = redis.lpop(queue_key)
+                if raw is None:
+                    break
+                job = json.loads(raw)
+                # 先占用名额再提交，任务很快完成时也能正确释放
+                redis.zadd(self._key(lane, "inflight"), {job["pipeline_id"]: time.time()})
+                redis.hset(self._key(lane, "inflight_tenants"), job["pipeline_id"], tenant)
+                try:
+                    send(job)
+                except Exception:
+                    self._remove_inflight(redis, lane, job["pipeline_id"])
+                    redis.lpush(queue_key, raw)
+                    raise
+                deficit -= 1
+                capacity -= 1
+                sent += 1
+
+            if redis.llen(queue_key) == 0:
+                # 队列已空：移出轮转并清零额度，随后再次检查，避免与并发的submit竞争时漏掉新任务
+                redis.hdel(deficit_key, tenant)
+                redis.lrem(ring_key, 1, tenant)
+                redis.srem(self._key(lane, "active"), tenant)
+                if redis.llen(queue_key) > 0 and redis.sadd(self._key(lane, "active"), tenant):
+                    redis.rpush(ring_key, tenant)
+            elif deficit < 1:
+                # 本轮额度用完，轮到下一个租户
+                redis.hset(deficit_key, tenant, deficit)
+                redis.lmove(ring_key, ring_key, "LEFT", "RIGHT")
+            else:
+                # 窗口已满，下次从该租户继续
+                redis.hset(deficit_key, tenant, deficit)
+                break
+        return sent
+
+    def release(self, pipeline_id: str) -> Optional[str]:
+        """
+        任务结束后释放名额
+
+        Returns:
+            Optional[str]: 任务所在的通道，任务不占用名额时返回None
+        """
+        redis = get_sync_redis()
+        for lane in self.windows:
+            if self._remove_inflight(redis, lane, pipeline_id):
+                return lane
+        return None
+
+    def _remove_inflight(self, redis, lane: str, pipeline_id: str) -> bool:
+        removed = redis.zrem(self._key(lane, "inflight"), pipeline_id)
+        redis.hdel(self._key(lane, "inflight_tenants"), pipeline_id)
+        return bool(removed)
+
+    def _inflight_count(self, redis, lane: str) -> int:
+        """已提交未结束的任务数，超过租期的任务视为已结束"""
+        inflight_key = self._key(lane, "inflight")
+        expired = redis.zrangebyscore(inflight_key, 0, time.time() - self.lease_seconds)
+        if expired:
+            logger.warning(f"{lane} 通道有 {len(expired)} 个任务超过租期未结束，释放其名额")
+            redis.zrem(inflight_key, *expired)
+            redis.hdel(self._key(lane, "inflight_tenants"), *expired)
+        return redis.zcard(inflight_key)
+
+    def record_wait(self, lane: str, tenant: Optional[str], wait_seconds: float) -> None:
+        """记录任务从提交到开始执行的等待时间"""
+        tenant = tenant or ANONYMOUS_TENANT
+        wait_ms = int(wait_seconds * 1000)
+        try:
+            redis = get_sync_redis()
+            samples_key = self._key(lane, "wait_samples")
+            tenants_key = self._key(lane, "wait_tenants")
+            pipe = redis.pipeline(transaction=False)
+            pipe.lpush(samples_key, wait_ms)
+            pipe.ltrim(samples_key, 0, WAIT_SAMPLE_SIZE - 1)
+            pipe.hincrby(tenants_key, f"{tenant}:count", 1)
+            pipe.hincrby(tenants_key, f"{tenant}:wait_ms_sum", wait_ms)
+            pipe.execute()
+        except Exception as e:
+            logger.debug(f"记录等待时间失败 ({lane}): {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        获取各通道的队列深度和等待时间
+
+        Returns:
+            Dict: 通道名 -> 窗口、执行中任务数、待提交任务数、等待时间分位数和按租户的统计
+        """
+        redis = get_sync_redis()
+        lanes = {}
+        for lane in LANES:
+            tenants: Dict[str, Dict[str, Any]] = {}
+            pending = inflight = 0
+            if self.is_fair_lane(lane):
+                inflight = self._inflight_count(redis, lane)
+                for tenant in redis.lrange(self._key(lane, "ring"), 0, -1):
+                    depth = redis.llen(self._key(lane, "queue", tenant))
+                    tenants.setdefault(tenant, {})["pending"] = depth
+                    pending += depth
+                for tenant in redis.hvals(self._key(lane, "inflight_tenants")):
+                    stats = tenants.setdefault(tenant, {})
+                    stats["inflight"] = stats.get("inflight", 0) + 1
+
+            raw = redis.hgetall(self._key(lane, "wait_tenants"))
+            for field, value in raw.items():
+                tenant, name = field.rsplit(":", 1)
+                tenants.setdefault(tenant, {})[name] = int(value)
+            for stats in tenants.values():
+                stats.setdefault("pending", 0)
+                stats.setdefault("inflight", 0)
+                if stats.get("count"):
+                    stats["avg_wait_ms"] = round(stats.pop("wait_ms_sum") / stats["count"], 1)
+
+            samples = [int(value) for value in redis.lrange(self._key(lane, "wait_samples"), 0, -1)]
+            lanes[lane] = {
+                "priority": LANE_PRIORITIES[lane],
+                "window": self.windows.get(lane),
+                "inflight": inflight,
+                "pending": pending,
+                "wait_ms": _wait_percentiles(samples),
+                "tenants": tenants,
+            }
+        return lanes
+
+def _wait_percentiles(samples: List[int]) -> Dict[str, Any]:
+    """最近等待时间样本的分位数"""
+    if not samples:
+        return {"samples": 0}
+    ordered = sorted(samples)
+
+    def percentile(q: float) -> int:
+        return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+    return {"samples": len(ordered), "p50": percentile(0.5), "p95": percentile(0.95), "max": ordered[-1]}
+
+# 创建默认调度器实例
+fair_dispatcher = FairDispatcher(
+    windows=settings.FAIR_DISPATCH_WINDOWS,
+    quantum=settings.FAIR_DISPATCH_QUANTUM,
+    weights=settings.FAIR_TENANT_WEIGHTS,
+    lease_seconds=settings.FAIR_DISPATCH_LEASE
+)
@@ -0,0 +1,15 @@
+import logging
+from typing import Optional
+from app.core.config import settings
+
+LOG_FORMAT = "%(asctime)s %(levelname)s [%(name)s] %(message)s"
+
+def setup_logging(level: Optional[str] = None):
+    """
+    配置根日志记录器，只需要在进程入口（API应用、Celery Worker）调用一次
+
+    Args:
+        level: 日志级别，默认使用配置中的LOG_LEVEL
+    """
+    level_name = (level or settings.LOG_LEVEL).upper()
+    logging.basicConfig(level=getattr(logging, level_name, logging.INFO), format=LOG_FORMAT)
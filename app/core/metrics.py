@@ -0,0 +1,82 @@
+import logging
+from collections import defaultdict
+from typing import Dict, Any, Optional, Tuple
+from app.core.redis_client import get_redis, get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+class StatsCounter:
+    """统计计数器，进程内累加的同时同步到Redis，便于汇总API和Worker多个进程的数据"""
+
+    def __init__(self, namespace: str, ratios: Optional[Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]]] = None):
+        """
+        初始化计数器
+
+        Args:
+            namespace: 计数器命名空间，对应Redis中的一个哈希表
+            ratios: 派生比率，名称 -> (分子字段, 分母字段)，如命中率、淘汰率
+        """
+        self.namespace = namespace
+        self.ratios = ratios or {}
+        self._local: Dict[str, int] = defaultdict(int)
+
+    @property
+    def redis_key(self) -> str:
+        return f"stats:{self.namespace}"
+
+    async def incr(self, field: str, amount: int = 1):
+        """累加计数，Redis不可用时只记录进程内计数"""
+        self._local[field] += amount
+        try:
+            await get_redis().hincrby(self.redis_key, field, amount)
+        except Exception as e:
+            logger.debug(f"同步计数到Redis失败 ({self.namespace}.{field}): {e}")
+
+    def incr_sync(self, field: str, amount: int = 1):
+        """同步版本的incr，供Celery任务线程等非异步代码使用"""
+        self._local[field] += amount
+        try:
+            get_sync_redis().hincrby(self.redis_key, field, amount)
+        except Exception as e:
+            logger.debug(f"同步计数到Redis失败 ({self.namespace}.{field}): {e}")
+
+    def local_snapshot(self) -> Dict[str, Any]:
+        """获取进程内计数"""
+        return self._with_ratios(dict(self._local))
+
+    def _with_ratios(self, values: Dict[str, Any]) -> Dict[str, Any]:
+        """根据计数计算派生比率"""
+        for name, (numerator, denominator) in self.ratios.items():
+            total = sum(values.get(field, 0) for field in denominator)
+            values[name] = round(sum(values.get(field, 0) for field in numerator) / total, 4) if total else 0.0
+        return values
+
+    async def snapshot(self) -> Dict[str, Any]:
+        """
+        获取计数快照
+
+        Returns:
+            Dict: process为当前进程的计数，cluster为所有进程汇总的计数（Redis不可用时为None）
+        """
+        cluster: Optional[Dict[str, int]] = None
+        try:
+            raw = await get_redis().hgetall(self.redis_key)
+            cluster = self._with_ratios({key: int(value) for key, value in raw.items()})
+        except Exception as e:
+            logger.debug(f"读取Redis计数失败 ({self.namespace}): {e}")
+        return {"process": self.local_snapshot(), "cluster": cluster}
+
+# 已注册的计数器
+_counters: Dict[str, StatsCounter] = {}
+
+def get_counter(namespace: str, ratios: Optional[Dict[str, Tuple[Tuple[str, ...], Tuple[str, ...]]]] = None) -> StatsCounter:
+    """获取（或创建）指定命名空间的计数器"""
+    if namespace not in _counters:
+        _counters[namespace] = StatsCounter(namespace, ratios=ratios)
+    elif ratios:
+        _counters[namespace].ratios.update(ratios)
+    return _counters[namespace]
+
+async def snapshot_all() -> Dict[str, Any]:
+    """获取所有已注册计数器的快照"""
+    return {namespace: await counter.snapshot() for namespace, counter in _counters.items()}
@@ -0,0 +1,62 @@
+import logging
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+# 共享的异步Redis客户端（惰性创建）
+_redis = None
+# 共享的同步Redis客户端，供Celery任务线程和信号处理函数使用
+_sync_redis = None
+
+def get_redis_url(db_number: int) -> str:
+    """构建Redis URL，如果有密码则添加"""
+    if settings.REDIS_PASSWORD:
+        return f"redis://:{settings.REDIS_PASSWORD}@{settings.REDIS_HOST}:{settings.REDIS_PORT}/{db_number}"
+    else:
+        return f"redis://{settings.REDIS_HOST}:{settings.REDIS_PORT}/{db_number}"
+
+def get_redis():
+    """
+    获取共享的异步Redis客户端，用于缓存和统计计数
+
+    Returns:
+        redis.asyncio.Redis: Redis客户端
+    """
+    global _redis
+    if _redis is None:
+        import redis.asyncio as aioredis
+        _redis = aioredis.from_url(
+            get_redis_url(settings.REDIS_CACHE_DB),
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+    return _redis
+
+def get_sync_redis():
+    """
+    获取共享的同步Redis客户端（线程安全，fork后连接池会自动重建）
+
+    Returns:
+        redis.Redis: Redis客户端
+    """
+    global _sync_redis
+    if _sync_redis is None:
+        import redis
+        _sync_redis = redis.Redis.from_url(
+            get_redis_url(settings.REDIS_CACHE_DB),
+            decode_responses=True,
+            socket_connect_timeout=2,
+            socket_timeout=2,
+        )
+    return _sync_redis
+
+async def close_redis():
+    """关闭共享的Redis客户端"""
+    global _redis
+    if _redis is not None:
+        try:
+            await _redis.close()
+        except Exception as e:
+            logger.error(f"关闭Redis连接失败: {e}")
+        _redis = None
@@ -0,0 +1,259 @@
+import math
+import time
+import signal
+import logging
+import subprocess
+from typing import Callable, Dict, List, Optional
+from app.core.config import settings
+from app.core.redis_client import get_redis_url, get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+# Redis传输中带优先级的消息存放在 "<队列名><sep><优先级>" 列表中，与celery_app中的priority_steps一致
+PRIORITY_STEPS = range(10)
+PRIORITY_SEP = ":"
+
+class InflightTracker:
+    """
+    按队列记录正在执行的任务（由Worker中的task_prerun/task_postrun信号调用）
+
+    每个队列对应Redis中的一个有序集合，成员为任务ID、分值为开始时间；
+    Worker崩溃时遗留的记录超过max_age后不再计数，并在读取时清理。
+    """
+
+    def __init__(self, max_age: float = 1800, key_prefix: str = "autoscale:inflight"):
+        self.max_age = max_age
+        self.key_prefix = key_prefix
+
+    def _key(self, queue: str) -> str:
+        return f"{self.key_prefix}:{queue}"
+
+    def started(self, queue: Optional[str], task_id: str):
+        if not queue:
+            return
+        try:
+            get_sync_redis().zadd(self._key(queue), {task_id: time.time()})
+        except Exception as e:
+            logger.debug(f"记录执行中任务失败 ({queue}): {e}")
+
+    def finished(self, queue: Optional[str], task_id: str):
+        if not queue:
+            return
+        try:
+            get_sync_redis().zrem(self._key(queue), task_id)
+        except Exception as e:
+            logger.debug(f"清除执行中任务失败 ({queue}): {e}")
+
+    def count(self, queue: str) -> int:
+        """队列中正在执行的任务数"""
+        redis = get_sync_redis()
+        key = self._key(queue)
+        redis.zremrangebyscore(key, 0, time.time() - self.max_age)
+        return redis.zcard(key)
+
+class _WorkerProcess:
+    """Supervisor启动的一个Worker进程"""
+
+    def __init__(self, index: int, process: subprocess.Popen):
+        self.index = index
+        self.process = process
+        self.draining_since: Optional[float] = None
+
+    @property
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def drain(self):
+        """发送SIGTERM：Celery停止接收新任务，等正在执行的任务完成并确认后退出（warm shutdown）"""
+        if self.draining_since is None and self.alive:
+            self.draining_since = time.time()
+            self.process.send_signal(signal.SIGTERM)
+
+class StagePool:
+    """一个分析阶段的Worker进程池"""
+
+    def __init__(
+        self,
+        stage: str,
+        queues: List[str],
+        concurrency: int,
+        min_processes: int,
+        max_processes: int
+    ):
+        """
+        Args:
+            stage: 阶段名称
+            queues: 该阶段Worker监听的队列
+            concurrency: 每个Worker进程同时执行的任务数
+            min_processes: 最少进程数
+            max_processes: 最多进程数
+        """
+        self.stage = stage
+        self.queues = queues
+        self.concurrency = max(concurrency, 1)
+        self.min_processes = max(min_processes, 0)
+        self.max_processes = max(max_processes, self.min_processes, 1)
+        self.workers: List[_WorkerProcess] = []
+        self.low_since: Optional[float] = None
+        self.next_index = 0
+
+    @property
+    def active(self) -> List[_WorkerProcess]:
+        """未在排空的Worker进程"""
+        return [worker for worker in self.workers if worker.draining_since is None and worker.alive]
+
+    def desired(self, demand: int) -> int:
+        """按需求（排队+执行中的任务数）计算需要的进程数"""
+        return min(max(math.ceil(demand / self.concurrency), self.min_processes), self.max_processes)
+
+class WorkerAutoscaler:
+    """
+    按队列长度自动扩缩容Worker进程的Supervisor
+
+    定期读取Broker中各阶段队列的长度和正在执行的任务数，需要的进程数多于当前进程数时立即扩容；
+    负载低于缩容阈值并持续scale_down_delay秒后，每次排空一个进程（SIGTERM warm shutdown，
+    正在执行的task_acks_late任务完成并确认后才退出，不会被重新投递）。
+    Supervisor收到SIGTERM或SIGINT时排空全部Worker后退出。
+    """
+
+    def __init__(
+        self,
+        pools: List[StagePool],
+        command_factory: Callable[[StagePool, int], List[str]],
+        interval: float = 5.0,
+        scale_down_delay: float = 120.0,
+        scale_down_ratio: float = 0.5,
+        drain_timeout: float = 1800.0,
+        tracker: Optional[InflightTracker] = None
+    ):
+        """
+        Args:
+            pools: 各阶段的进程池
+            command_factory: 根据进程池和进程编号生成Worker启动命令
+            interval: 轮询间隔（秒）
+            scale_down_delay: 负载持续低于缩容阈值多久后缩容（秒）
+            scale_down_ratio: 需求不超过（进程数-1）×并发数×该比例时才视为可以缩容，与扩容阈值之间留出滞后区间
+            drain_timeout: 排空的最长等待时间（秒），超时后强制结束进程
+            tracker: 执行中任务记录，默认使用全局实例
+        """
+        self.pools = pools
+        self.command_factory = command_factory
+        self.interval = interval
+        self.scale_down_delay = scale_down_delay
+        self.scale_down_ratio = scale_down_ratio
+        self.drain_timeout = drain_timeout
+        self.tracker = tracker or inflight_tracker
+        self._broker = None
+        self._stopping = False
+
+    @property
+    def broker(self):
+        """Broker所在Redis数据库的同步客户端"""
+        if self._broker is None:
+            import redis
+            self._broker = redis.Redis.from_url(get_redis_url(settings.REDIS_DB), socket_connect_timeout=2, socket_timeout=2)
+        return self._broker
+
+    def queue_length(self, queue: str) -> int:
+        """Broker中等待执行的消息数（包括所有优先级）"""
+        pipe = self.broker.pipeline(transaction=False)
+        for priority in PRIORITY_STEPS:
+            pipe.llen(queue if priority == 0 else f"{queue}{PRIORITY_SEP}{priority}")
+        return sum(pipe.execute())
+
+    def demand(self, pool: StagePool) -> Dict[str, int]:
+        """读取进程池所有队列的排队数和执行中任务数"""
+        queued = sum(self.queue_length(queue) for queue in pool.queues)
+        inflight = sum(self.tracker.count(queue) for queue in pool.queues)
+        return {"queued": queued, "inflight": inflight}
+
+    def run(self):
+        """启动最少数量的Worker并开始轮询，直到收到退出信号"""
+        signal.signal(signal.SIGTERM, self._request_stop)
+        signal.signal(signal.SIGINT, self._request_stop)
+        for pool in self.pools:
+            for _ in range(pool.min_processes):
+                self._spawn(pool)
+
+        while not self._stopping:
+            for pool in self.pools:
+                try:
+                    self._reap(pool)
+                    self.scale(pool)
+                except Exception as e:
+                    # Redis暂时不可用时保持当前进程数
+                    logger.error(f"{pool.stage} 阶段扩缩容检查失败: {e}")
+            time.sleep(self.interval)
+
+        self.shutdown()
+
+    def scale(self, pool: StagePool, now: Optional[float] = None):
+        """根据当前负载扩容或缩容一个进程池"""
+        now = now or time.time()
+        load = self.demand(pool)
+        demand = load["queued"] + load["inflight"]
+        current = len(pool.active)
+        desired = pool.desired(demand)
+
+        if desired > current:
+            pool.low_since = None
+            logger.info(f"{pool.stage} 阶段扩容: {current} -> {desired}（排队 {load['queued']}，执行中 {load['inflight']}）")
+            for _ in range(desired - current):
+                self._spawn(pool)
+            return
+
+        # 滞后：需求要明显低于去掉一个进程后的容量，并持续一段时间才缩容
+        can_shrink = current > pool.min_processes and demand <= (current - 1) * pool.concurrency * self.scale_down_ratio
+        if not can_shrink:
+            pool.low_since = None
+            return
+        if pool.low_since is None:
+            pool.low_since = now
+            return
+        if now - pool.low_since >= self.scale_down_delay:
+            worker = pool.active[-1]
+            logger.info(f"{pool.stage} 阶段缩容: {current} -> {current - 1}，排空进程 {worker.process.pid}")
+            worker.drain()
+            # 每次只缩容一个进程，重新计时
+            pool.low_since = now
+
+    def _spawn(self, pool: StagePool):
+        index = pool.next_index
+        pool.next_index += 1
+        command = self.command_factory(pool, index)
+        process = subprocess.Popen(command)
+        pool.workers.append(_WorkerProcess(index, process))
+        logger.info(f"启动 {pool.stage} 阶段Worker进程 {process.pid}: {' '.join(command)}")
+
+    def _reap(self, pool: StagePool):
+        """清理已退出的进程；排空超时的进程强制结束；意外退出的进程由下一次scale补齐"""
+        for worker in list(pool.workers):
+            if not worker.alive:
+                if worker.draining_since is None:
+                    logger.warning(f"{pool.stage} 阶段Worker进程 {worker.process.pid} 意外退出，退出码 {worker.process.returncode}")
+                pool.workers.remove(worker)
+            elif worker.draining_since is not None and time.time() - worker.draining_since > self.drain_timeout:
+                logger.warning(f"{pool.stage} 阶段Worker进程 {worker.process.pid} 排空超时，强制结束")
+                worker.process.kill()
+
+    def _request_stop(self, signum, frame):
+        logger.info(f"收到信号 {signum}，排空全部Worker后退出")
+        self._stopping = True
+
+    def shutdown(self):
+        """排空全部Worker并等待退出"""
+        workers = [worker for pool in self.pools for worker in pool.workers]
+        for worker in workers:
+            worker.drain()
+        deadline = time.time() + self.drain_timeout
+        for worker in workers:
+            try:
+                worker.process.wait(max(deadline - time.time(), 0))
+            except subprocess.TimeoutExpired:
+                logger.warning(f"Worker进程 {worker.process.pid} 排空超时，强制结束")
+                worker.process.kill()
+        for pool in self.pools:
+            pool.workers.clear()
+
+# 创建默认执行中任务记录实例
+inflight_tracker = InflightTracker(max_age=settings.WORKER_TASK_TIMEOUT)
@@ -0,0 +1,116 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Coroutine, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class WorkerRuntime:
+    """
+    Celery Worker进程内的常驻异步运行时
+
+    在后台线程中运行一个长期存在的事件循环，所有任务的协程都提交到这个循环执行，
+    共享同一个MongoDB客户端、Redis客户端和LLM HTTP连接池。配合threads池，
+    一个进程可以同时执行多个以I/O等待为主的分析任务。
+    """
+
+    def __init__(self, max_inflight: int = 20):
+        """
+        初始化运行时
+
+        Args:
+            max_inflight: 同时执行的协程数上限
+        """
+        self.max_inflight = max_inflight
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._mongo_client = None
+
+    @property
+    def loop(self) -> Optional[asyncio.AbstractEventLoop]:
+        return self._loop
+
+    def start(self):
+        """启动事件循环线程（已启动时直接返回），需要在fork之后的子进程中调用"""
+        with self._lock:
+            if self._loop is not None:
+                return
+
+            loop = asyncio.new_event_loop()
+            ready = threading.Event()
+
+            def run_loop():
+                asyncio.set_event_loop(loop)
+                loop.call_soon(ready.set)
+                loop.run_forever()
+
+            thread = threading.Thread(target=run_loop, name="worker-async-runtime", daemon=True)
+            thread.start()
+            ready.wait()
+
+            self._semaphore = asyncio.Semaphore(self.max_inflight)
+            self._loop, self._thread = loop, thread
+            logger.info(f"Worker异步运行时已启动，并发上限: {self.max_inflight}")
+
+    def run(self, coro: Coroutine, timeout: Optional[float] = None) -> Any:
+        """
+        在运行时的事件循环中执行协程，并阻塞当前（任务）线程直到完成
+
+        Args:
+            coro: 要执行的协程
+            timeout: 超时时间（秒）
+
+        Returns:
+            协程的返回值
+        """
+        self.start()
+        future = asyncio.run_coroutine_threadsafe(self._limited(coro), self._loop)
+        try:
+            return future.result(timeout)
+        except FutureTimeoutError:
+            # 取消事件循环中仍在执行的协程，释放并发名额
+            future.cancel()
+            raise
+
+    async def _limited(self, coro: Coroutine) -> Any:
+        async with self._semaphore:
+            return await coro
+
+    async def get_database(self):
+        """获取共享的MongoDB数据库实例（在运行时的事件循环中惰性创建客户端）"""
+        if self._mongo_client is None:
+            from motor.motor_asyncio import AsyncIOMotorClient
+            self._mongo_client = AsyncIOMotorClient(settings.MONGODB_URL)
+        return self._mongo_client[settings.MONGODB_DB]
+
+    def stop(self, timeout: float = 10.0):
+        """关闭共享客户端并停止事件循环"""
+        with self._lock:
+            if self._loop is None:
+                return
+            loop, thread = self._loop, self._thread
+
+            async def close_clients():
+                from app.core.redis_client import close_redis
+                if self._mongo_client is not None:
+                    self._mongo_client.close()
+                    self._mongo_client = None
+                await close_redis()
+
+            try:
+                asyncio.run_coroutine_threadsafe(close_clients(), loop).result(timeout)
+            except Exception as e:
+                logger.error(f"关闭Worker共享客户端失败: {e}")
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join(timeout)
+            if not thread.is_alive():
+                loop.close()
+            self._loop, self._thread = None, None
+            logger.info("Worker异步运行时已停止")
+
+# 创建默认运行时实例
+worker_runtime = WorkerRuntime(max_inflight=settings.WORKER_MAX_INFLIGHT)
@@ -6,9 +6,10 @@ import os
 import logging
 from typing import List, Optional
 from pydantic import BaseModel
+from app.core.logging_config import setup_logging
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
+# 配置日志（整个进程只配置一次）
+setup_logging()
 logger = logging.getLogger(__name__)
 
 # 导入配置
@@ -62,6 +63,13 @@ async def startup_db_client():
         logger.error(f"MongoDB连接失败: {e}")
         # 不抛出异常，让应用继续运行
     
+    # 预热分析器，预先建立LLM连接并加载tiktoken编码
+    if settings.WARM_UP_ON_STARTUP:
+        try:
+            await resume_analyzer.get_default_analyzer().warm_up(timeout=settings.WARM_UP_TIMEOUT)
+        except Exception as e:
+            logger.error(f"分析器预热失败，请检查AI提供商配置: {e}")
+    
 # 关闭事件
 @app.on_event("shutdown")
 async def shutdown_db_client():
@@ -70,16 +78,20 @@ async def shutdown_db_client():
         logger.info("MongoDB连接关闭")
     except Exception as e:
         logger.error(f"关闭MongoDB连接失败: {e}")
+    
+    # 关闭解析进程池
+    resume_parser.default_parser.parse_pool.shutdown(wait=False)
 
 # 导入API路由
 try:
-    from app.api import resume, requirements, analysis, users, websocket
+    from app.api import resume, requirements, analysis, users, websocket, tasks
 
     app.include_router(resume.router)
     app.include_router(requirements.router)
     app.include_router(analysis.router)
     app.include_router(users.router)
     app.include_router(websocket.router)
+    app.include_router(tasks.router)
     logger.info("API路由加载成功")
 except Exception as e:
     logger.error(f"加载API路由失败: {e}")
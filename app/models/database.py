@@ -3,8 +3,6 @@ from typing import Dict, Any
 import logging
 from app.core.config import settings
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # MongoDB客户端
@@ -49,6 +47,14 @@ async def create_indexes():
         await db.resumes.create_index("position")
         await db.resumes.create_index("status")
         await db.resumes.create_index("match_score")
+        await db.resumes.create_index("uploaded_at")
+        await db.resumes.create_index("document_id")
+        # 解析时提取的结构化字段，用于分析前的数据库筛选
+        await db.resumes.create_index([("position", 1), ("education_rank", 1), ("experience_years", 1)])
+        await db.resumes.create_index("experience_years")
+        await db.resumes.create_index("skills")
+        await db.resumes.create_index("emails")
+        await db.resumes.create_index("phones")
         
         # 职位要求集合索引
         await db.requirements.create_index("job_title")
@@ -58,6 +64,16 @@ async def create_indexes():
         await db.analyses.create_index("resume_id")
         await db.analyses.create_index("user_id")
         await db.analyses.create_index([("result.match_score", -1)])
+        await db.analyses.create_index("job_id")
+        # 同一简历和同一版本的职位要求只保存一份分析结果（未设置幂等键的历史记录不受影响）
+        await db.analyses.create_index("idempotency_key", unique=True, sparse=True)
+        
+        # 批量筛选任务集合索引
+        await db.screening_jobs.create_index("requirement_id")
+        
+        # 直传上传记录索引：未完成的记录过期后自动删除
+        await db.pending_uploads.create_index("expires_at", expireAfterSeconds=0)
+        await db.pending_uploads.create_index("status")
         
         logger.info("MongoDB索引创建完成")
     except Exception as e:
@@ -59,6 +59,7 @@ class RequirementResponse(RequirementBase):
     """职位要求响应模型"""
     id: str
     user_id: str
+    version: int = Field(1, description="版本号，每次修改后递增")
     created_at: datetime
     updated_at: datetime
     
@@ -76,7 +77,66 @@ class RequirementResponse(RequirementBase):
                 ],
                 "description": "负责公司前端架构设计与实现，参与核心产品开发",
                 "user_id": "60d5ec9f7c213e1c3c3d89c1",
+                "version": 1,
                 "created_at": "2023-06-25T08:30:00",
                 "updated_at": "2023-06-25T08:30:00"
             }
-        } 
\ No newline at end of file
+        } 
+
+class ScreeningRequest(BaseModel):
+    """批量筛选简历的请求体，可以指定简历ID列表或筛选条件"""
+    user_id: Optional[str] = Field(None, description="用户ID，默认使用职位要求的创建者")
+    resume_ids: Optional[List[str]] = Field(None, description="要筛选的简历ID列表")
+    position: Optional[str] = Field(None, description="按应聘职位筛选")
+    status: Optional[str] = Field(None, description="按简历状态筛选")
+    uploaded_from: Optional[datetime] = Field(None, description="上传时间起始")
+    uploaded_to: Optional[datetime] = Field(None, description="上传时间截止")
+    education: Optional[str] = Field(None, description="按最低学历筛选，如'本科'")
+    min_experience_years: Optional[float] = Field(None, ge=0, description="按最低工作年限筛选")
+    skills: Optional[List[str]] = Field(None, description="按必须具备的技能筛选")
+    concurrency: Optional[int] = Field(None, ge=1, description="并发分析数量")
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "user_id": "60d5ec9f7c213e1c3c3d89c1",
+                "position": "前端开发工程师",
+                "status": "pending",
+                "uploaded_from": "2023-06-01T00:00:00",
+                "education": "本科",
+                "min_experience_years": 3,
+                "skills": ["Vue", "TypeScript"],
+                "concurrency": 5
+            }
+        }
+
+class ScreeningJobResponse(BaseModel):
+    """批量筛选任务进度响应模型"""
+    job_id: str
+    requirement_id: str
+    status: str
+    total: int
+    done: int
+    failed: int
+    pending: int
+    failed_resume_ids: List[str] = []
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "job_id": "60d5ec9f7c213e1c3c3d89c4",
+                "requirement_id": "60d5ec9f7c213e1c3c3d89c3",
+                "status": "running",
+                "total": 120,
+                "done": 45,
+                "failed": 1,
+                "pending": 74,
+                "failed_resume_ids": ["60d5ec9f7c213e1c3c3d89c2"],
+                "created_at": "2023-06-25T08:30:00",
+                "started_at": "2023-06-25T08:30:01",
+                "finished_at": None
+            }
+        }
\ No newline at end of file
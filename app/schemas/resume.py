@@ -25,6 +25,9 @@ class ResumeResponse(BaseModel):
     uploaded_at: datetime
     status: Optional[str] = None
     match_score: Optional[float] = None
+    education_level: Optional[str] = None
+    experience_years: Optional[float] = None
+    skills: Optional[List[str]] = None
     message: Optional[str] = None
     
     class Config:
@@ -45,6 +48,7 @@ class ResumeResponse(BaseModel):
 class RequirementsModel(BaseModel):
     """职位要求模型"""
     id: Optional[str] = None
+    version: Optional[int] = Field(None, description="职位要求版本号，指定id而未指定时使用当前版本")
     job_title: str = Field(..., description="职位名称")
     experience_years: int = Field(..., description="所需工作经验年限")
     education: str = Field(..., description="教育背景要求")
@@ -87,4 +91,41 @@ class ResumeAnalysisRequest(BaseModel):
                     "description": "负责公司前端架构设计与实现，参与核心产品开发"
                 }
             }
-        } 
\ No newline at end of file
+        } 
+
+class UploadUrlRequest(BaseModel):
+    """申请直传地址的请求体，客户端随后用返回的地址把文件直接PUT到对象存储"""
+    file_name: str = Field(..., description="文件名（用于判断格式）")
+    candidate_name: str = Field(..., description="候选人姓名")
+    position: str = Field(..., description="应聘职位")
+    size: Optional[int] = Field(None, ge=1, description="文件字节数，超过上传限制时直接拒绝")
+    content_type: Optional[str] = Field(None, description="上传时使用的Content-Type")
+    user_id: Optional[str] = Field(None, description="用户ID")
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "file_name": "张三-简历.pdf",
+                "candidate_name": "张三",
+                "position": "前端开发工程师",
+                "size": 245760,
+                "content_type": "application/pdf",
+                "user_id": "60d5ec9f7c213e1c3c3d89c1"
+            }
+        }
+
+class UploadUrlResponse(BaseModel):
+    """直传地址响应模型"""
+    upload_id: str
+    upload_url: str
+    method: str = "PUT"
+    headers: Dict[str, str] = {}
+    expires_in: int
+
+class UploadStatusResponse(BaseModel):
+    """直传上传的处理状态"""
+    upload_id: str
+    status: str = Field(..., description="pending, uploaded, completed, failed")
+    task_id: Optional[str] = None
+    resume_id: Optional[str] = None
+    error: Optional[str] = None
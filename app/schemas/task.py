@@ -0,0 +1,34 @@
+from pydantic import BaseModel, Field
+from typing import Dict, Any, Optional
+from datetime import datetime
+
+class TaskStatusResponse(BaseModel):
+    """Celery任务状态响应模型"""
+    task_id: str
+    state: str = Field(..., description="PENDING, STARTED, RETRY, SUCCESS, FAILURE")
+    ready: bool = Field(..., description="任务是否已结束")
+    stage: Optional[str] = Field(None, description="分析流水线当前所处的阶段：parse, llm, notify")
+    started_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    duration_seconds: Optional[float] = None
+    resume_id: Optional[str] = None
+    analysis_id: Optional[str] = Field(None, description="分析成功后保存的分析结果ID")
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    
+    class Config:
+        schema_extra = {
+            "example": {
+                "task_id": "4f1c8a2e-6b0e-4d8e-9a53-0f2d6b8c1e77",
+                "state": "SUCCESS",
+                "ready": True,
+                "stage": "notify",
+                "started_at": "2023-06-25T08:30:02",
+                "completed_at": "2023-06-25T08:30:41",
+                "duration_seconds": 38.6,
+                "resume_id": "60d5ec9f7c213e1c3c3d89c2",
+                "analysis_id": "60d5ec9f7c213e1c3c3d89c4",
+                "result": {"success": True, "match_score": 85, "matches_requirements": True},
+                "error": None
+            }
+        }
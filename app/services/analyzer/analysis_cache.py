@@ -0,0 +1,116 @@
+import hashlib
+import json
+import logging
+from collections import OrderedDict
+from typing import Dict, Any, Optional
+from app.core.config import settings
+from app.core.metrics import get_counter
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+class AnalysisCache:
+    """分析结果两级缓存：进程内LRU + Redis（带TTL）"""
+
+    def __init__(self, max_size: int = 1024, ttl: int = 7 * 24 * 3600, enabled: bool = True, key_prefix: str = "analysis_cache:"):
+        """
+        初始化分析结果缓存
+
+        Args:
+            max_size: 进程内LRU缓存的最大条目数
+            ttl: Redis缓存过期时间（秒）
+            enabled: 是否启用缓存
+            key_prefix: Redis键前缀
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self.enabled = enabled
+        self.key_prefix = key_prefix
+        self._lru: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.stats = get_counter(
+            "analysis_cache",
+            ratios={"hit_rate": (("memory_hits", "redis_hits"), ("memory_hits", "redis_hits", "misses"))}
+        )
+
+    @staticmethod
+    def build_key(
+        resume_content: str,
+        formatted_requirements: str,
+        provider: str,
+        model_name: str,
+        prompt_version: str
+    ) -> str:
+        """
+        根据简历内容、格式化后的职位要求、AI提供商、模型和提示版本生成缓存键
+
+        Returns:
+            str: SHA-256十六进制摘要
+        """
+        digest = hashlib.sha256()
+        for part in (prompt_version, provider, model_name, formatted_requirements, resume_content):
+            digest.update((part or "").encode("utf-8"))
+            # 分隔符，避免不同字段拼接后产生相同的输入
+            digest.update(b"\x00")
+        return digest.hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        查询缓存，先查进程内LRU，再查Redis
+
+        Returns:
+            Optional[Dict]: 缓存的分析结果，未命中时返回None
+        """
+        if not self.enabled:
+            return None
+
+        if key in self._lru:
+            self._lru.move_to_end(key)
+            await self.stats.incr("memory_hits")
+            return dict(self._lru[key])
+
+        try:
+            raw = await get_redis().get(self.key_prefix + key)
+        except Exception as e:
+            logger.warning(f"读取Redis分析缓存失败: {e}")
+            raw = None
+
+        if raw:
+            try:
+                value = json.loads(raw)
+                self._remember(key, value)
+                await self.stats.incr("redis_hits")
+                return dict(value)
+            except json.JSONDecodeError:
+                logger.warning(f"分析缓存数据损坏，已忽略: {key}")
+
+        await self.stats.incr("misses")
+        return None
+
+    async def set(self, key: str, value: Dict[str, Any]):
+        """写入缓存（进程内LRU和Redis）"""
+        if not self.enabled:
+            return
+
+        self._remember(key, value)
+        try:
+            await get_redis().set(self.key_prefix + key, json.dumps(value, ensure_ascii=False), ex=self.ttl)
+        except Exception as e:
+            logger.warning(f"写入Redis分析缓存失败: {e}")
+
+    def clear_local(self):
+        """清空进程内缓存"""
+        self._lru.clear()
+
+    def _remember(self, key: str, value: Dict[str, Any]):
+        """写入进程内LRU，超出容量时淘汰最久未使用的条目"""
+        self._lru[key] = dict(value)
+        self._lru.move_to_end(key)
+        while len(self._lru) > self.max_size:
+            self._lru.popitem(last=False)
+
+# 创建默认缓存实例
+analysis_cache = AnalysisCache(
+    max_size=settings.ANALYSIS_CACHE_MAX_SIZE,
+    ttl=settings.ANALYSIS_CACHE_TTL,
+    enabled=settings.ANALYSIS_CACHE_ENABLED
+)
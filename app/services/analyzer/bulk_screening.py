@@ -0,0 +1,351 @@
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Set
+from bson.objectid import ObjectId
+from pymongo import UpdateOne
+from app.core.config import settings
+from app.services.analyzer.resume_analyzer import get_default_analyzer
+from app.services.analyzer.idempotency import analysis_idempotency_key, analysis_deduplicator
+from app.services.notifier.notification_service import notification_service
+from app.services.parser.document_store import document_store
+from app.services.parser.field_extractor import RESUME_FIELD_NAMES, build_field_query, stored_fields
+
+logger = logging.getLogger(__name__)
+
+# 匹配阈值，与单份简历分析接口保持一致
+MATCH_SCORE_THRESHOLD = 70
+
+class BulkScreeningService:
+    """
+    批量筛选服务，将一个职位要求并发地应用到多份简历上
+
+    任务创建后按chunk_size把简历分组，每组由Celery worker中的一个任务分析并立即写入结果；
+    同时执行的组数不超过任务的并发数（见 app.tasks.resume_tasks.start_screening_job）。
+    与单份分析共用幂等键：已有同一版本职位要求分析结果的简历不再调用LLM，筛选的结果也会被单份分析复用。
+    """
+
+    def __init__(
+        self,
+        analyzer=None,
+        default_concurrency: int = 5,
+        max_concurrency: int = 20,
+        chunk_size: int = 4
+    ):
+        """
+        初始化批量筛选服务
+
+        Args:
+            analyzer: 简历分析器，默认使用全局分析器
+            default_concurrency: 默认并发数
+            max_concurrency: 允许的最大并发数
+            chunk_size: 每次交给分析器批量分析的简历数
+        """
+        self._analyzer = analyzer
+        self.default_concurrency = default_concurrency
+        self.max_concurrency = max_concurrency
+        self.chunk_size = max(chunk_size, 1)
+
+    @property
+    def analyzer(self):
+        """简历分析器，未指定时在首次使用时获取全局分析器"""
+        return self._analyzer or get_default_analyzer()
+    
+    @staticmethod
+    def build_resume_query(
+        resume_ids: Optional[List[str]] = None,
+        position: Optional[str] = None,
+        status: Optional[str] = None,
+        uploaded_from: Optional[datetime] = None,
+        uploaded_to: Optional[datetime] = None,
+        education: Optional[str] = None,
+        min_experience_years: Optional[float] = None,
+        skills: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """根据简历ID列表或筛选条件构建简历查询条件，学历、工作年限和技能条件使用解析时提取的字段"""
+        query: Dict[str, Any] = build_field_query(education, min_experience_years, skills)
+        if resume_ids:
+            query["_id"] = {"$in": resume_ids}
+        if position:
+            query["position"] = position
+        if status:
+            query["status"] = status
+        if uploaded_from or uploaded_to:
+            query["uploaded_at"] = {}
+            if uploaded_from:
+                query["uploaded_at"]["$gte"] = uploaded_from
+            if uploaded_to:
+                query["uploaded_at"]["$lte"] = uploaded_to
+        return query
+
+    @staticmethod
+    def requirement_to_dict(requirement: Dict[str, Any]) -> Dict[str, Any]:
+        """将数据库中的职位要求转换为分析器使用的要求字典"""
+        return {
+            "id": requirement["_id"],
+            "version": requirement.get("version", 1),
+            "job_title": requirement["job_title"],
+            "experience_years": requirement["experience_years"],
+            "education": requirement["education"],
+            "skills": requirement["skills"],
+            "description": requirement.get("description"),
+        }
+
+    async def create_job(
+        self,
+        db,
+        requirement: Dict[str, Any],
+        user_id: str,
+        resume_query: Dict[str, Any],
+        concurrency: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        创建批量筛选任务（由start_screening_job提交到Celery执行）
+
+        Args:
+            db: 数据库实例
+            requirement: 职位要求文档
+            user_id: 用户ID
+            resume_query: 简历查询条件
+            concurrency: 并发数，默认使用配置值
+
+        Returns:
+            Dict: 任务文档
+        """
+        concurrency = min(concurrency or self.default_concurrency, self.max_concurrency)
+        cursor = db["resumes"].find(resume_query, {"_id": 1})
+        resume_ids = [doc["_id"] async for doc in cursor]
+
+        now = datetime.now()
+        job = {
+            "_id": str(ObjectId()),
+            "requirement_id": requirement["_id"],
+            # 保存创建时的职位要求，执行期间职位要求被修改也不影响本任务
+            "requirements": self.requirement_to_dict(requirement),
+            "user_id": user_id,
+            "resume_ids": resume_ids,
+            "total": len(resume_ids),
+            "done": 0,
+            "failed": 0,
+            "failed_resume_ids": [],
+            "chunk_size": self.chunk_size,
+            "chunks": -(-len(resume_ids) // self.chunk_size),
+            "done_chunks": [],
+            "concurrency": concurrency,
+            # pending, running, completed；没有简历时直接完成
+            "status": "pending" if resume_ids else "completed",
+            "created_at": now,
+            "started_at": None,
+            "finished_at": None if resume_ids else now,
+        }
+        await db["screening_jobs"].insert_one(job)
+        return job
+
+    async def screen_chunk(self, db, job_id: str, chunk_index: int) -> Optional[Dict[str, Any]]:
+        """
+        分析批量筛选任务中的一组简历，并立即写入分析结果和任务进度（在Celery worker中执行）
+
+        每组的结果单独写入，进程重启或崩溃时已完成的分析不会丢失；消息重新投递时已处理的组
+        和已有分析结果的简历会被跳过。已有相同幂等键结果的简历直接计为完成，新结果按幂等键保存。
+        分析出错的简历（failed=True的0分结果）不写入结果，计为失败。
+
+        Raises:
+            LLMUnavailableError: AI服务不可用，由screen_chunk_task稍后重试这一组
+
+        Args:
+            db: 数据库实例
+            job_id: 任务ID
+            chunk_index: 组序号，第i组为简历ID列表中的 [i*chunk_size, (i+1)*chunk_size)
+
+        Returns:
+            Optional[Dict]: 任务文档（不含简历ID列表），任务不存在时返回None
+        """
+        job = await db["screening_jobs"].find_one({"_id": job_id}, {"resume_ids": 0, "failed_resume_ids": 0})
+        if not job:
+            return None
+        if chunk_index in job.get("done_chunks", []):
+            return job
+
+        await db["screening_jobs"].update_one(
+            {"_id": job_id, "status": "pending"},
+            {"$set": {"status": "running", "started_at": datetime.now()}}
+        )
+        resume_ids = await self._chunk_resume_ids(db, job, chunk_index)
+        requirements = job["requirements"]
+
+        # 消息重新投递或重试时，上次已经写入的结果直接计为完成
+        analyzed = await self._analyzed_resume_ids(db, job_id, resume_ids)
+        # 单份分析或其他筛选任务已有相同分析结果的简历直接复用，不再调用LLM
+        keys = {
+            resume_id: analysis_idempotency_key(resume_id, requirements)
+            for resume_id in resume_ids if resume_id not in analyzed
+        }
+        existing = await analysis_deduplicator.find_existing_many(db, list(keys.values()))
+        reused = {resume_id for resume_id, key in keys.items() if key in existing}
+        if reused:
+            await analysis_deduplicator.stats.incr("reused_results", len(reused))
+        chunk = await db["resumes"].find(
+            {"_id": {"$in": [resume_id for resume_id in keys if resume_id not in reused]}},
+            {"content": 1, "document_id": 1, **{name: 1 for name in RESUME_FIELD_NAMES}}
+        ).to_list(length=None)
+
+        results = {}
+        if chunk:
+            # 一组简历交给分析器，短简历会被打包到同一次LLM调用中；出错时抛出，由任务重试整组
+            contents = await document_store.load_contents(db, chunk)
+            results = await self.analyzer.analyze_resumes_batch(
+                [
+                    {"id": resume["_id"], "content": contents[resume["_id"]], "fields": stored_fields(resume)}
+                    for resume in chunk
+                ],
+                requirements
+            )
+            # 出错的结果不保存、不更新简历状态，与单份分析一样不把0分结果当作分析结论
+            results = {resume_id: result for resume_id, result in results.items() if not result.failed}
+
+        now = datetime.now()
+        resume_updates: List[UpdateOne] = []
+        for resume_id, analysis_result in results.items():
+            # 按幂等键保存；并发的单份分析先保存了结果时保留该结果，简历状态也已由它更新
+            _, created = await analysis_deduplicator.save(db, keys[resume_id], {
+                "_id": str(ObjectId()),
+                "resume_id": resume_id,
+                "requirements": requirements,
+                "result": analysis_result.dict(),
+                "user_id": job["user_id"],
+                "job_id": job_id,
+                "created_at": now
+            })
+            if not created:
+                continue
+            resume_updates.append(UpdateOne(
+                {"_id": resume_id},
+                {"$set": {
+                    "status": "matched" if analysis_result.match_score >= MATCH_SCORE_THRESHOLD else "analyzed",
+                    "last_analyzed_at": now,
+                    "matches_requirements": analysis_result.matches_requirements,
+                    "match_score": analysis_result.match_score
+                }}
+            ))
+        if resume_updates:
+            await db["resumes"].bulk_write(resume_updates, ordered=False)
+
+        # 找不到的简历和分析失败的简历都计为失败
+        done = analyzed | reused | set(results)
+        failed_resume_ids = [resume_id for resume_id in resume_ids if resume_id not in done]
+        await self._record_chunk(db, job_id, chunk_index, len(done), failed_resume_ids)
+        return job
+
+    async def fail_chunk(self, db, job_id: str, chunk_index: int, error: str) -> Optional[Dict[str, Any]]:
+        """
+        一组简历重试耗尽仍无法完成时，把其中还没有分析结果的简历计为失败，使任务仍然能够完成
+
+        Args:
+            db: 数据库实例
+            job_id: 任务ID
+            chunk_index: 组序号
+            error: 最后一次出错的原因
+
+        Returns:
+            Optional[Dict]: 任务文档（不含简历ID列表），任务不存在时返回None
+        """
+        job = await db["screening_jobs"].find_one({"_id": job_id}, {"resume_ids": 0, "failed_resume_ids": 0})
+        if not job:
+            return None
+        if chunk_index in job.get("done_chunks", []):
+            return job
+
+        resume_ids = await self._chunk_resume_ids(db, job, chunk_index)
+        analyzed = await self._analyzed_resume_ids(db, job_id, resume_ids)
+        failed_resume_ids = [resume_id for resume_id in resume_ids if resume_id not in analyzed]
+        logger.error(f"批量筛选任务 {job_id} 第 {chunk_index} 组重试后仍然失败，{len(failed_resume_ids)} 份简历计为失败: {error}")
+        await self._record_chunk(db, job_id, chunk_index, len(analyzed), failed_resume_ids)
+        return job
+
+    @staticmethod
+    async def _chunk_resume_ids(db, job: Dict[str, Any], chunk_index: int) -> List[str]:
+        """读取一组的简历ID（只取出这一段，不读取整个简历ID列表）"""
+        chunk_size = job["chunk_size"]
+        sliced = await db["screening_jobs"].find_one(
+            {"_id": job["_id"]},
+            {"_id": 1, "resume_ids": {"$slice": [chunk_index * chunk_size, chunk_size]}}
+        )
+        return sliced["resume_ids"]
+
+    @staticmethod
+    async def _analyzed_resume_ids(db, job_id: str, resume_ids: List[str]) -> Set[str]:
+        """本任务已经写入分析结果的简历"""
+        cursor = db["analyses"].find({"job_id": job_id, "resume_id": {"$in": resume_ids}}, {"resume_id": 1})
+        return {doc["resume_id"] async for doc in cursor}
+
+    async def _record_chunk(self, db, job_id: str, chunk_index: int, done: int, failed_resume_ids: List[str]):
+        """记录一组的处理结果（每组只记录一次），全部完成时结束任务"""
+        await db["screening_jobs"].update_one(
+            {"_id": job_id, "done_chunks": {"$ne": chunk_index}},
+            {
+                "$inc": {"done": done, "failed": len(failed_resume_ids)},
+                "$push": {"failed_resume_ids": {"$each": failed_resume_ids}},
+                "$addToSet": {"done_chunks": chunk_index},
+            }
+        )
+        await self._finish_if_done(db, job_id)
+
+    async def _finish_if_done(self, db, job_id: str):
+        """全部简历都处理完时把任务标记为完成并通知用户（只执行一次）"""
+        job = await db["screening_jobs"].find_one_and_update(
+            {
+                "_id": job_id,
+                "status": {"$in": ["pending", "running"]},
+                "$expr": {"$gte": [{"$add": ["$done", "$failed"]}, "$total"]},
+            },
+            {"$set": {"status": "completed", "finished_at": datetime.now()}},
+            projection={"resume_ids": 0, "failed_resume_ids": 0},
+            return_document=True
+        )
+        if job is None:
+            return
+        logger.info(f"批量筛选任务 {job_id} 完成，成功 {job['done']}，失败 {job['failed']}")
+
+        await notification_service.connection_manager.send_personal_message(
+            {
+                "type": "screening_completed",
+                "job_id": job_id,
+                "requirement_id": job["requirement_id"],
+                "status": job["status"],
+                "total": job["total"],
+                "done": job["done"],
+                "failed": job["failed"],
+                "timestamp": datetime.now().isoformat()
+            },
+            job["user_id"]
+        )
+
+    async def get_progress(self, db, job_id: str) -> Optional[Dict[str, Any]]:
+        """
+        获取批量筛选任务进度
+
+        Returns:
+            Optional[Dict]: 任务进度，任务不存在时返回None
+        """
+        job = await db["screening_jobs"].find_one({"_id": job_id}, {"resume_ids": 0})
+        if not job:
+            return None
+        return {
+            "job_id": job["_id"],
+            "requirement_id": job["requirement_id"],
+            "status": job["status"],
+            "total": job["total"],
+            "done": job["done"],
+            "failed": job["failed"],
+            "pending": max(job["total"] - job["done"] - job["failed"], 0),
+            "failed_resume_ids": job.get("failed_resume_ids", []),
+            "created_at": job["created_at"],
+            "started_at": job.get("started_at"),
+            "finished_at": job.get("finished_at"),
+        }
+
+# 创建默认批量筛选服务实例
+bulk_screening_service = BulkScreeningService(
+    default_concurrency=settings.SCREENING_CONCURRENCY,
+    max_concurrency=settings.SCREENING_MAX_CONCURRENCY,
+    chunk_size=settings.ANALYSIS_BATCH_MAX_RESUMES
+)
@@ -0,0 +1,172 @@
+import json
+import time
+import asyncio
+import hashlib
+import logging
+from typing import Dict, Any, List, Optional, Tuple
+from pymongo.errors import DuplicateKeyError
+from app.core.config import settings
+from app.core.metrics import get_counter
+from app.core.redis_client import get_sync_redis
+
+logger = logging.getLogger(__name__)
+
+# 同步分析请求认领幂等键时使用的持有者前缀（其他持有者为Celery流水线ID）
+SYNC_OWNER_PREFIX = "sync-"
+
+def requirements_digest(requirements: Dict[str, Any]) -> str:
+    """职位要求内容的摘要（不含id和version，忽略值为None的字段），内容相同时与字段顺序无关"""
+    content = {
+        name: value for name, value in requirements.items()
+        if name not in ("id", "version") and value is not None
+    }
+    canonical = json.dumps(content, ensure_ascii=False, sort_keys=True, default=str)
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+def analysis_idempotency_key(resume_id: str, requirements: Dict[str, Any]) -> str:
+    """
+    生成分析任务的幂等键：同一份简历和同一版本、同一内容的职位要求只分析一次
+
+    Args:
+        resume_id: 简历ID
+        requirements: 职位要求，包含id时使用id、version和要求内容的摘要，否则只使用要求内容的摘要
+                      （带着已有id提交修改过的要求内容时不会复用旧的分析结果）
+
+    Returns:
+        str: 幂等键
+    """
+    digest = requirements_digest(requirements)
+    requirement_id = requirements.get("id")
+    if requirement_id:
+        return f"{resume_id}:{requirement_id}:v{requirements.get('version') or 1}:{digest[:16]}"
+    return f"{resume_id}:sha256:{digest}"
+
+class AnalysisDeduplicator:
+    """
+    分析任务去重
+
+    - 提交时在Redis中用SET NX认领幂等键，并发的重复提交返回第一次提交的流水线ID，只执行一次
+    - 分析结果按幂等键upsert到analyses集合（唯一索引），重复的任务或消息重新投递时直接复用已有结果，不再调用LLM
+    - 出错的结果（failed=True，与分析缓存一样不缓存）不按幂等键保存，重新提交时会再次分析
+    """
+
+    def __init__(self, claim_ttl: int = 3600, key_prefix: str = "analysis_claim:"):
+        """
+        初始化去重器
+
+        Args:
+            claim_ttl: 认领的有效期（秒），超过后同一幂等键可以再次提交（已有结果时仍会被复用）
+            key_prefix: Redis键前缀
+        """
+        self.claim_ttl = claim_ttl
+        self.key_prefix = key_prefix
+        self.stats = get_counter("analysis_dedup")
+
+    def claim(self, key: str, pipeline_id: str) -> Optional[str]:
+        """
+        认领幂等键
+
+        Args:
+            key: 幂等键
+            pipeline_id: 本次提交的流水线ID
+
+        Returns:
+            Optional[str]: 认领成功返回None；已被认领时返回持有者的流水线ID
+        """
+        redis = get_sync_redis()
+        try:
+            if redis.set(self.key_prefix + key, pipeline_id, nx=True, ex=self.claim_ttl):
+                return None
+            owner = redis.get(self.key_prefix + key)
+        except Exception as e:
+            # Redis不可用时不去重，由analyses集合的唯一索引兜底
+            logger.warning(f"认领分析任务幂等键失败: {e}")
+            return None
+        if owner is None:
+            # 认领恰好过期，重试一次
+            return self.claim(key, pipeline_id)
+        self.stats.incr_sync("duplicate_submissions")
+        return owner
+
+    def owner(self, key: str) -> Optional[str]:
+        """当前持有认领的流水线ID或同步请求ID，未被认领时返回None"""
+        try:
+            return get_sync_redis().get(self.key_prefix + key)
+        except Exception as e:
+            logger.warning(f"查询分析任务幂等键失败: {e}")
+            return None
+
+    def release(self, key: str, pipeline_id: str):
+        """任务失败时释放认领（只释放自己持有的），允许重新提交"""
+        try:
+            redis = get_sync_redis()
+            if redis.get(self.key_prefix + key) == pipeline_id:
+                redis.delete(self.key_prefix + key)
+        except Exception as e:
+            logger.warning(f"释放分析任务幂等键失败: {e}")
+
+    async def find_existing(self, db, key: str) -> Optional[Dict[str, Any]]:
+        """查询该幂等键已保存的分析结果（不包括出错的结果）"""
+        return await db["analyses"].find_one({"idempotency_key": key, "result.failed": {"$ne": True}})
+
+    async def find_existing_many(self, db, keys: List[str]) -> Dict[str, Dict[str, Any]]:
+        """批量查询多个幂等键已保存的分析结果（不包括出错的结果），返回 幂等键 -> 分析结果"""
+        if not keys:
+            return {}
+        cursor = db["analyses"].find({"idempotency_key": {"$in": keys}, "result.failed": {"$ne": True}})
+        return {doc["idempotency_key"]: doc async for doc in cursor}
+
+    async def wait_for_result(self, db, key: str, timeout: float, poll_interval: float = 0.5) -> Optional[Dict[str, Any]]:
+        """
+        等待持有认领的请求或任务保存分析结果
+
+        Args:
+            db: 数据库实例
+            key: 幂等键
+            timeout: 最长等待时间（秒）
+            poll_interval: 查询间隔（秒）
+
+        Returns:
+            Optional[Dict]: 已保存的分析结果；认领已释放（持有者失败）或超时仍没有结果时返回None
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            existing = await self.find_existing(db, key)
+            if existing is not None:
+                return existing
+            if time.monotonic() >= deadline or await asyncio.to_thread(self.owner, key) is None:
+                # 持有者可能在两次查询之间写入结果并释放认领，再查询一次
+                return await self.find_existing(db, key)
+            await asyncio.sleep(poll_interval)
+
+    async def save(self, db, key: str, analysis_data: Dict[str, Any]) -> Tuple[str, bool]:
+        """
+        按幂等键保存分析结果，已存在时保留原结果；出错的结果不设置幂等键，直接插入
+
+        Args:
+            db: 数据库实例
+            key: 幂等键
+            analysis_data: 分析结果文档（包含_id）
+
+        Returns:
+            Tuple[str, bool]: (分析结果ID, 是否为新写入)
+        """
+        if analysis_data["result"].get("failed"):
+            await db["analyses"].insert_one(analysis_data)
+            return analysis_data["_id"], True
+        try:
+            result = await db["analyses"].update_one(
+                {"idempotency_key": key},
+                {"$setOnInsert": {**analysis_data, "idempotency_key": key}},
+                upsert=True
+            )
+            if result.upserted_id is not None:
+                return analysis_data["_id"], True
+        except DuplicateKeyError:
+            # 并发的upsert都未匹配到文档时，只有一个能插入成功
+            pass
+        existing = await self.find_existing(db, key)
+        return existing["_id"], False
+
+# 创建默认去重器实例
+analysis_deduplicator = AnalysisDeduplicator(claim_ttl=settings.ANALYSIS_CLAIM_TTL)
@@ -0,0 +1,297 @@
+import json
+import logging
+from functools import lru_cache
+from typing import Any, List, Optional, Tuple, Type, TypeVar
+from pydantic import TypeAdapter
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+_DECODER = json.JSONDecoder()
+
+# Python风格的字面量（LLM偶尔会输出）
+_LITERALS = {"True": "true", "False": "false", "None": "null"}
+
+_CLOSERS = {"{": "}", "[": "]"}
+
+class OutputParseError(ValueError):
+    """LLM输出中找不到可以解析或修复的JSON"""
+
+@lru_cache(maxsize=None)
+def get_type_adapter(model: Type[T]) -> TypeAdapter:
+    """获取（并缓存）模型的TypeAdapter，避免每次解析都重新构建校验器"""
+    return TypeAdapter(model)
+
+class IncrementalJSONParser:
+    """
+    单遍扫描的增量JSON解析器
+
+    可以分多次喂入流式输出的文本片段，扫描时跳过JSON之前的说明文字和代码块标记，
+    同时修复常见问题：单引号字符串、注释、尾随逗号、Python字面量、字符串中的换行，
+    以及输出被截断时未闭合的字符串、数组和对象。最外层JSON结束后的内容会被忽略。
+    """
+
+    def __init__(self, opening: str = "{["):
+        """
+        初始化解析器
+
+        Args:
+            opening: 可以作为最外层JSON起始的字符
+        """
+        self.opening = opening
+        self.done = False
+        self._out: List[str] = []
+        self._stack: List[str] = []
+        self._started = False
+        self._quote: Optional[str] = None
+        self._escape = False
+        self._pending = ""
+        # 可以安全截断的位置: (输出片段数, 当时的嵌套栈)
+        self._safe: Optional[Tuple[int, Tuple[str, ...]]] = None
+        self._top_safe: Optional[Tuple[int, Tuple[str, ...]]] = None
+        self._cache: dict = {}
+
+    def feed(self, chunk: str, final: bool = False):
+        """
+        追加一段文本
+
+        Args:
+            chunk: 新收到的文本片段
+            final: 是否为最后一段，为True时不再暂存末尾未完成的标识符或注释
+        """
+        if self.done or not (chunk or self._pending):
+            return
+        text = self._pending + chunk
+        self._pending = ""
+        out, stack = self._out, self._stack
+        i, n = 0, len(text)
+
+        while i < n:
+            ch = text[i]
+
+            if not self._started:
+                if ch in self.opening:
+                    self._started = True
+                    stack.append(ch)
+                    out.append(ch)
+                    self._mark_safe()
+                i += 1
+                continue
+
+            if self._quote is not None:
+                if self._escape:
+                    self._escape = False
+                    if ch == "'" and self._quote == "'":
+                        # \' 在JSON中不是合法转义
+                        out[-1] = "'"
+                    else:
+                        out.append(ch)
+                elif ch == "\\":
+                    self._escape = True
+                    out.append(ch)
+                elif ch == self._quote:
+                    self._quote = None
+                    out.append('"')
+                elif ch == '"':
+                    out.append('\\"')
+                elif ch == "\n":
+                    out.append("\\n")
+                elif ch == "\r":
+                    out.append("\\r")
+                elif ch == "\t":
+                    out.append("\\t")
+                else:
+                    out.append(ch)
+                i += 1
+                continue
+
+            if ch == '"' or ch == "'":
+                self._quote = ch
+                out.append('"')
+            elif ch == "/":
+                # 注释：需要看到下一个字符才能判断
+                if i + 1 >= n:
+                    if not final:
+                        self._pending = text[i:]
+                    break
+                if text[i + 1] == "/":
+                    end = text.find("\n", i + 2)
+                    if end == -1:
+                        if not final:
+                            self._pending = text[i:]
+                        break
+                    i = end
+                    continue
+                if text[i + 1] == "*":
+                    end = text.find("*/", i + 2)
+                    if end == -1:
+                        if not final:
+                            self._pending = text[i:]
+                        break
+                    i = end + 2
+                    continue
+                out.append(ch)
+            elif ch in "{[":
+                stack.append(ch)
+                out.append(ch)
+                self._mark_safe()
+            elif ch in "}]":
+                self._strip_trailing_comma()
+                if stack:
+                    stack.pop()
+                out.append(ch)
+                if not stack:
+                    self.done = True
+                    break
+            elif ch == ",":
+                # 跳过重复的逗号和紧跟在起始括号后的逗号
+                if self._last_token() not in ",{[":
+                    self._mark_safe()
+                    out.append(ch)
+            elif ch.isalpha() or ch == "_":
+                # 读取完整的标识符，片段末尾的标识符可能还没输出完
+                end = i
+                while end < n and (text[end].isalnum() or text[end] == "_"):
+                    end += 1
+                if end == n and not final:
+                    self._pending = text[i:]
+                    break
+                word = text[i:end]
+                out.append(_LITERALS.get(word, word))
+                i = end
+                continue
+            else:
+                out.append(ch)
+            i += 1
+
+        self._cache.clear()
+
+    def _mark_safe(self):
+        point = (len(self._out), tuple(self._stack))
+        self._safe = point
+        if len(self._stack) <= 1:
+            self._top_safe = point
+
+    def _last_token(self) -> str:
+        """最后一个非空白输出片段"""
+        for token in reversed(self._out):
+            if not token.isspace():
+                return token
+        return ""
+
+    def _strip_trailing_comma(self):
+        out = self._out
+        j = len(out) - 1
+        while j >= 0 and out[j].isspace():
+            j -= 1
+        if j >= 0 and out[j] == ",":
+            del out[j]
+
+    @property
+    def started(self) -> bool:
+        return self._started
+
+    @property
+    def safe_position(self) -> int:
+        """最近一个可安全截断位置，用于判断是否有新的完整值"""
+        return self._safe[0] if self._safe else 0
+
+    def value(self, complete_only: bool = False, top_level: bool = False) -> Any:
+        """
+        获取当前已解析的值，未结束的结构会被自动闭合
+
+        Args:
+            complete_only: 只保留已经完整输出的值（丢弃正在输出的最后一项）
+            top_level: 与complete_only一起使用，只保留最外层已完整输出的字段
+
+        Returns:
+            Any: 解析结果
+
+        Raises:
+            OutputParseError: 没有找到JSON或无法修复
+        """
+        key = (complete_only, top_level, len(self._out))
+        if key in self._cache:
+            return self._cache[key]
+
+        if not self._started:
+            raise OutputParseError("输出中没有JSON")
+
+        text = "".join(self._out)
+        candidates = []
+        if self.done:
+            candidates.append(text)
+        else:
+            if not complete_only:
+                if self._quote is not None:
+                    body = text[:-1] if self._escape else text
+                    candidates.append(body + '"' + self._closers(self._stack))
+                else:
+                    candidates.append(text.rstrip().rstrip(",") + self._closers(self._stack))
+            point = self._top_safe if top_level else self._safe
+            if point is not None:
+                length, stack = point
+                candidates.append("".join(self._out[:length]).rstrip().rstrip(",") + self._closers(stack))
+
+        error = None
+        for candidate in candidates:
+            try:
+                result = json.loads(candidate)
+                self._cache[key] = result
+                return result
+            except json.JSONDecodeError as e:
+                error = e
+        raise OutputParseError(f"无法修复输出中的JSON: {error}")
+
+    @staticmethod
+    def _closers(stack) -> str:
+        return "".join(_CLOSERS[ch] for ch in reversed(stack))
+
+def loads_lenient(text: str, opening: str = "{[") -> Any:
+    """
+    从LLM输出中提取并解析最外层JSON
+
+    先用C实现的解码器直接从第一个起始字符解析（可以跳过前后的说明文字和代码块标记），
+    失败时再用单遍扫描修复后解析。
+
+    Args:
+        text: LLM输出文本
+        opening: 可以作为最外层JSON起始的字符
+
+    Returns:
+        Any: 解析结果
+
+    Raises:
+        OutputParseError: 没有找到JSON或无法修复
+    """
+    starts = [pos for pos in (text.find(ch) for ch in opening) if pos != -1]
+    if not starts:
+        raise OutputParseError("输出中没有JSON")
+
+    try:
+        value, _ = _DECODER.raw_decode(text, min(starts))
+        return value
+    except json.JSONDecodeError:
+        pass
+
+    parser = IncrementalJSONParser(opening)
+    parser.feed(text, final=True)
+    value = parser.value()
+    if not parser.done:
+        logger.debug("LLM输出被截断，已自动闭合未完成的JSON结构")
+    return value
+
+def parse_model(text: str, model: Type[T], opening: str = "{") -> T:
+    """
+    解析LLM输出并通过缓存的TypeAdapter校验为指定模型
+
+    Args:
+        text: LLM输出文本
+        model: 目标类型
+        opening: 可以作为最外层JSON起始的字符
+
+    Returns:
+        T: 校验后的对象
+    """
+    return get_type_adapter(model).validate_python(loads_lenient(text, opening))
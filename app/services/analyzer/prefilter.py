@@ -0,0 +1,156 @@
+import logging
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, Field
+from app.core.config import settings
+from app.core.metrics import get_counter
+from app.services.parser.field_extractor import (
+    education_rank,
+    estimate_experience_years,
+    is_known_skill,
+    normalize_skill,
+    skill_in_text,
+)
+
+logger = logging.getLogger(__name__)
+
+# 各项评分权重
+SKILL_WEIGHT = 0.6
+EDUCATION_WEIGHT = 0.2
+EXPERIENCE_WEIGHT = 0.2
+
+# 信息缺失时给予的中间分，避免因解析不到而误伤
+UNKNOWN_SCORE = 0.5
+
+class PreFilterOutcome(BaseModel):
+    """预筛选结果"""
+    score: float = Field(description="规则评分 (0-100)")
+    passed: bool = Field(description="是否通过预筛选")
+    skills_match: Dict[str, bool] = Field(default_factory=dict, description="每项技能的匹配情况")
+    missing_skills: List[str] = Field(default_factory=list, description="未找到的技能")
+    education_match: Optional[bool] = Field(None, description="学历是否满足，无法判断时为None")
+    experience_years: Optional[float] = Field(None, description="估算的工作年限")
+    experience_match: Optional[bool] = Field(None, description="工作年限是否满足，无法判断时为None")
+
+class ResumePreFilter:
+    """基于规则的简历预筛选，在调用LLM之前淘汰明显不符合要求的简历"""
+
+    def __init__(self, threshold: float = 30.0, enabled: bool = True):
+        """
+        初始化预筛选器
+
+        Args:
+            threshold: 通过预筛选所需的最低规则评分 (0-100)
+            enabled: 是否启用预筛选
+        """
+        self.threshold = threshold
+        self.enabled = enabled
+        self.stats = get_counter("prefilter", ratios={"rejection_rate": (("rejected",), ("evaluated",))})
+
+    def score(
+        self,
+        resume_content: str,
+        requirements: Dict[str, Any],
+        fields: Optional[Dict[str, Any]] = None
+    ) -> PreFilterOutcome:
+        """
+        计算简历与职位要求的规则评分
+
+        Args:
+            resume_content: 简历内容文本
+            requirements: 职位要求信息
+            fields: 解析时提取的结构化字段（见field_extractor），提供时不再扫描全文估算学历和工作年限
+
+        Returns:
+            PreFilterOutcome: 预筛选结果
+        """
+        text = resume_content or ""
+        fields = fields or {}
+        resume_skills = set(fields.get("skills") or [])
+
+        # 技能匹配，技能表中的技能直接查提取结果，其余技能在全文中查找
+        skills_match: Dict[str, bool] = {}
+        for skill in requirements.get("skills") or []:
+            name = skill.get("name") if isinstance(skill, dict) else str(skill)
+            if name:
+                if "skills" in fields and is_known_skill(name):
+                    skills_match[name] = normalize_skill(name) in resume_skills
+                else:
+                    skills_match[name] = skill_in_text(name, text)
+        if skills_match:
+            skill_score = sum(skills_match.values()) / len(skills_match)
+        else:
+            skill_score = 1.0
+
+        # 学历匹配
+        required_rank = education_rank(requirements.get("education") or "")
+        resume_rank = fields["education_rank"] if "education_rank" in fields else education_rank(text)
+        if not required_rank:
+            education_match, education_score = True, 1.0
+        elif not resume_rank:
+            education_match, education_score = None, UNKNOWN_SCORE
+        else:
+            education_match = resume_rank >= required_rank
+            education_score = 1.0 if education_match else 0.0
+
+        # 工作年限匹配
+        required_years = requirements.get("experience_years") or 0
+        if "experience_years" in fields:
+            experience_years = fields["experience_years"]
+        else:
+            experience_years = estimate_experience_years(text)
+        if not required_years:
+            experience_match, experience_score = True, 1.0
+        elif experience_years is None:
+            experience_match, experience_score = None, UNKNOWN_SCORE
+        else:
+            experience_match = experience_years >= required_years
+            experience_score = min(experience_years / required_years, 1.0)
+
+        score = round(100 * (
+            SKILL_WEIGHT * skill_score
+            + EDUCATION_WEIGHT * education_score
+            + EXPERIENCE_WEIGHT * experience_score
+        ), 1)
+
+        return PreFilterOutcome(
+            score=score,
+            passed=score >= self.threshold,
+            skills_match=skills_match,
+            missing_skills=[name for name, matched in skills_match.items() if not matched],
+            education_match=education_match,
+            experience_years=round(experience_years, 1) if experience_years is not None else None,
+            experience_match=experience_match
+        )
+
+    async def evaluate(
+        self,
+        resume_content: str,
+        requirements: Dict[str, Any],
+        fields: Optional[Dict[str, Any]] = None
+    ) -> Optional[PreFilterOutcome]:
+        """
+        执行预筛选并记录统计
+
+        Args:
+            resume_content: 简历内容文本
+            requirements: 职位要求信息
+            fields: 解析时提取的结构化字段
+
+        Returns:
+            Optional[PreFilterOutcome]: 预筛选结果，未启用时返回None
+        """
+        if not self.enabled:
+            return None
+
+        outcome = self.score(resume_content, requirements, fields)
+        await self.stats.incr("evaluated")
+        if not outcome.passed:
+            await self.stats.incr("rejected")
+            logger.info(f"简历未通过预筛选，规则评分: {outcome.score}")
+        return outcome
+
+# 创建默认预筛选器实例
+default_prefilter = ResumePreFilter(
+    threshold=settings.PREFILTER_THRESHOLD,
+    enabled=settings.PREFILTER_ENABLED
+)
@@ -0,0 +1,202 @@
+import time
+import asyncio
+import logging
+from typing import Dict, Any, Optional
+from app.core.config import settings
+from app.core.metrics import get_counter
+from app.core.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# 所有提供商都饱和时，重新检查额度的间隔（秒）
+CAPACITY_POLL_INTERVAL = 1.0
+
+class LLMUnavailableError(Exception):
+    """所有AI提供商都已限流或调用失败，在等待时间内无法完成调用"""
+
+def is_retryable_error(error: Exception) -> bool:
+    """判断LLM调用错误是否为限流、超时或服务端错误（可以换提供商或稍后重试）"""
+    if isinstance(error, (asyncio.TimeoutError, TimeoutError, ConnectionError)):
+        return True
+    name = type(error).__name__.lower()
+    if "ratelimit" in name or "timeout" in name or "connection" in name or "overloaded" in name:
+        return True
+    status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    if isinstance(status_code, int) and (status_code == 429 or status_code >= 500):
+        return True
+    return "429" in str(error) or "rate limit" in str(error).lower()
+
+def is_rate_limit_error(error: Exception) -> bool:
+    """判断是否为提供商返回的限流错误"""
+    status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+    return status_code == 429 or "ratelimit" in type(error).__name__.lower() or "429" in str(error)
+
+class _ProviderState:
+    """单个提供商在当前进程内的并发状态"""
+
+    def __init__(self, concurrency: float):
+        self.concurrency = concurrency
+        self.in_flight = 0
+
+class AdaptiveRateLimiter:
+    """
+    自适应LLM限流器
+
+    - RPM/TPM：按分钟窗口在Redis中计数，所有API进程和Worker共享同一额度
+    - 冷却：收到429后在Redis中设置冷却标记，所有进程在冷却期内暂停使用该提供商
+    - 并发：按AIMD调整进程内并发上限，延迟正常时缓慢增加，出错或变慢时减半
+    """
+
+    def __init__(
+        self,
+        rpm_limits: Optional[Dict[str, int]] = None,
+        tpm_limits: Optional[Dict[str, int]] = None,
+        initial_concurrency: int = 4,
+        min_concurrency: int = 1,
+        max_concurrency: int = 32,
+        target_latency: float = 45.0,
+        cooldown_seconds: int = 30
+    ):
+        """
+        初始化限流器
+
+        Args:
+            rpm_limits: 各提供商每分钟请求数上限
+            tpm_limits: 各提供商每分钟token数上限
+            initial_concurrency: 初始并发上限
+            min_concurrency: 最小并发上限
+            max_concurrency: 最大并发上限
+            target_latency: 目标延迟（秒），超过时降低并发
+            cooldown_seconds: 收到限流错误后的冷却时间（秒）
+        """
+        self.rpm_limits = rpm_limits or {}
+        self.tpm_limits = tpm_limits or {}
+        self.initial_concurrency = initial_concurrency
+        self.min_concurrency = min_concurrency
+        self.max_concurrency = max_concurrency
+        self.target_latency = target_latency
+        self.cooldown_seconds = cooldown_seconds
+        self._states: Dict[str, _ProviderState] = {}
+        self.stats = get_counter("llm", ratios={"error_rate": (("errors",), ("calls",))})
+
+    def _state(self, provider: str) -> _ProviderState:
+        if provider not in self._states:
+            self._states[provider] = _ProviderState(self.initial_concurrency)
+        return self._states[provider]
+
+    async def try_acquire(self, provider: str, estimated_tokens: int) -> bool:
+        """
+        尝试获取一次调用额度，不等待
+
+        Args:
+            provider: AI提供商
+            estimated_tokens: 预计消耗的token数（输入+输出）
+
+        Returns:
+            bool: 是否获取成功，失败表示该提供商当前已饱和
+        """
+        state = self._state(provider)
+        if state.in_flight >= int(state.concurrency):
+            return False
+
+        # 占用进程内并发名额后再检查全局额度，避免并发检查时超发
+        state.in_flight += 1
+        try:
+            if not await self._reserve_window(provider, estimated_tokens):
+                state.in_flight -= 1
+                return False
+        except Exception:
+            state.in_flight -= 1
+            raise
+        return True
+
+    async def release(self, provider: str, latency: Optional[float] = None, error: Optional[Exception] = None):
+        """
+        释放调用额度并按结果调整并发上限
+
+        Args:
+            provider: AI提供商
+            latency: 调用耗时（秒），成功时提供
+            error: 调用失败时的异常
+        """
+        state = self._state(provider)
+        state.in_flight = max(state.in_flight - 1, 0)
+        await self.stats.incr("calls")
+
+        if error is None:
+            if latency is not None and latency > self.target_latency:
+                self._decrease(provider, state, f"延迟 {latency:.1f}s 超过目标")
+            else:
+                # 加性增：每完成约一个并发上限数量的调用，上限加1
+                state.concurrency = min(state.concurrency + 1 / max(state.concurrency, 1), self.max_concurrency)
+            return
+
+        await self.stats.incr("errors")
+        if is_retryable_error(error):
+            self._decrease(provider, state, f"{type(error).__name__}")
+        if is_rate_limit_error(error):
+            await self.stats.incr("rate_limited")
+            await self._start_cooldown(provider)
+
+    def _decrease(self, provider: str, state: _ProviderState, reason: str):
+        """乘性减：并发上限减半"""
+        previous = state.concurrency
+        state.concurrency = max(state.concurrency / 2, self.min_concurrency)
+        if int(previous) != int(state.concurrency):
+            logger.warning(f"{provider} 并发上限由 {int(previous)} 降为 {int(state.concurrency)}（{reason}）")
+
+    async def _reserve_window(self, provider: str, estimated_tokens: int) -> bool:
+        """在Redis的分钟窗口中预留请求数和token数，超出限额或处于冷却期时返回False"""
+        rpm = self.rpm_limits.get(provider)
+        tpm = self.tpm_limits.get(provider)
+        try:
+            redis = get_redis()
+            if await redis.exists(f"llm_cooldown:{provider}"):
+                return False
+            if not rpm and not tpm:
+                return True
+
+            key = f"llm_rate:{provider}:{int(time.time() // 60)}"
+            pipe = redis.pipeline()
+            pipe.hincrby(key, "requests", 1)
+            pipe.hincrby(key, "tokens", estimated_tokens)
+            pipe.expire(key, 120)
+            requests, tokens, _ = await pipe.execute()
+            if (rpm and requests > rpm) or (tpm and tokens > tpm):
+                # 回滚本次预留
+                pipe = redis.pipeline()
+                pipe.hincrby(key, "requests", -1)
+                pipe.hincrby(key, "tokens", -estimated_tokens)
+                await pipe.execute()
+                return False
+            return True
+        except Exception as e:
+            # Redis不可用时只依靠进程内并发控制
+            logger.debug(f"检查LLM调用额度失败: {e}")
+            return True
+
+    async def _start_cooldown(self, provider: str):
+        """设置全局冷却标记"""
+        logger.warning(f"{provider} 返回限流错误，暂停使用 {self.cooldown_seconds} 秒")
+        try:
+            await get_redis().set(f"llm_cooldown:{provider}", "1", ex=self.cooldown_seconds)
+        except Exception as e:
+            logger.debug(f"设置LLM冷却标记失败: {e}")
+
+    def snapshot(self) -> Dict[str, Any]:
+        """获取当前进程内各提供商的并发状态"""
+        return {
+            provider: {"concurrency_limit": int(state.concurrency), "in_flight": state.in_flight}
+            for provider, state in self._states.items()
+        }
+
+# 创建默认限流器实例
+default_rate_limiter = AdaptiveRateLimiter(
+    rpm_limits=settings.LLM_RPM_LIMITS,
+    tpm_limits=settings.LLM_TPM_LIMITS,
+    initial_concurrency=settings.LLM_INITIAL_CONCURRENCY,
+    min_concurrency=settings.LLM_MIN_CONCURRENCY,
+    max_concurrency=settings.LLM_MAX_CONCURRENCY,
+    target_latency=settings.LLM_TARGET_LATENCY,
+    cooldown_seconds=settings.LLM_COOLDOWN_SECONDS
+)
@@ -1,26 +1,69 @@
-from langchain_community.chat_models import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import PydanticOutputParser
-from langchain_core.output_parsers.base import BaseOutputParser
 from pydantic import BaseModel, Field
-from typing import Dict, Any, List, Optional
-import json
+from typing import Dict, Any, List, Optional, Callable, Awaitable, Tuple
+from functools import lru_cache, cached_property
+import time
+import asyncio
 import logging
 from app.core.config import settings
+from app.core.metrics import get_counter
+from app.services.analyzer.analysis_cache import AnalysisCache, analysis_cache
+from app.services.analyzer.prefilter import ResumePreFilter, PreFilterOutcome, default_prefilter
+from app.services.analyzer.resume_compactor import ResumeCompactor, default_compactor
+from app.services.analyzer.streaming import StreamingFieldExtractor
+from app.services.analyzer.output_parser import loads_lenient, get_type_adapter
+from app.services.analyzer.rate_limiter import (
+    AdaptiveRateLimiter, LLMUnavailableError, CAPACITY_POLL_INTERVAL, default_rate_limiter, is_retryable_error
+)
 
-# 如果指定了智谱AI，导入相关包
-try:
-    import zhipuai
-    from langchain_community.llms import Zhipu
-    ZHIPUAI_AVAILABLE = True
-except ImportError:
-    ZHIPUAI_AVAILABLE = False
-    logging.warning("智谱AI包未安装，无法使用智谱AI模型")
-
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+@lru_cache(maxsize=None)
+def zhipuai_available() -> bool:
+    """智谱AI相关包是否已安装（首次需要时才导入）"""
+    try:
+        import zhipuai
+        from langchain_community.llms import Zhipu
+        return True
+    except ImportError:
+        logger.warning("智谱AI包未安装，无法使用智谱AI模型")
+        return False
+
+# LLM单次输出的最大token数
+MAX_OUTPUT_TOKENS = 3000
+
+# 提示模板版本，修改提示模板或结果结构时需要更新，使旧的缓存结果失效
+PROMPT_VERSION = "v1"
+
+# 系统提示（花括号需要转义，避免被提示模板当作变量）
+SYSTEM_PROMPT = """
+            你是一位专业的人力资源专家，擅长分析简历并匹配职位要求。
+            你的任务是详细分析简历内容，并根据给定的职位要求评估候选人是否合适。
+            请提供详细的分析和理由，而不是简单的是/否答案。
+            
+            你的分析应该包括：
+            1. 技能匹配度：候选人是否具备所需的技术和软技能
+            2. 工作经验：候选人的经验是否符合要求的年限和相关度
+            3. 教育背景：候选人的学历是否符合要求
+            4. 优势分析：候选人的突出优势
+            5. 不足分析：候选人的潜在不足
+            6. 总体匹配度评分和详细理由
+            
+            请以JSON格式返回分析结果，遵循以下结构：
+            ```
+            {{
+                "matches_requirements": bool, // 整体是否符合要求
+                "match_score": float, // 匹配度评分(0-100)
+                "reasoning": string, // 详细分析原因
+                "skills_match": {{}}, // 各项技能的匹配情况
+                "experience_match": bool, // 工作经验是否匹配
+                "education_match": bool, // 教育背景是否匹配
+                "strengths": [], // 候选人优势列表
+                "weaknesses": [], // 候选人不足列表
+                "summary": string // 总结评价
+            }}
+            ```
+            """
+
 class ResumeAnalysisResult(BaseModel):
     """简历分析结果模型"""
     matches_requirements: bool = Field(description="简历是否符合要求")
@@ -32,52 +75,89 @@ class ResumeAnalysisResult(BaseModel):
     strengths: List[str] = Field(description="候选人的优势")
     weaknesses: List[str] = Field(description="候选人的不足")
     summary: str = Field(description="总结评价")
+    pre_filtered: bool = Field(default=False, description="是否在预筛选阶段被淘汰（未调用AI分析）")
+    failed: bool = Field(default=False, description="分析是否出错（0分的默认结果，不写入缓存，可以重试）")
 
-class PydanticParser(BaseOutputParser):
+class PydanticParser:
     """输出解析器，将LLM输出解析为ResumeAnalysisResult对象"""
     
-    def __init__(self):
-        super().__init__()
-        self._pydantic_parser = PydanticOutputParser(pydantic_object=ResumeAnalysisResult)
-    
     def parse(self, text: str) -> ResumeAnalysisResult:
         try:
-            # 尝试直接解析JSON格式
-            if text.startswith("{") and text.endswith("}"):
-                try:
-                    json_obj = json.loads(text)
-                    # 根据Pydantic版本使用不同的方法
-                    try:
-                        # Pydantic V2
-                        return ResumeAnalysisResult.model_validate(json_obj)
-                    except AttributeError:
-                        # Pydantic V1
-                        return ResumeAnalysisResult.parse_obj(json_obj)
-                except json.JSONDecodeError:
-                    pass
-            
-            # 回退到Pydantic解析器
-            return self._pydantic_parser.parse(text)
+            return self.parse_strict(text)
         except Exception as e:
-            logger.error(f"解析LLM输出失败: {e}")
-            logger.error(f"原始文本: {text}")
-            # 如果解析失败，创建一个默认结果
-            return ResumeAnalysisResult(
-                matches_requirements=False,
-                match_score=0.0,
-                reasoning=f"解析AI输出时出错: {str(e)}",
-                skills_match={},
-                experience_match=False,
-                education_match=False,
-                strengths=[],
-                weaknesses=["无法正确解析简历"],
-                summary="解析错误，请重试"
-            )
+            return self.fallback_result(e, text)
+    
+    def parse_strict(self, text: str) -> ResumeAnalysisResult:
+        """解析LLM输出（自动提取代码块中的JSON并修复常见格式问题），失败时抛出异常"""
+        return self.validate(loads_lenient(text, "{"))
+    
+    @staticmethod
+    def validate(data: Any) -> ResumeAnalysisResult:
+        """通过缓存的TypeAdapter校验解析后的数据"""
+        return get_type_adapter(ResumeAnalysisResult).validate_python(data)
+    
+    def parse_batch(self, text: str, expected_refs: List[str]) -> Dict[str, ResumeAnalysisResult]:
+        """
+        解析批量分析的输出（JSON数组，每项带resume_ref字段）
+        
+        Args:
+            text: LLM输出文本
+            expected_refs: 本次打包的简历编号
+            
+        Returns:
+            Dict[str, ResumeAnalysisResult]: 简历编号 -> 校验通过的结果，缺失或校验失败的简历不包含在内
+        """
+        items = loads_lenient(text, "[")
+        if not isinstance(items, list):
+            raise ValueError("批量分析输出中没有JSON数组")
+        
+        results: Dict[str, ResumeAnalysisResult] = {}
+        for item in items:
+            if not isinstance(item, dict):
+                continue
+            ref = str(item.pop("resume_ref", "")).strip()
+            if ref not in expected_refs or ref in results:
+                continue
+            try:
+                results[ref] = self.validate(item)
+            except Exception as e:
+                logger.warning(f"批量分析结果校验失败 ({ref}): {e}")
+        return results
+    
+    def fallback_result(self, error: Exception, text: str) -> ResumeAnalysisResult:
+        """解析失败时创建一个默认结果"""
+        logger.error(f"解析LLM输出失败: {error}")
+        logger.error(f"原始文本: {text}")
+        return ResumeAnalysisResult(
+            matches_requirements=False,
+            match_score=0.0,
+            reasoning=f"解析AI输出时出错: {str(error)}",
+            skills_match={},
+            experience_match=False,
+            education_match=False,
+            strengths=[],
+            weaknesses=["无法正确解析简历"],
+            summary="解析错误，请重试",
+            failed=True
+        )
 
 class ResumeAnalyzer:
     """简历分析器，使用AI评估简历是否符合要求"""
     
-    def __init__(self, api_key: str = None, model_name: str = None, provider: str = None):
+    def __init__(
+        self,
+        api_key: str = None,
+        model_name: str = None,
+        provider: str = None,
+        cache: AnalysisCache = None,
+        prefilter: ResumePreFilter = None,
+        compactor: ResumeCompactor = None,
+        batch_max_resumes: int = None,
+        batch_token_budget: int = None,
+        batch_short_resume_tokens: int = None,
+        rate_limiter: AdaptiveRateLimiter = None,
+        failover_enabled: bool = None
+    ):
         """
         初始化简历分析器
         
@@ -85,60 +165,43 @@ class ResumeAnalyzer:
             api_key: API密钥
             model_name: 使用的模型名称
             provider: AI提供商，支持 'openai' 和 'zhipuai'
+            cache: 分析结果缓存，默认使用全局缓存实例
+            prefilter: 规则预筛选器，默认使用全局预筛选器
+            compactor: 简历压缩器，默认使用全局压缩器
+            batch_max_resumes: 批量分析时一次LLM调用最多打包的简历数
+            batch_token_budget: 批量分析时一次LLM调用中简历内容的token预算
+            batch_short_resume_tokens: 不超过该token数的简历才参与打包
+            rate_limiter: LLM限流器，默认使用全局限流器
+            failover_enabled: 主提供商饱和或失败时是否切换到另一个提供商
         """
         self.api_key = api_key or (settings.OPENAI_API_KEY if settings.AI_PROVIDER == "openai" else settings.ZHIPUAI_API_KEY)
         self.model_name = model_name or (settings.OPENAI_MODEL if settings.AI_PROVIDER == "openai" else settings.ZHIPUAI_MODEL)
         self.provider = provider or settings.AI_PROVIDER
         self.output_parser = PydanticParser()
+        self.cache = cache if cache is not None else analysis_cache
+        self.prefilter = prefilter if prefilter is not None else default_prefilter
+        self.compactor = compactor if compactor is not None else default_compactor
+        self.batch_max_resumes = batch_max_resumes or settings.ANALYSIS_BATCH_MAX_RESUMES
+        self.batch_token_budget = batch_token_budget or settings.ANALYSIS_BATCH_TOKEN_BUDGET
+        self.batch_short_resume_tokens = batch_short_resume_tokens or settings.ANALYSIS_BATCH_SHORT_RESUME_TOKENS
+        self.batch_stats = get_counter("batching")
         
-        # 初始化LLM
-        if self.provider == "openai":
-            self.llm = ChatOpenAI(
-                model_name=self.model_name,
-                openai_api_key=self.api_key,
-                temperature=0.2,
-                max_tokens=3000
-            )
-        elif self.provider == "zhipuai" and ZHIPUAI_AVAILABLE:
-            self.llm = Zhipu(
-                model_name=self.model_name,
-                temperature=0.2,
-                zhipuai_api_key=self.api_key,
-                max_tokens=3000
-            )
-        else:
-            raise ValueError(f"不支持的AI提供商: {self.provider}")
-        
-        # 创建提示模板
-        self.prompt_template = ChatPromptTemplate.from_messages([
-            ("system", """
-            你是一位专业的人力资源专家，擅长分析简历并匹配职位要求。
-            你的任务是详细分析简历内容，并根据给定的职位要求评估候选人是否合适。
-            请提供详细的分析和理由，而不是简单的是/否答案。
-            
-            你的分析应该包括：
-            1. 技能匹配度：候选人是否具备所需的技术和软技能
-            2. 工作经验：候选人的经验是否符合要求的年限和相关度
-            3. 教育背景：候选人的学历是否符合要求
-            4. 优势分析：候选人的突出优势
-            5. 不足分析：候选人的潜在不足
-            6. 总体匹配度评分和详细理由
-            
-            请以JSON格式返回分析结果，遵循以下结构：
-            ```
-            {
-                "matches_requirements": bool, // 整体是否符合要求
-                "match_score": float, // 匹配度评分(0-100)
-                "reasoning": string, // 详细分析原因
-                "skills_match": {}, // 各项技能的匹配情况
-                "experience_match": bool, // 工作经验是否匹配
-                "education_match": bool, // 教育背景是否匹配
-                "strengths": [], // 候选人优势列表
-                "weaknesses": [], // 候选人不足列表
-                "summary": string // 总结评价
-            }
-            ```
-            """),
+        # LLM客户端在首次调用或预热时创建，避免导入和构造分析器时加载langchain
+        self.rate_limiter = rate_limiter if rate_limiter is not None else default_rate_limiter
+        self.failover_enabled = settings.LLM_FAILOVER_ENABLED if failover_enabled is None else failover_enabled
+        self._llms: Dict[str, Any] = {}
+    
+    @property
+    def llm(self):
+        """主提供商的LLM客户端"""
+        return self._get_llm(self.provider)
+    
+    @cached_property
+    def prompt_template(self):
+        """单份简历分析的提示模板"""
+        from langchain_core.prompts import ChatPromptTemplate
+        return ChatPromptTemplate.from_messages([
+            ("system", SYSTEM_PROMPT),
             ("human", """
             ## 职位要求
             {requirements}
@@ -149,37 +212,267 @@ class ResumeAnalyzer:
             请分析这份简历是否符合上述职位要求，并提供详细分析。
             """)
         ])
+    
+    @cached_property
+    def batch_prompt_template(self):
+        """批量分析提示模板：多份简历共用一次系统提示和职位要求"""
+        from langchain_core.prompts import ChatPromptTemplate
+        return ChatPromptTemplate.from_messages([
+            ("system", SYSTEM_PROMPT),
+            ("human", """
+            ## 职位要求
+            {requirements}
+            
+            ## 简历列表
+            以下共有 {resume_count} 份简历，每份以"### 简历编号: <编号>"开头。
+            
+            {resumes}
+            
+            请分别分析每份简历是否符合上述职位要求。以JSON数组返回，每份简历对应数组中的一个对象，
+            对象包含"resume_ref"字段（简历编号）以及上述分析结果的全部字段，不要遗漏任何简历。
+            """)
+        ])
         
-    async def analyze_resume(self, resume_content: str, requirements: Dict[str, Any]) -> ResumeAnalysisResult:
+    async def analyze_resume(
+        self,
+        resume_content: str,
+        requirements: Dict[str, Any],
+        progress_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None,
+        fields: Optional[Dict[str, Any]] = None
+    ) -> ResumeAnalysisResult:
         """
         分析简历是否符合要求
         
         Args:
             resume_content: 简历内容文本
             requirements: 职位要求信息
+            progress_callback: 进度回调，提供时以流式方式调用LLM，并在每个字段解析完成后回调
+            fields: 解析时提取的结构化字段，供规则预筛选使用
             
         Returns:
             ResumeAnalysisResult: 分析结果
         """
+        prepared = await self.prepare_analysis(resume_content, requirements, fields)
+        return await self.complete_analysis(prepared, progress_callback)
+    
+    async def prepare_analysis(
+        self,
+        resume_content: str,
+        requirements: Dict[str, Any],
+        fields: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        """
+        分析的准备阶段（以CPU计算为主）：规则预筛选、查询缓存和压缩简历内容
+        
+        Args:
+            resume_content: 简历内容文本
+            requirements: 职位要求信息
+            fields: 解析时提取的结构化字段，供规则预筛选使用
+            
+        Returns:
+            Dict: 可JSON序列化的准备结果。已得出结论（未通过预筛选或命中缓存）时包含result，
+                  否则包含cache_key、压缩后的content和格式化的requirements，交给complete_analysis调用LLM
+        """
+        # 规则预筛选，明显不符合要求的简历不调用LLM
+        prefilter_outcome = await self.prefilter.evaluate(resume_content, requirements, fields)
+        if prefilter_outcome is not None and not prefilter_outcome.passed:
+            return {"result": self._prefiltered_result(prefilter_outcome).dict()}
         
         # 将要求转换为结构化文本
         formatted_requirements = self._format_requirements(requirements)
         
-        try:
-            # 准备提示
-            chain = self.prompt_template | self.llm
+        # 查询缓存，命中时不再调用LLM
+        cache_key = self.cache.build_key(
+            resume_content, formatted_requirements, self.provider, self.model_name, PROMPT_VERSION
+        )
+        cached_result = await self.cache.get(cache_key)
+        if cached_result is not None:
+            logger.info(f"命中分析结果缓存: {cache_key[:12]}")
+            return {"result": cached_result}
+        
+        # 压缩简历内容，减少提示token数
+        compaction = self.compactor.compact(resume_content, self.provider, self.model_name)
+        await self.compactor.report(compaction)
+        
+        return {"cache_key": cache_key, "content": compaction.content, "requirements": formatted_requirements}
+    
+    async def complete_analysis(
+        self,
+        prepared: Dict[str, Any],
+        progress_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> ResumeAnalysisResult:
+        """
+        分析的LLM阶段（以I/O等待为主）：根据prepare_analysis的结果调用LLM
+        
+        Args:
+            prepared: prepare_analysis的返回值
+            progress_callback: 进度回调
+            
+        Returns:
+            ResumeAnalysisResult: 分析结果
+        """
+        if "result" in prepared:
+            return ResumeAnalysisResult(**prepared["result"])
+        return await self._analyze_compacted(
+            prepared["cache_key"], prepared["content"], prepared["requirements"], progress_callback
+        )
+    
+    async def analyze_resumes_batch(
+        self,
+        resumes: List[Dict[str, Any]],
+        requirements: Dict[str, Any]
+    ) -> Dict[str, ResumeAnalysisResult]:
+        """
+        批量分析多份简历：短简历按token预算打包到同一次LLM调用中，
+        打包结果校验失败的简历回退为单独调用
+        
+        Args:
+            resumes: 简历列表，每项包含 id 和 content，可选包含解析时提取的结构化字段 fields
+            requirements: 职位要求信息
+            
+        Returns:
+            Dict[str, ResumeAnalysisResult]: 简历ID -> 分析结果
+        """
+        results: Dict[str, ResumeAnalysisResult] = {}
+        formatted_requirements = self._format_requirements(requirements)
+        
+        # 预筛选、查询缓存、压缩，剩下的简历需要调用LLM
+        pending = []
+        for resume in resumes:
+            prefilter_outcome = await self.prefilter.evaluate(resume["content"], requirements, resume.get("fields"))
+            if prefilter_outcome is not None and not prefilter_outcome.passed:
+                results[resume["id"]] = self._prefiltered_result(prefilter_outcome)
+                continue
             
+            cache_key = self.cache.build_key(
+                resume["content"], formatted_requirements, self.provider, self.model_name, PROMPT_VERSION
+            )
+            cached_result = await self.cache.get(cache_key)
+            if cached_result is not None:
+                results[resume["id"]] = ResumeAnalysisResult(**cached_result)
+                continue
+            
+            compaction = self.compactor.compact(resume["content"], self.provider, self.model_name)
+            await self.compactor.report(compaction)
+            pending.append({
+                "id": resume["id"],
+                "cache_key": cache_key,
+                "content": compaction.content,
+                "tokens": compaction.compacted_tokens
+            })
+        
+        # 打包短简历，长简历单独调用
+        singles = [item for item in pending if item["tokens"] > self.batch_short_resume_tokens]
+        for group in self._pack_resumes([item for item in pending if item["tokens"] <= self.batch_short_resume_tokens]):
+            if len(group) == 1:
+                singles.extend(group)
+                continue
+            
+            packed_results = await self._analyze_packed(group, formatted_requirements)
+            for item in group:
+                if item["id"] in packed_results:
+                    results[item["id"]] = packed_results[item["id"]]
+                else:
+                    singles.append(item)
+                    await self.batch_stats.incr("fallback_resumes")
+        
+        for item in singles:
+            results[item["id"]] = await self._analyze_compacted(item["cache_key"], item["content"], formatted_requirements)
+        
+        return results
+    
+    def _pack_resumes(self, items: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """按顺序将简历装入分组，每组的总token数不超过预算，且简历数不超过上限"""
+        groups: List[List[Dict[str, Any]]] = []
+        current: List[Dict[str, Any]] = []
+        current_tokens = 0
+        for item in items:
+            if current and (current_tokens + item["tokens"] > self.batch_token_budget or len(current) >= self.batch_max_resumes):
+                groups.append(current)
+                current, current_tokens = [], 0
+            current.append(item)
+            current_tokens += item["tokens"]
+        if current:
+            groups.append(current)
+        return groups
+    
+    async def _analyze_packed(
+        self,
+        group: List[Dict[str, Any]],
+        formatted_requirements: str
+    ) -> Dict[str, ResumeAnalysisResult]:
+        """
+        在一次LLM调用中分析一组简历，校验通过的结果写入缓存
+        
+        Returns:
+            Dict[str, ResumeAnalysisResult]: 校验通过的结果，调用或校验失败时为空
+            
+        Raises:
+            LLMUnavailableError: 在等待时间内所有提供商都不可用
+        """
+        # 使用短编号代替数据库ID，避免模型抄写长ID出错
+        refs = {f"R{index + 1}": item["id"] for index, item in enumerate(group)}
+        resumes_text = "\n\n".join(
+            f"### 简历编号: {ref}\n{item['content']}" for ref, item in zip(refs, group)
+        )
+        
+        try:
+            response_text, provider = await self._invoke_llm(
+                self.batch_prompt_template,
+                {
+                    "requirements": formatted_requirements,
+                    "resume_count": len(group),
+                    "resumes": resumes_text
+                },
+                estimated_tokens=sum(item["tokens"] for item in group) + self._prompt_overhead_tokens(formatted_requirements)
+            )
+            parsed = self.output_parser.parse_batch(response_text, list(refs))
+        except LLMUnavailableError:
+            # 提供商全部不可用时逐份单独调用只会为每份简历再等待一次，直接交给调用方重试
+            raise
+        except Exception as e:
+            logger.warning(f"批量分析失败，{len(group)} 份简历将单独分析: {e}")
+            parsed = {}
+        
+        await self.batch_stats.incr("packed_calls")
+        await self.batch_stats.incr("packed_resumes", len(parsed))
+        results = {refs[ref]: result for ref, result in parsed.items()}
+        for item in group:
+            if item["id"] in results:
+                await self._cache_result(item["cache_key"], results[item["id"]], provider)
+        return results
+    
+    async def _analyze_compacted(
+        self,
+        cache_key: str,
+        resume_content: str,
+        formatted_requirements: str,
+        progress_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> ResumeAnalysisResult:
+        """调用LLM分析一份已压缩的简历，成功的结果写入缓存"""
+        try:
             # 发送到LLM
-            response = await chain.ainvoke({
+            prompt_input = {
                 "resume_content": resume_content,
                 "requirements": formatted_requirements
-            })
-            
-            # 解析结果
-            analysis_result = self.output_parser.parse(response.content)
+            }
+            response_text, provider = await self._invoke_llm(
+                self.prompt_template,
+                prompt_input,
+                estimated_tokens=self.compactor.count_tokens(resume_content, self.model_name)
+                + self._prompt_overhead_tokens(formatted_requirements),
+                progress_callback=progress_callback
+            )
             
-            return analysis_result
+            # 解析结果，解析失败的结果（failed=True）不写入缓存
+            try:
+                analysis_result = self.output_parser.parse_strict(response_text)
+            except Exception as e:
+                return self.output_parser.fallback_result(e, response_text)
             
+        except LLMUnavailableError:
+            # 提供商全部不可用时不生成0分结果，交给调用方返回503或稍后重试
+            raise
         except Exception as e:
             logger.error(f"简历分析过程中出错: {e}")
             # 返回默认失败结果
@@ -192,8 +485,197 @@ class ResumeAnalyzer:
                 education_match=False,
                 strengths=[],
                 weaknesses=["分析过程出错"],
-                summary="无法完成分析，请重试"
+                summary="无法完成分析，请重试",
+                failed=True
             )
+        
+        await self._cache_result(cache_key, analysis_result, provider)
+        return analysis_result
+    
+    async def _cache_result(self, cache_key: str, analysis_result: ResumeAnalysisResult, provider: str):
+        """写入分析结果缓存。缓存键按主提供商和模型生成，备用提供商给出的结果不写入，避免在整个有效期内冒充主模型的结果"""
+        if provider != self.provider:
+            logger.info(f"分析结果由备用提供商 {provider} 给出，不写入缓存")
+            return
+        await self.cache.set(cache_key, analysis_result.dict())
+            
+    async def _invoke_llm(
+        self,
+        prompt_template,
+        prompt_input: Dict[str, Any],
+        estimated_tokens: int,
+        progress_callback: Optional[Callable[[Dict[str, Any]], Awaitable[None]]] = None
+    ) -> Tuple[str, str]:
+        """
+        在限流器控制下调用LLM，主提供商饱和或出现限流、超时等错误时切换到备用提供商
+        
+        Returns:
+            Tuple[str, str]: (LLM输出文本, 实际给出结果的提供商)
+            
+        Raises:
+            LLMUnavailableError: 在等待时间内所有提供商都不可用
+        """
+        deadline = time.monotonic() + settings.LLM_ACQUIRE_TIMEOUT
+        last_error: Optional[Exception] = None
+        
+        while True:
+            for index, provider in enumerate(self._provider_order()):
+                if not await self.rate_limiter.try_acquire(provider, estimated_tokens):
+                    continue
+                if index > 0:
+                    logger.warning(f"主提供商 {self.provider} 不可用，切换到 {provider}")
+                    await self.rate_limiter.stats.incr("failovers")
+                
+                chain = prompt_template | self._get_llm(provider)
+                started = time.monotonic()
+                try:
+                    if progress_callback is None:
+                        response = await asyncio.wait_for(chain.ainvoke(prompt_input), settings.LLM_REQUEST_TIMEOUT)
+                        # 聊天模型返回消息，普通LLM直接返回字符串
+                        response_text = getattr(response, "content", response)
+                    else:
+                        response_text = await asyncio.wait_for(
+                            self._stream_llm(chain, prompt_input, progress_callback),
+                            settings.LLM_REQUEST_TIMEOUT
+                        )
+                except Exception as e:
+                    await self.rate_limiter.release(provider, error=e)
+                    if not is_retryable_error(e):
+                        raise
+                    logger.warning(f"{provider} 调用失败，尝试其他提供商: {e}")
+                    last_error = e
+                    continue
+                
+                await self.rate_limiter.release(provider, latency=time.monotonic() - started)
+                return response_text, provider
+            
+            if time.monotonic() >= deadline:
+                raise LLMUnavailableError(f"所有AI提供商暂时不可用: {last_error or '调用额度已用尽'}")
+            await self.rate_limiter.stats.incr("saturated_waits")
+            await asyncio.sleep(CAPACITY_POLL_INTERVAL)
+    
+    def _provider_order(self) -> List[str]:
+        """返回可用的提供商顺序：主提供商在前，启用故障转移且已配置时追加备用提供商"""
+        providers = [self.provider]
+        if self.failover_enabled:
+            for provider, api_key in (("openai", settings.OPENAI_API_KEY), ("zhipuai", settings.ZHIPUAI_API_KEY)):
+                if provider in providers or not api_key:
+                    continue
+                if provider == "zhipuai" and not zhipuai_available():
+                    continue
+                providers.append(provider)
+        return providers
+    
+    def _get_llm(self, provider: str):
+        """获取（或创建）指定提供商的LLM"""
+        if provider not in self._llms:
+            if provider == self.provider:
+                self._llms[provider] = self._build_llm(provider, self.api_key, self.model_name)
+            elif provider == "openai":
+                self._llms[provider] = self._build_llm(provider, settings.OPENAI_API_KEY, settings.OPENAI_MODEL)
+            else:
+                self._llms[provider] = self._build_llm(provider, settings.ZHIPUAI_API_KEY, settings.ZHIPUAI_MODEL)
+        return self._llms[provider]
+    
+    def _build_llm(self, provider: str, api_key: str, model_name: str):
+        """创建LLM客户端"""
+        if provider == "openai":
+            from langchain_community.chat_models import ChatOpenAI
+            return ChatOpenAI(
+                model_name=model_name,
+                openai_api_key=api_key,
+                temperature=0.2,
+                max_tokens=MAX_OUTPUT_TOKENS
+            )
+        elif provider == "zhipuai" and zhipuai_available():
+            from langchain_community.llms import Zhipu
+            return Zhipu(
+                model_name=model_name,
+                temperature=0.2,
+                zhipuai_api_key=api_key,
+                max_tokens=MAX_OUTPUT_TOKENS
+            )
+        else:
+            raise ValueError(f"不支持的AI提供商: {provider}")
+    
+    async def warm_up(self, timeout: float = 10.0):
+        """
+        预热分析器：创建各提供商的LLM客户端和提示模板，加载tiktoken编码，
+        并通过一次轻量请求预先建立到OpenAI的HTTP连接。需要在处理请求的事件循环中调用。
+        
+        Args:
+            timeout: 建立连接的超时时间（秒）
+        """
+        started = time.monotonic()
+        providers = self._provider_order()
+        llms = [self._get_llm(provider) for provider in providers]
+        # 首次访问时创建提示模板
+        _ = self.prompt_template, self.batch_prompt_template
+        
+        model_names = [self.model_name] + [getattr(llm, "model_name", None) for llm in llms]
+        await asyncio.to_thread(self.compactor.warm_up, [name for name in model_names if name])
+        
+        for provider, llm in zip(providers, llms):
+            # ChatOpenAI的异步客户端挂在async_client上，列出模型即可打开连接池中的连接
+            client = getattr(getattr(llm, "async_client", None), "_client", None)
+            if client is None:
+                continue
+            try:
+                await asyncio.wait_for(client.models.list(), timeout)
+            except Exception as e:
+                logger.warning(f"预先建立 {provider} 连接失败: {e}")
+        
+        logger.info(f"分析器预热完成，提供商: {', '.join(providers)}，耗时 {time.monotonic() - started:.2f}s")
+    
+    def _prompt_overhead_tokens(self, formatted_requirements: str) -> int:
+        """估算系统提示、职位要求和输出占用的token数"""
+        return self.compactor.count_tokens(SYSTEM_PROMPT + formatted_requirements, self.model_name) + MAX_OUTPUT_TOKENS
+    
+    async def _stream_llm(
+        self,
+        chain,
+        prompt_input: Dict[str, Any],
+        progress_callback: Callable[[Dict[str, Any]], Awaitable[None]]
+    ) -> str:
+        """以流式方式调用LLM，每当一个字段输出完成就通过回调推送，返回完整输出文本"""
+        await progress_callback({"stage": "started"})
+        
+        extractor = StreamingFieldExtractor()
+        chunks = []
+        async for chunk in chain.astream(prompt_input):
+            # 聊天模型返回消息块，普通LLM直接返回字符串
+            text = getattr(chunk, "content", chunk)
+            chunks.append(text)
+            for field, value in extractor.feed(text):
+                try:
+                    await progress_callback({"stage": "partial", "field": field, "value": value})
+                except Exception as e:
+                    logger.warning(f"推送分析进度失败: {e}")
+        
+        return "".join(chunks)
+    
+    def _prefiltered_result(self, outcome: PreFilterOutcome) -> ResumeAnalysisResult:
+        """根据预筛选结果合成分析结果"""
+        weaknesses = []
+        if outcome.missing_skills:
+            weaknesses.append(f"缺少要求的技能: {', '.join(outcome.missing_skills)}")
+        if outcome.education_match is False:
+            weaknesses.append("教育背景不符合要求")
+        if outcome.experience_match is False:
+            weaknesses.append(f"工作经验不足（约{outcome.experience_years}年）")
+        
+        return ResumeAnalysisResult(
+            matches_requirements=False,
+            match_score=outcome.score,
+            reasoning=f"规则预筛选评分 {outcome.score} 低于阈值 {self.prefilter.threshold}，未进行AI分析",
+            skills_match=outcome.skills_match,
+            experience_match=bool(outcome.experience_match),
+            education_match=bool(outcome.education_match),
+            strengths=[name for name, matched in outcome.skills_match.items() if matched],
+            weaknesses=weaknesses,
+            summary="未通过预筛选",
+            pre_filtered=True
+        )
             
     def _format_requirements(self, requirements: Dict[str, Any]) -> str:
         """将要求字典转换为格式化文本"""
@@ -223,29 +705,21 @@ class ResumeAnalyzer:
             
         return formatted
 
-# 创建默认分析器实例，添加异常处理
-try:
+_default_analyzer: Optional[ResumeAnalyzer] = None
+
+def create_default_analyzer() -> ResumeAnalyzer:
+    """根据配置创建分析器，配置错误时直接抛出异常"""
     if settings.AI_PROVIDER == "openai":
-        default_analyzer = ResumeAnalyzer(api_key=settings.OPENAI_API_KEY, model_name=settings.OPENAI_MODEL, provider="openai")
-    elif settings.AI_PROVIDER == "zhipuai" and ZHIPUAI_AVAILABLE:
-        default_analyzer = ResumeAnalyzer(api_key=settings.ZHIPUAI_API_KEY, model_name=settings.ZHIPUAI_MODEL, provider="zhipuai")
-    else:
-        # 回退到OpenAI
-        logger.warning(f"不支持的AI提供商配置 {settings.AI_PROVIDER}，回退到OpenAI")
-        default_analyzer = ResumeAnalyzer(api_key=settings.OPENAI_API_KEY, model_name=settings.OPENAI_MODEL, provider="openai")
-except Exception as e:
-    logger.error(f"初始化分析器失败: {e}")
-    # 创建一个空的分析器，避免应用启动失败
-    from unittest.mock import AsyncMock
-    default_analyzer = AsyncMock()
-    default_analyzer.analyze_resume = AsyncMock(return_value=ResumeAnalysisResult(
-        matches_requirements=False,
-        match_score=0.0,
-        reasoning=f"分析器初始化失败: {str(e)}",
-        skills_match={},
-        experience_match=False,
-        education_match=False,
-        strengths=[],
-        weaknesses=["系统配置错误"],
-        summary="请检查系统配置"
-    )) 
\ No newline at end of file
+        return ResumeAnalyzer(api_key=settings.OPENAI_API_KEY, model_name=settings.OPENAI_MODEL, provider="openai")
+    if settings.AI_PROVIDER == "zhipuai" and zhipuai_available():
+        return ResumeAnalyzer(api_key=settings.ZHIPUAI_API_KEY, model_name=settings.ZHIPUAI_MODEL, provider="zhipuai")
+    # 回退到OpenAI
+    logger.warning(f"不支持的AI提供商配置 {settings.AI_PROVIDER}，回退到OpenAI")
+    return ResumeAnalyzer(api_key=settings.OPENAI_API_KEY, model_name=settings.OPENAI_MODEL, provider="openai")
+
+def get_default_analyzer() -> ResumeAnalyzer:
+    """获取默认分析器实例（首次调用时创建）"""
+    global _default_analyzer
+    if _default_analyzer is None:
+        _default_analyzer = create_default_analyzer()
+    return _default_analyzer
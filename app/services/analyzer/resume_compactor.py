@@ -0,0 +1,242 @@
+import re
+import logging
+from collections import Counter
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, Field
+from app.core.config import settings
+from app.core.metrics import get_counter
+
+logger = logging.getLogger(__name__)
+
+# 无法加载tiktoken编码时，按字符数估算token数
+APPROX_CHARS_PER_TOKEN = 2
+
+# 截断时追加的提示，让模型知道内容不完整
+TRUNCATION_MARKER = "\n[简历内容过长，以下部分已省略]"
+
+# 页码、分页标记等行
+_PAGE_MARKER_RE = re.compile(
+    r"^(第\s*\d+\s*页.*|共\s*\d+\s*页.*|page\s*\d+(\s*(of|/)\s*\d+)?|\d+\s*/\s*\d+|[-–—]\s*\d+\s*[-–—]|\d{1,3})$",
+    re.IGNORECASE
+)
+
+# 联系方式、个人信息等对评估没有帮助的行
+_BOILERPLATE_LINE_RE = re.compile(
+    r"^(电话|手机|联系电话|邮箱|电子邮件|e-?mail|phone|mobile|tel|微信|wechat|qq|地址|住址|通讯地址|address|"
+    r"民族|籍贯|政治面貌|婚姻状况|婚姻|身高|体重|血型|户口|户籍|身份证|照片)\s*[:：]",
+    re.IGNORECASE
+)
+_EMAIL_RE = re.compile(r"[\w.+-]+@[\w-]+\.[\w.-]+")
+_PHONE_RE = re.compile(r"(\+?\d{1,3}[\s-]?)?1[3-9]\d[\s-]?\d{4}[\s-]?\d{4}|\(?\d{3,4}\)?[\s-]?\d{7,8}")
+
+# 价值较低的段落标题（整段删除），以及用于判断段落结束的常见标题
+_LOW_VALUE_SECTIONS = {
+    "兴趣爱好", "个人爱好", "爱好", "业余爱好", "推荐人", "证明人", "hobbies", "interests",
+    "hobbies and interests", "references", "referees",
+}
+_SECTION_HEADINGS = _LOW_VALUE_SECTIONS | {
+    "个人信息", "基本信息", "联系方式", "求职意向", "教育背景", "教育经历", "工作经历", "工作经验", "实习经历",
+    "项目经验", "项目经历", "专业技能", "技能", "技能特长", "证书", "资格证书", "获奖情况", "荣誉奖项", "自我评价",
+    "个人评价", "personal information", "contact", "objective", "summary", "education", "experience",
+    "work experience", "professional experience", "projects", "skills", "certifications", "awards",
+}
+
+class CompactionResult(BaseModel):
+    """简历压缩结果"""
+    content: str = Field(description="压缩后的简历内容")
+    original_tokens: int = Field(description="压缩前的token数")
+    compacted_tokens: int = Field(description="压缩后的token数")
+    truncated: bool = Field(default=False, description="是否按token预算截断")
+
+    @property
+    def tokens_saved(self) -> int:
+        return self.original_tokens - self.compacted_tokens
+
+class ResumeCompactor:
+    """简历压缩器，在发送给LLM前去除重复页眉页脚、多余空白和低价值内容，并按token预算截断"""
+
+    def __init__(
+        self,
+        default_budget: int = 6000,
+        budgets: Optional[Dict[str, int]] = None,
+        enabled: bool = True,
+        repeated_line_threshold: int = 3
+    ):
+        """
+        初始化简历压缩器
+
+        Args:
+            default_budget: 默认的简历token预算
+            budgets: 按 "provider/model"、模型名或提供商配置的token预算
+            enabled: 是否启用压缩
+            repeated_line_threshold: 同一行出现多少次视为页眉页脚
+        """
+        self.default_budget = default_budget
+        self.budgets = budgets or {}
+        self.enabled = enabled
+        self.repeated_line_threshold = repeated_line_threshold
+        self._encodings: Dict[str, Any] = {}
+        self.stats = get_counter(
+            "compaction",
+            ratios={"saving_rate": (("tokens_saved",), ("original_tokens",))}
+        )
+
+    def budget_for(self, provider: str, model_name: str) -> int:
+        """获取指定提供商和模型的token预算"""
+        for key in (f"{provider}/{model_name}", model_name, provider):
+            if key in self.budgets:
+                return self.budgets[key]
+        return self.default_budget
+
+    def get_encoding(self, model_name: str):
+        """
+        获取模型对应的tiktoken编码（缓存），非OpenAI模型使用cl100k_base近似
+
+        Returns:
+            编码对象，tiktoken不可用时返回None
+        """
+        if model_name not in self._encodings:
+            try:
+                import tiktoken
+                try:
+                    encoding = tiktoken.encoding_for_model(model_name)
+                except KeyError:
+                    encoding = tiktoken.get_encoding("cl100k_base")
+            except Exception as e:
+                logger.warning(f"加载tiktoken编码失败，改为按字符估算token数: {e}")
+                encoding = None
+            self._encodings[model_name] = encoding
+        return self._encodings[model_name]
+
+    def count_tokens(self, text: str, model_name: str) -> int:
+        """计算文本的token数"""
+        encoding = self.get_encoding(model_name)
+        if encoding is None:
+            return -(-len(text) // APPROX_CHARS_PER_TOKEN)
+        return len(encoding.encode(text, disallowed_special=()))
+
+    def compact(self, text: str, provider: str, model_name: str) -> CompactionResult:
+        """
+        压缩简历内容
+
+        Args:
+            text: 简历内容文本
+            provider: AI提供商
+            model_name: 模型名称
+
+        Returns:
+            CompactionResult: 压缩结果
+        """
+        text = text or ""
+        original_tokens = self.count_tokens(text, model_name)
+        if not self.enabled:
+            return CompactionResult(content=text, original_tokens=original_tokens, compacted_tokens=original_tokens)
+
+        lines = self._normalize_lines(text)
+        lines = self._remove_repeated_lines(lines)
+        lines = self._drop_low_value_lines(lines)
+        content = "\n".join(lines).strip()
+
+        content, truncated = self._truncate(content, self.budget_for(provider, model_name), model_name)
+        return CompactionResult(
+            content=content,
+            original_tokens=original_tokens,
+            compacted_tokens=self.count_tokens(content, model_name),
+            truncated=truncated
+        )
+
+    async def report(self, result: CompactionResult):
+        """记录压缩统计"""
+        await self.stats.incr("analyses")
+        await self.stats.incr("original_tokens", result.original_tokens)
+        await self.stats.incr("compacted_tokens", result.compacted_tokens)
+        await self.stats.incr("tokens_saved", result.tokens_saved)
+        if result.truncated:
+            await self.stats.incr("truncated")
+        logger.info(
+            f"简历压缩: {result.original_tokens} -> {result.compacted_tokens} tokens，节省 {result.tokens_saved}"
+            + ("（已截断）" if result.truncated else "")
+        )
+
+    def warm_up(self, model_names: List[str]):
+        """预先加载tiktoken编码，避免首次分析时加载"""
+        for model_name in model_names:
+            self.get_encoding(model_name)
+
+    def _normalize_lines(self, text: str) -> List[str]:
+        """规范化空白：合并连续空格，去除页码行，最多保留一个连续空行"""
+        lines = []
+        for raw_line in text.replace("　", " ").replace("\xa0", " ").splitlines():
+            line = " ".join(raw_line.split())
+            if _PAGE_MARKER_RE.match(line):
+                continue
+            if not line and (not lines or not lines[-1]):
+                continue
+            lines.append(line)
+        return lines
+
+    def _remove_repeated_lines(self, lines: List[str]) -> List[str]:
+        """删除每页重复出现的页眉页脚，只保留第一次出现"""
+        counts = Counter(line for line in lines if line)
+        repeated = {line for line, count in counts.items() if count >= self.repeated_line_threshold}
+        if not repeated:
+            return lines
+
+        seen = set()
+        result = []
+        for line in lines:
+            if line in repeated:
+                if line in seen:
+                    continue
+                seen.add(line)
+            result.append(line)
+        return result
+
+    def _drop_low_value_lines(self, lines: List[str]) -> List[str]:
+        """删除兴趣爱好、推荐人等低价值段落，以及联系方式、个人信息等样板行"""
+        result = []
+        skipping = False
+        for line in lines:
+            heading = line.strip(" :：#*-【】[]").lower()
+            if heading in _SECTION_HEADINGS:
+                skipping = heading in _LOW_VALUE_SECTIONS
+                if skipping:
+                    continue
+            if skipping:
+                continue
+            if _BOILERPLATE_LINE_RE.match(line):
+                continue
+            # 只包含邮箱或电话的短行
+            if len(line) <= 60 and (_EMAIL_RE.search(line) or _PHONE_RE.search(line)):
+                remainder = _PHONE_RE.sub("", _EMAIL_RE.sub("", line)).strip(" |/,，;；·")
+                if len(remainder) <= 4:
+                    continue
+            result.append(line)
+        return result
+
+    def _truncate(self, content: str, budget: int, model_name: str):
+        """按token预算截断内容，尽量在行边界截断"""
+        encoding = self.get_encoding(model_name)
+        if encoding is None:
+            max_chars = budget * APPROX_CHARS_PER_TOKEN
+            if len(content) <= max_chars:
+                return content, False
+            truncated = content[:max_chars]
+        else:
+            tokens = encoding.encode(content, disallowed_special=())
+            if len(tokens) <= budget:
+                return content, False
+            truncated = encoding.decode(tokens[:budget])
+
+        # 截断点附近有换行时在行边界截断
+        last_newline = truncated.rfind("\n")
+        if last_newline > len(truncated) * 0.9:
+            truncated = truncated[:last_newline]
+        return truncated.rstrip() + TRUNCATION_MARKER, True
+
+# 创建默认压缩器实例
+default_compactor = ResumeCompactor(
+    default_budget=settings.RESUME_TOKEN_BUDGET,
+    budgets=settings.RESUME_TOKEN_BUDGETS,
+    enabled=settings.RESUME_COMPACTION_ENABLED
+)
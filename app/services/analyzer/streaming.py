@@ -0,0 +1,60 @@
+import logging
+from typing import Dict, Any, List, Tuple
+from app.services.analyzer.output_parser import IncrementalJSONParser, OutputParseError
+
+logger = logging.getLogger(__name__)
+
+# 列表字段，每完成一项就推送；其他字段在值完整输出后推送
+LIST_FIELDS = ("strengths", "weaknesses")
+
+class StreamingFieldExtractor:
+    """从流式输出的JSON文本中增量提取已完成的字段"""
+
+    def __init__(self):
+        self.parser = IncrementalJSONParser(opening="{")
+        self._emitted: set = set()
+        self._list_counts: Dict[str, int] = {}
+        self._last_position = -1
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """
+        追加一段LLM输出，返回新完成的字段
+
+        Args:
+            chunk: 新收到的文本片段
+
+        Returns:
+            List[Tuple[str, Any]]: (字段名, 值) 列表，列表字段的值为新增的单项
+        """
+        self.parser.feed(chunk)
+
+        # 只有出现新的分隔符或JSON结束时才可能有新完成的值
+        position = self.parser.safe_position
+        if not self.parser.started or (position == self._last_position and not self.parser.done):
+            return []
+        self._last_position = position
+
+        try:
+            completed = self.parser.value(complete_only=True, top_level=True)
+            partial = self.parser.value(complete_only=True)
+        except OutputParseError:
+            return []
+        if not isinstance(completed, dict) or not isinstance(partial, dict):
+            return []
+
+        events: List[Tuple[str, Any]] = []
+        for field, value in completed.items():
+            if field in LIST_FIELDS or field in self._emitted:
+                continue
+            self._emitted.add(field)
+            events.append((field, value))
+
+        for field in LIST_FIELDS:
+            items = partial.get(field)
+            if not isinstance(items, list):
+                continue
+            for item in items[self._list_counts.get(field, 0):]:
+                events.append((field, item))
+            self._list_counts[field] = len(items)
+
+        return events
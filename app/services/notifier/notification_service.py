@@ -1,12 +1,9 @@
 import logging
 from typing import Dict, Any, List, Optional, Union
 from fastapi import WebSocket, WebSocketDisconnect
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig
 from app.core.config import settings
 import json
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 class ConnectionManager:
@@ -64,19 +61,27 @@ class EmailNotifier:
     """邮件通知服务"""
     
     def __init__(self):
-        """初始化邮件配置"""
-        self.conf = ConnectionConfig(
-            MAIL_USERNAME=settings.MAIL_USERNAME,
-            MAIL_PASSWORD=settings.MAIL_PASSWORD,
-            MAIL_FROM=settings.MAIL_FROM,
-            MAIL_PORT=settings.MAIL_PORT,
-            MAIL_SERVER=settings.MAIL_SERVER,
-            MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-            MAIL_STARTTLS=True,
-            MAIL_SSL_TLS=False,
-            USE_CREDENTIALS=True,
-        )
-        self.fastmail = FastMail(self.conf)
+        """初始化邮件服务，邮件客户端在首次发送时创建"""
+        self._fastmail = None
+        
+    @property
+    def fastmail(self):
+        """邮件客户端（首次使用时导入fastapi_mail并创建）"""
+        if self._fastmail is None:
+            from fastapi_mail import FastMail, ConnectionConfig
+            self.conf = ConnectionConfig(
+                MAIL_USERNAME=settings.MAIL_USERNAME,
+                MAIL_PASSWORD=settings.MAIL_PASSWORD,
+                MAIL_FROM=settings.MAIL_FROM,
+                MAIL_PORT=settings.MAIL_PORT,
+                MAIL_SERVER=settings.MAIL_SERVER,
+                MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
+                MAIL_STARTTLS=True,
+                MAIL_SSL_TLS=False,
+                USE_CREDENTIALS=True,
+            )
+            self._fastmail = FastMail(self.conf)
+        return self._fastmail
         
     async def send_resume_match_notification(
         self, 
@@ -120,6 +125,7 @@ class EmailNotifier:
         </html>
         """
         
+        from fastapi_mail import MessageSchema
         message = MessageSchema(
             subject=f"简历匹配通知: {candidate_name} - {match_score:.1f}% 匹配",
             recipients=[recipient_email],
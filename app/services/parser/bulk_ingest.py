@@ -0,0 +1,238 @@
+import os
+import asyncio
+import logging
+import zipfile
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from bson.objectid import ObjectId
+from fastapi import HTTPException
+from pymongo.errors import BulkWriteError
+from app.core.config import settings
+from app.services.parser.resume_parser import ResumeParser, default_parser
+from app.services.parser.document_store import ParsedDocumentStore, document_store
+from app.services.parser.field_extractor import resume_fields
+
+logger = logging.getLogger(__name__)
+
+class BulkIngestService:
+    """
+    ZIP压缩包批量导入服务
+
+    逐个解压压缩包中的简历文件（不整体解压到内存或磁盘），按扩展名过滤后
+    在解析进程池中并行解析，再以无序insert_many分批写入resumes集合。
+    """
+
+    def __init__(
+        self,
+        parser: ResumeParser = None,
+        store: ParsedDocumentStore = None,
+        batch_size: int = 500,
+        max_files: int = 10000
+    ):
+        """
+        初始化批量导入服务
+
+        Args:
+            parser: 简历解析器，默认使用全局解析器
+            store: 解析结果存储，默认使用全局存储
+            batch_size: 每批写入的简历数
+            max_files: 单个压缩包允许的最大文件数
+        """
+        self.parser = parser or default_parser
+        self.store = store or document_store
+        self.batch_size = batch_size
+        self.max_files = max_files
+
+    @staticmethod
+    def is_resume_member(member: zipfile.ZipInfo) -> bool:
+        """是否为需要导入的简历文件（跳过目录、macOS元数据和隐藏文件）"""
+        if member.is_dir():
+            return False
+        name = member.filename
+        base_name = os.path.basename(name)
+        if name.startswith("__MACOSX/") or not base_name or base_name.startswith("."):
+            return False
+        return True
+
+    async def ingest_zip(
+        self,
+        db,
+        zip_path: str,
+        position: str,
+        requirement: Optional[Dict[str, Any]] = None,
+        user_id: Optional[str] = None,
+        lane: str = "bulk"
+    ) -> Dict[str, Any]:
+        """
+        导入ZIP压缩包中的简历
+
+        Args:
+            db: 数据库实例
+            zip_path: 压缩包路径
+            position: 应聘职位
+            requirement: 职位要求文档，提供时为导入成功的简历提交分析任务
+            user_id: 用户ID（提交分析任务时使用，同时作为公平调度的租户）
+            lane: 分析任务的优先级通道，bulk 或 backfill
+
+        Returns:
+            Dict: 导入报告，包含每个文件的结果
+        """
+        try:
+            archive = zipfile.ZipFile(zip_path)
+        except zipfile.BadZipFile as e:
+            raise HTTPException(status_code=400, detail=f"无效的ZIP文件: {e}")
+
+        files: List[Dict[str, Any]] = []
+        pending_docs: List[Dict[str, Any]] = []
+        inserted_ids: List[str] = []
+        # 同时解析的文件数不超过进程池容量，避免解析队列满时被拒绝
+        pool = self.parser.parse_pool
+        semaphore = asyncio.Semaphore(max(pool.max_workers + pool.max_queue // 2, 1))
+
+        with archive:
+            members = [member for member in archive.infolist() if self.is_resume_member(member)]
+            if len(members) > self.max_files:
+                raise HTTPException(status_code=400, detail=f"压缩包中的文件数超过限制 ({self.max_files})")
+
+            async def ingest_member(member: zipfile.ZipInfo, report: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+                """解压并解析单个文件，成功时返回待写入的简历文档"""
+                file_name = os.path.basename(member.filename)
+                file_ext = Path(file_name).suffix.lower()
+
+                if file_ext[1:] not in settings.ALLOWED_EXTENSIONS:
+                    report.update(status="skipped", error=f"不支持的文件格式: {file_ext or '无扩展名'}")
+                    return None
+                if member.file_size > settings.MAX_UPLOAD_SIZE:
+                    report["error"] = f"文件大小超过限制 ({settings.MAX_UPLOAD_SIZE} 字节)"
+                    return None
+
+                async with semaphore:
+                    try:
+                        saved_file = await asyncio.to_thread(self._extract_member, archive, member, file_ext)
+                        parsed_document = await self.store.get(db, saved_file["sha256"])
+                        if parsed_document is None:
+                            parsed = await self.parser.parse_resume_async(saved_file["key"])
+                            parsed_document = await self.store.save(db, saved_file["sha256"], parsed, saved_file["size"])
+                    except HTTPException as e:
+                        report["error"] = str(e.detail)
+                        return None
+                    except Exception as e:
+                        report["error"] = str(e)
+                        return None
+
+                return {
+                    "_id": str(ObjectId()),
+                    "candidate_name": Path(file_name).stem,
+                    "position": position,
+                    "storage_key": saved_file["key"],
+                    "storage_backend": self.parser.storage.name,
+                    "file_name": file_name,
+                    "file_type": file_ext[1:],
+                    "file_size": saved_file["size"],
+                    "file_hash": saved_file["sha256"],
+                    "document_id": parsed_document["_id"],
+                    **resume_fields(parsed_document),
+                    "uploaded_at": datetime.now(),
+                    "status": "pending",
+                }
+
+            files_by_id: Dict[str, Dict[str, Any]] = {}
+
+            async def run_member(member: zipfile.ZipInfo):
+                report = {"file_name": member.filename, "status": "failed", "resume_id": None, "error": None}
+                files.append(report)
+                resume_data = await ingest_member(member, report)
+                if resume_data is None:
+                    return
+                report.update(status="ok", resume_id=resume_data["_id"])
+                files_by_id[resume_data["_id"]] = report
+                pending_docs.append(resume_data)
+                if len(pending_docs) >= self.batch_size:
+                    await self._flush(db, pending_docs, files_by_id, inserted_ids)
+
+            await asyncio.gather(*(run_member(member) for member in members))
+            await self._flush(db, pending_docs, files_by_id, inserted_ids)
+
+        task_ids = []
+        if requirement is not None and inserted_ids:
+            task_ids = await asyncio.to_thread(self._enqueue_analysis, inserted_ids, requirement, user_id, lane)
+
+        succeeded = sum(1 for report in files if report["status"] == "ok")
+        skipped = sum(1 for report in files if report["status"] == "skipped")
+        logger.info(f"批量导入完成: 共 {len(files)} 个文件，成功 {succeeded}，跳过 {skipped}，失败 {len(files) - succeeded - skipped}")
+        return {
+            "total": len(files),
+            "succeeded": succeeded,
+            "skipped": skipped,
+            "failed": len(files) - succeeded - skipped,
+            "analysis_enqueued": len(task_ids),
+            "files": files,
+        }
+
+    def _extract_member(self, archive: zipfile.ZipFile, member: zipfile.ZipInfo, file_ext: str) -> Dict[str, Any]:
+        """流式解压单个文件并按内容哈希保存到存储后端（在线程中执行）"""
+        with archive.open(member) as stream:
+            # 按实际解压出的字节数限制大小，防止压缩包中声明的大小不实
+            return self.parser.save_stream(stream, file_ext)
+
+    async def _flush(
+        self,
+        db,
+        pending_docs: List[Dict[str, Any]],
+        files_by_id: Dict[str, Dict[str, Any]],
+        inserted_ids: List[str]
+    ):
+        """以无序insert_many写入一批简历，单条写入失败不影响同批其他简历"""
+        if not pending_docs:
+            return
+        batch = pending_docs[:]
+        pending_docs.clear()
+
+        failed_ids = set()
+        try:
+            await db["resumes"].insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                resume_id = batch[error["index"]]["_id"]
+                failed_ids.add(resume_id)
+                report = files_by_id.get(resume_id)
+                if report:
+                    report.update(status="failed", resume_id=None, error=error.get("errmsg", "写入数据库失败"))
+        except Exception as e:
+            logger.error(f"批量写入简历失败: {e}")
+            failed_ids = {doc["_id"] for doc in batch}
+            for resume_id in failed_ids:
+                report = files_by_id.get(resume_id)
+                if report:
+                    report.update(status="failed", resume_id=None, error=f"写入数据库失败: {e}")
+
+        inserted_ids.extend(doc["_id"] for doc in batch if doc["_id"] not in failed_ids)
+
+    def _enqueue_analysis(
+        self,
+        resume_ids: List[str],
+        requirement: Dict[str, Any],
+        user_id: Optional[str],
+        lane: str = "bulk"
+    ) -> List[str]:
+        """为导入的简历提交Celery分析流水线，按租户公平调度，不会挤占交互式分析"""
+        from app.tasks.resume_tasks import enqueue_resume_analysis
+        from app.services.analyzer.bulk_screening import BulkScreeningService
+
+        requirements = BulkScreeningService.requirement_to_dict(requirement)
+        task_ids = []
+        for resume_id in resume_ids:
+            try:
+                task_ids.append(enqueue_resume_analysis(
+                    resume_id, requirements, user_id or requirement.get("user_id"), lane=lane
+                ))
+            except Exception as e:
+                logger.error(f"提交简历 {resume_id} 的分析任务失败: {e}")
+        return task_ids
+
+# 创建默认批量导入服务实例
+bulk_ingest_service = BulkIngestService(
+    batch_size=settings.BULK_INGEST_BATCH_SIZE,
+    max_files=settings.BULK_INGEST_MAX_FILES
+)
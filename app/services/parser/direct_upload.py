@@ -0,0 +1,223 @@
+import os
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Any, Optional
+from bson.objectid import ObjectId
+from fastapi import HTTPException
+from app.core.config import settings
+from app.services.parser.resume_parser import ResumeParser, default_parser
+from app.services.parser.document_store import ParsedDocumentStore, document_store
+from app.services.parser.field_extractor import resume_fields
+from app.services.storage.base import StorageError, StorageNotFoundError
+
+logger = logging.getLogger(__name__)
+
+class DirectUploadService:
+    """
+    客户端直传上传流程
+
+    1. 客户端申请预签名PUT地址，服务端在pending_uploads中记录待上传的文件
+    2. 客户端把文件直接PUT到对象存储，再调用完成接口
+    3. 服务端确认对象存在后提交Celery解析任务，由worker按对象键读取、解析并创建简历
+
+    API服务器只处理小的JSON请求，文件内容不经过API服务器。
+    """
+
+    def __init__(
+        self,
+        parser: ResumeParser = None,
+        store: ParsedDocumentStore = None,
+        expires_in: int = 900,
+        key_prefix: str = "direct",
+        collection: str = "pending_uploads"
+    ):
+        """
+        初始化直传上传服务
+
+        Args:
+            parser: 简历解析器，默认使用全局解析器（及其存储后端）
+            store: 解析结果存储，默认使用全局存储
+            expires_in: 预签名地址有效期（秒），超时未完成的记录会被TTL索引清理
+            key_prefix: 直传对象的存储键前缀
+            collection: 待上传记录的集合名称
+        """
+        self.parser = parser or default_parser
+        self.store = store or document_store
+        self.expires_in = expires_in
+        self.key_prefix = key_prefix.strip("/")
+        self.collection = collection
+
+    @property
+    def storage(self):
+        return self.parser.storage
+
+    async def create_upload(
+        self,
+        db,
+        file_name: str,
+        candidate_name: str,
+        position: str,
+        size: Optional[int] = None,
+        content_type: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        创建待上传记录并生成预签名PUT地址
+
+        Returns:
+            Dict: upload_id、upload_url、method、headers和expires_in
+        """
+        file_ext = os.path.splitext(file_name)[1].lower()
+        if file_ext[1:] not in settings.ALLOWED_EXTENSIONS:
+            raise HTTPException(status_code=400, detail=f"不支持的文件格式: {file_ext}")
+        if size is not None and size > settings.MAX_UPLOAD_SIZE:
+            raise HTTPException(status_code=413, detail=f"文件大小超过限制 ({settings.MAX_UPLOAD_SIZE} 字节)")
+
+        upload_id = str(ObjectId())
+        key = f"{self.key_prefix}/{upload_id}{file_ext}"
+        try:
+            upload_url = await asyncio.to_thread(self.storage.presigned_put_url, key, self.expires_in, content_type)
+        except StorageError as e:
+            raise HTTPException(status_code=501, detail=str(e))
+
+        now = datetime.now()
+        await db[self.collection].insert_one({
+            "_id": upload_id,
+            "storage_key": key,
+            "file_name": file_name,
+            "file_type": file_ext[1:],
+            "candidate_name": candidate_name,
+            "position": position,
+            "user_id": user_id,
+            "status": "pending",  # pending, uploaded, completed, failed
+            "created_at": now,
+            # 未完成的记录由TTL索引删除，完成后移除该字段
+            "expires_at": now + timedelta(seconds=self.expires_in * 2),
+        })
+
+        return {
+            "upload_id": upload_id,
+            "upload_url": upload_url,
+            "method": "PUT",
+            "headers": {"Content-Type": content_type} if content_type else {},
+            "expires_in": self.expires_in,
+        }
+
+    async def complete_upload(self, db, upload_id: str) -> Dict[str, Any]:
+        """
+        确认文件已上传到对象存储，并提交解析任务（重复调用时返回当前状态，不会重复提交）
+
+        Returns:
+            Dict: 上传状态
+        """
+        upload = await db[self.collection].find_one({"_id": upload_id})
+        if not upload:
+            raise HTTPException(status_code=404, detail="找不到指定的上传记录")
+        if upload["status"] != "pending":
+            return self._status(upload)
+
+        try:
+            size = await asyncio.to_thread(self.storage.size, upload["storage_key"])
+        except StorageNotFoundError:
+            raise HTTPException(status_code=409, detail="文件尚未上传到存储")
+        if size > settings.MAX_UPLOAD_SIZE:
+            await asyncio.to_thread(self.storage.delete, upload["storage_key"])
+            await self._mark_failed(db, upload_id, f"文件大小超过限制 ({settings.MAX_UPLOAD_SIZE} 字节)")
+            raise HTTPException(status_code=413, detail=f"文件大小超过限制 ({settings.MAX_UPLOAD_SIZE} 字节)")
+
+        # 只有从pending切换成功的请求提交任务，并发的重复调用不会重复解析
+        upload = await db[self.collection].find_one_and_update(
+            {"_id": upload_id, "status": "pending"},
+            {"$set": {"status": "uploaded", "size": size, "uploaded_at": datetime.now()}, "$unset": {"expires_at": ""}},
+            return_document=True
+        )
+        if upload is None:
+            return self._status(await db[self.collection].find_one({"_id": upload_id}))
+
+        from app.tasks.resume_tasks import parse_uploaded_resume_task
+        result = parse_uploaded_resume_task.delay(upload_id)
+        await db[self.collection].update_one({"_id": upload_id}, {"$set": {"task_id": result.id}})
+        upload["task_id"] = result.id
+        return self._status(upload)
+
+    async def get_status(self, db, upload_id: str) -> Optional[Dict[str, Any]]:
+        """获取上传状态，记录不存在时返回None"""
+        upload = await db[self.collection].find_one({"_id": upload_id})
+        return self._status(upload) if upload else None
+
+    async def process_upload(self, db, upload_id: str) -> Dict[str, Any]:
+        """
+        解析已上传的文件并创建简历（在Celery worker中执行）
+
+        Returns:
+            Dict: 上传状态
+        """
+        upload = await db[self.collection].find_one({"_id": upload_id})
+        if not upload:
+            raise ValueError(f"找不到指定的上传记录: {upload_id}")
+        if upload["status"] == "completed":
+            return self._status(upload)
+
+        key = upload["storage_key"]
+        try:
+            hashed = await asyncio.to_thread(self.parser.hash_stored, key)
+            parsed_document = await self.store.get(db, hashed["sha256"])
+            if parsed_document is None:
+                parsed = await self.parser.parse_resume_async(key)
+                parsed_document = await self.store.save(db, hashed["sha256"], parsed, hashed["size"])
+        except StorageNotFoundError:
+            await self._mark_failed(db, upload_id, "文件不存在")
+            raise
+        except HTTPException as e:
+            await self._mark_failed(db, upload_id, str(e.detail))
+            raise ValueError(f"解析直传文件 {key} 失败: {e.detail}")
+        except Exception as e:
+            await self._mark_failed(db, upload_id, str(e))
+            raise
+
+        resume_id = str(ObjectId())
+        await db["resumes"].insert_one({
+            "_id": resume_id,
+            "candidate_name": upload["candidate_name"],
+            "position": upload["position"],
+            "storage_key": key,
+            "storage_backend": self.storage.name,
+            "file_name": upload["file_name"],
+            "file_type": upload["file_type"],
+            "file_size": hashed["size"],
+            "file_hash": hashed["sha256"],
+            "document_id": parsed_document["_id"],
+            **resume_fields(parsed_document),
+            "uploaded_at": datetime.now(),
+            "status": "pending",
+        })
+        upload = await db[self.collection].find_one_and_update(
+            {"_id": upload_id},
+            {"$set": {"status": "completed", "resume_id": resume_id, "completed_at": datetime.now()}},
+            return_document=True
+        )
+        logger.info(f"直传简历 {upload_id} 解析完成，简历ID: {resume_id}")
+        return self._status(upload)
+
+    async def _mark_failed(self, db, upload_id: str, error: str):
+        await db[self.collection].update_one(
+            {"_id": upload_id},
+            {"$set": {"status": "failed", "error": error}, "$unset": {"expires_at": ""}}
+        )
+
+    @staticmethod
+    def _status(upload: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            "upload_id": upload["_id"],
+            "status": upload["status"],
+            "task_id": upload.get("task_id"),
+            "resume_id": upload.get("resume_id"),
+            "error": upload.get("error"),
+        }
+
+# 创建默认直传上传服务实例
+direct_upload_service = DirectUploadService(
+    expires_in=settings.PRESIGNED_UPLOAD_EXPIRES,
+    key_prefix=settings.DIRECT_UPLOAD_PREFIX
+)
@@ -0,0 +1,102 @@
+import logging
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+from app.services.parser.resume_parser import PARSER_VERSION
+
+logger = logging.getLogger(__name__)
+
+class ParsedDocumentStore:
+    """
+    解析结果存储
+
+    以文件的SHA-256为主键保存提取出的文本，同一个文件被多次上传（或投递多个职位）时
+    直接复用已有的解析结果。简历文档通过document_id引用解析结果，不再各自复制content。
+    """
+
+    def __init__(self, collection: str = "parsed_documents", parser_version: str = PARSER_VERSION):
+        """
+        初始化解析结果存储
+
+        Args:
+            collection: 集合名称
+            parser_version: 当前解析器版本，版本不同的解析结果不会被复用
+        """
+        self.collection = collection
+        self.parser_version = parser_version
+
+    async def get(self, db, sha256: str) -> Optional[Dict[str, Any]]:
+        """
+        获取当前解析器版本的解析结果
+
+        Returns:
+            Optional[Dict]: 解析结果文档，不存在或版本过旧时返回None
+        """
+        document = await db[self.collection].find_one({"_id": sha256})
+        if document and document.get("parser_version") == self.parser_version:
+            return document
+        return None
+
+    async def save(self, db, sha256: str, parsed: Dict[str, Any], size: int) -> Dict[str, Any]:
+        """
+        保存（或覆盖旧版本的）解析结果
+
+        Args:
+            db: 数据库实例
+            sha256: 文件哈希
+            parsed: 解析器返回的数据
+            size: 文件字节数
+
+        Returns:
+            Dict: 解析结果文档
+        """
+        document = {
+            "content": parsed["content"],
+            "format": parsed.get("format"),
+            "engine": parsed.get("engine"),
+            "fields": parsed.get("fields") or {},
+            "parser_version": self.parser_version,
+            "size": size,
+            "parsed_at": datetime.now(),
+        }
+        await db[self.collection].update_one({"_id": sha256}, {"$set": document}, upsert=True)
+        return {"_id": sha256, **document}
+
+    async def load_content(self, db, resume: Dict[str, Any]) -> str:
+        """
+        获取简历的文本内容（兼容直接保存了content的旧简历文档）
+
+        Args:
+            db: 数据库实例
+            resume: 简历文档
+
+        Returns:
+            str: 简历文本，解析结果不存在时返回空字符串
+        """
+        if "content" in resume:
+            return resume["content"]
+        document = await db[self.collection].find_one({"_id": resume.get("document_id")}, {"content": 1})
+        if not document:
+            logger.warning(f"简历 {resume.get('_id')} 引用的解析结果不存在: {resume.get('document_id')}")
+            return ""
+        return document["content"]
+
+    async def load_contents(self, db, resumes: List[Dict[str, Any]]) -> Dict[str, str]:
+        """
+        批量获取多份简历的文本内容，一次查询取回所有引用的解析结果
+
+        Returns:
+            Dict[str, str]: 简历ID -> 简历文本
+        """
+        document_ids = {resume["document_id"] for resume in resumes if "content" not in resume and resume.get("document_id")}
+        documents = {}
+        if document_ids:
+            cursor = db[self.collection].find({"_id": {"$in": list(document_ids)}}, {"content": 1})
+            documents = {document["_id"]: document["content"] async for document in cursor}
+
+        return {
+            resume["_id"]: resume["content"] if "content" in resume else documents.get(resume.get("document_id"), "")
+            for resume in resumes
+        }
+
+# 创建默认解析结果存储实例
+document_store = ParsedDocumentStore()
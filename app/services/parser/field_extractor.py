@@ -0,0 +1,314 @@
+import re
+from datetime import datetime
+from typing import Dict, Any, List, Optional
+
+# 学历等级，数值越大学历越高。中文关键词按子串匹配；英文关键词是正则，按单词边界匹配，
+# master只在学位的说法中计入（避免"Scrum Master"、"mastered"被识别为硕士）
+EDUCATION_LEVELS = [
+    (5, "博士", ["博士", r"ph\.?\s?d", r"doctorate", r"doctor\s+of", r"d\.phil"]),
+    (4, "硕士", ["硕士", "研究生", r"master['’]s", r"masters?\s+(?:of|degree)", r"m\.s\.?", r"m\.?sc", r"m\.eng", r"mba"]),
+    (3, "本科", ["本科", "学士", r"bachelor(?:['’]?s)?", r"b\.s\.?", r"b\.?sc", r"b\.a\.", r"b\.eng", r"undergraduate"]),
+    (2, "大专", ["大专", "专科", "高职", r"associate\s+degree", r"college\s+diploma"]),
+    (1, "高中", ["高中", "中专", "中技", r"high\s+school"]),
+]
+
+def _keyword_pattern(keyword: str) -> str:
+    """英文关键词前后不能紧接字母，中文关键词按子串匹配"""
+    if re.search(r"[一-龥]", keyword):
+        return re.escape(keyword)
+    return rf"(?<![a-z])(?:{keyword})(?![a-z])"
+
+_EDUCATION_RES = [
+    (rank, re.compile("|".join(_keyword_pattern(keyword) for keyword in keywords), re.IGNORECASE))
+    for rank, _, keywords in EDUCATION_LEVELS
+]
+
+# 常见技能的标准名称及别名，提取结果和筛选条件都归一化为标准名称
+SKILL_ALIASES: Dict[str, List[str]] = {
+    "Python": ["python"],
+    "Java": ["java"],
+    "JavaScript": ["javascript", "js", "es6"],
+    "TypeScript": ["typescript", "ts"],
+    "Go": ["golang", "go语言"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp"],
+    "PHP": ["php"],
+    "Ruby": ["ruby"],
+    "Rust": ["rust"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "Scala": ["scala"],
+    "SQL": ["sql"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3"],
+    "Vue": ["vue", "vue.js", "vuejs", "vue3"],
+    "React": ["react", "react.js", "reactjs"],
+    "Angular": ["angular", "angularjs"],
+    "Node.js": ["node.js", "nodejs", "node"],
+    "Spring": ["spring", "spring boot", "springboot", "spring cloud"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "MySQL": ["mysql"],
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch", "elastic search"],
+    "Kafka": ["kafka"],
+    "RabbitMQ": ["rabbitmq"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Linux": ["linux"],
+    "Git": ["git"],
+    "AWS": ["aws", "amazon web services"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch"],
+    "机器学习": ["机器学习", "machine learning"],
+    "深度学习": ["深度学习", "deep learning"],
+    "自然语言处理": ["自然语言处理", "nlp"],
+    "数据分析": ["数据分析", "data analysis"],
+}
+
+# 同时是常见英文单词的技能名称（小写 -> 技能表中的写法）。只有按技能表的大小写书写（如"Go"、"Spring"）、
+# 紧挨着中文（如"熟悉go开发"），或作为技能列表中的一项（如"python, go, docker"）时才算提到了技能，
+# 避免"ready to go live with node"被识别为Go和Node.js
+AMBIGUOUS_SKILL_WORDS = {
+    "go": "Go", "node": "Node", "spring": "Spring", "git": "Git", "swift": "Swift", "rust": "Rust",
+    "ruby": "Ruby", "react": "React", "angular": "Angular", "flask": "Flask",
+}
+
+# 归一化时标准名称本身也可以使用（筛选条件中的"go"归一化为"Go"）
+_ALIAS_TO_SKILL = {alias: name for name, aliases in SKILL_ALIASES.items() for alias in aliases + [name.lower()]}
+# 提取时只使用明确的别名，常见英文单词单独匹配。长别名优先，避免"vue.js"只匹配到"vue"；
+# 英文技能按单词边界匹配（避免Java匹配到JavaScript）
+_SKILL_RE = re.compile(
+    r"(?<![A-Za-z0-9])("
+    + "|".join(
+        re.escape(alias)
+        for alias in sorted(_ALIAS_TO_SKILL, key=len, reverse=True)
+        if alias not in AMBIGUOUS_SKILL_WORDS
+    )
+    + r")(?![A-Za-z0-9+#])",
+    re.IGNORECASE
+)
+_AMBIGUOUS_SKILL_RE = re.compile(
+    r"(?<![A-Za-z0-9])(" + "|".join(AMBIGUOUS_SKILL_WORDS) + r")(?!\.?[A-Za-z0-9+#])",
+    re.IGNORECASE
+)
+_CJK_RE = re.compile(r"[一-龥]")
+_LIST_ITEM_BEFORE_RE = re.compile(r"(?:^|[,，、/|;；:：(（])\s*$")
+_LIST_ITEM_AFTER_RE = re.compile(r"^\s*(?:$|[,，、/|;；)）])")
+
+_YEAR_MONTH = r"((?:19|20)\d{2})\s*(?:[./\-年]\s*(\d{1,2})\s*月?)?"
+_DATE_RANGE_RE = re.compile(
+    _YEAR_MONTH + r"\s*(?:-|–|—|~|～|至|到|to)\s*(?:" + _YEAR_MONTH + r"|(至今|今|现在|present|now|current))",
+    re.IGNORECASE
+)
+_EXPLICIT_YEARS_RE = re.compile(
+    r"(\d{1,2})\s*\+?\s*年(?:以上)?(?:的)?(?:[一-龥]{0,4})?经验"
+    r"|(\d{1,2})\s*\+?\s*years?\s+(?:of\s+)?(?:[a-z\-]+\s+){0,2}experience",
+    re.IGNORECASE
+)
+# 教育经历段落中的日期区间不计入工作年限；遇到其他段落标题时教育经历段落结束
+_EDUCATION_SECTIONS = {"教育背景", "教育经历", "学习经历", "education", "education background", "educational background"}
+_OTHER_SECTIONS = {
+    "个人信息", "基本信息", "求职意向", "工作经历", "工作经验", "实习经历", "项目经验", "项目经历", "专业技能", "技能",
+    "证书", "获奖情况", "自我评价", "experience", "work experience", "professional experience", "employment",
+    "employment history", "internships", "projects", "skills", "certifications", "awards", "summary",
+}
+# 不在任何已知段落中的行，包含学位或院校名称时才视为教育经历
+_INSTITUTION_RE = re.compile(r"大学|学院|(?<![a-z])university(?![a-z])", re.IGNORECASE)
+_EMAIL_RE = re.compile(r"[A-Za-z0-9._%+\-]+@[A-Za-z0-9\-]+(?:\.[A-Za-z0-9\-]+)*\.[A-Za-z]{2,}")
+# 中国大陆手机号（可带+86）和带国家代码的国际号码
+_MOBILE_RE = re.compile(r"(?<!\d)(?:\+?86[\s\-]?)?(1[3-9]\d)[\s\-]?(\d{4})[\s\-]?(\d{4})(?!\d)")
+_INTERNATIONAL_PHONE_RE = re.compile(r"(?<![\w+])\+(?!86)\d{1,3}(?:[\s\-.]?\(?\d{1,4}\)?){2,4}(?!\d)")
+
+def education_rank(text: str) -> int:
+    """返回文本中出现的最高学历等级，未找到时返回0"""
+    for rank, pattern in _EDUCATION_RES:
+        if pattern.search(text or ""):
+            return rank
+    return 0
+
+def education_level_name(rank: int) -> Optional[str]:
+    """学历等级对应的名称，等级为0时返回None"""
+    for level_rank, name, _ in EDUCATION_LEVELS:
+        if level_rank == rank:
+            return name
+    return None
+
+def estimate_experience_years(text: str) -> Optional[float]:
+    """
+    估算工作年限：取明确声明的年限与日期区间合并后总时长中的较大值，教育经历中的日期区间不计入
+
+    有段落标题时按段落判断（教育经历段落中的行不计入，工作、项目等段落中的行都计入）；
+    第一个段落标题之前的行包含学位或院校名称时视为教育经历。
+
+    Returns:
+        Optional[float]: 工作年限，无法判断时返回None
+    """
+    text = text or ""
+    explicit = 0.0
+    for match in _EXPLICIT_YEARS_RE.finditer(text):
+        explicit = max(explicit, float(match.group(1) or match.group(2)))
+
+    now = datetime.now()
+    intervals = []
+    section = None
+    for line in text.splitlines():
+        heading = line.strip(" :：#*-【】[]").lower()
+        if heading in _EDUCATION_SECTIONS or heading in _OTHER_SECTIONS:
+            section = "education" if heading in _EDUCATION_SECTIONS else "other"
+            continue
+        if section == "education" or (section is None and (_INSTITUTION_RE.search(line) or education_rank(line))):
+            continue
+        for match in _DATE_RANGE_RE.finditer(line):
+            start = int(match.group(1)) * 12 + int(match.group(2) or 1) - 1
+            if match.group(5):
+                end = now.year * 12 + now.month - 1
+            else:
+                end = int(match.group(3)) * 12 + int(match.group(4) or 12) - 1
+            if start <= end:
+                intervals.append((start, end))
+
+    # 合并重叠区间，避免并行经历被重复计算
+    months = 0
+    current_start, current_end = None, None
+    for start, end in sorted(intervals):
+        if current_end is None or start > current_end + 1:
+            if current_end is not None:
+                months += current_end - current_start + 1
+            current_start, current_end = start, end
+        else:
+            current_end = max(current_end, end)
+    if current_end is not None:
+        months += current_end - current_start + 1
+
+    if not explicit and not months:
+        return None
+    return max(explicit, months / 12)
+
+def _mentions_ambiguous_skill(text: str, match: re.Match) -> bool:
+    """常见英文单词形式的技能名称：按技能表的大小写书写、前后紧挨中文，或是同一行技能列表中的一项时才算提到了技能"""
+    word = match.group(1)
+    if word == AMBIGUOUS_SKILL_WORDS[word.lower()]:
+        return True
+    line_start = text.rfind("\n", 0, match.start()) + 1
+    line_end = text.find("\n", match.end())
+    before = text[line_start:match.start()]
+    after = text[match.end():line_end if line_end != -1 else len(text)]
+    if _CJK_RE.match(before[-1:]) or _CJK_RE.match(after[:1]):
+        return True
+    # 以分隔符与前后隔开，且同一行中还有其他明确的技能
+    return bool(
+        _LIST_ITEM_BEFORE_RE.search(before)
+        and _LIST_ITEM_AFTER_RE.search(after)
+        and _SKILL_RE.search(before + " " + after)
+    )
+
+def skill_in_text(skill: str, text: str) -> bool:
+    """判断技能名称是否出现在文本中，英文技能按单词边界匹配（避免Java匹配到JavaScript）"""
+    skill = skill.strip()
+    if not skill:
+        return False
+    pattern = r"(?<![A-Za-z])(" + re.escape(skill) + r")(?![A-Za-z])"
+    matches = re.finditer(pattern, text, re.IGNORECASE)
+    if skill.lower() not in AMBIGUOUS_SKILL_WORDS:
+        return next(matches, None) is not None
+    return any(_mentions_ambiguous_skill(text, match) for match in matches)
+
+def normalize_skill(name: str) -> str:
+    """将技能名称归一化为标准名称，不在技能表中的名称原样返回"""
+    name = (name or "").strip()
+    return _ALIAS_TO_SKILL.get(name.lower(), name)
+
+def is_known_skill(name: str) -> bool:
+    """技能是否在技能表中（只有这些技能会被提取到简历的skills字段）"""
+    return normalize_skill(name) in SKILL_ALIASES
+
+def extract_skills(text: str) -> List[str]:
+    """提取文本中出现的技能（标准名称，按首次出现的顺序）"""
+    text = text or ""
+    found = [(match.start(), _ALIAS_TO_SKILL[match.group(1).lower()]) for match in _SKILL_RE.finditer(text)]
+    found += [
+        (match.start(), _ALIAS_TO_SKILL[match.group(1).lower()])
+        for match in _AMBIGUOUS_SKILL_RE.finditer(text)
+        if _mentions_ambiguous_skill(text, match)
+    ]
+    skills = {}
+    for _, skill in sorted(found):
+        skills.setdefault(skill, None)
+    return list(skills)
+
+def extract_emails(text: str) -> List[str]:
+    """提取邮箱地址（小写，去重）"""
+    return list(dict.fromkeys(email.lower() for email in _EMAIL_RE.findall(text or "")))
+
+def extract_phones(text: str) -> List[str]:
+    """提取电话号码：大陆手机号归一化为11位数字，国际号码保留+和数字"""
+    phones = ["".join(match) for match in _MOBILE_RE.findall(text or "")]
+    for match in _INTERNATIONAL_PHONE_RE.finditer(text or ""):
+        digits = re.sub(r"\D", "", match.group(0))
+        if 8 <= len(digits) <= 15:
+            phones.append(f"+{digits}")
+    return list(dict.fromkeys(phones))
+
+def extract_fields(text: str) -> Dict[str, Any]:
+    """
+    从简历文本中提取结构化字段，在解析进程中随解析一起执行
+
+    Args:
+        text: 简历文本
+
+    Returns:
+        Dict: education_rank/education_level/experience_years/skills/emails/phones
+    """
+    rank = education_rank(text)
+    experience_years = estimate_experience_years(text)
+    return {
+        "education_rank": rank,
+        "education_level": education_level_name(rank),
+        "experience_years": round(experience_years, 1) if experience_years is not None else None,
+        "skills": extract_skills(text),
+        "emails": extract_emails(text),
+        "phones": extract_phones(text),
+    }
+
+# 复制到resumes文档上并建立索引的字段
+RESUME_FIELD_NAMES = ("education_rank", "education_level", "experience_years", "skills", "emails", "phones")
+
+def resume_fields(parsed_document: Dict[str, Any]) -> Dict[str, Any]:
+    """从解析结果文档中取出需要写入简历文档的结构化字段"""
+    fields = parsed_document.get("fields") or {}
+    return {name: fields.get(name) for name in RESUME_FIELD_NAMES if name in fields}
+
+def stored_fields(resume: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """取出简历文档上已保存的结构化字段，旧简历没有这些字段时返回None"""
+    fields = {name: resume[name] for name in RESUME_FIELD_NAMES if name in resume}
+    return fields or None
+
+def build_field_query(
+    education: Optional[str] = None,
+    min_experience_years: Optional[float] = None,
+    skills: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    根据结构化字段构建简历查询条件
+
+    Args:
+        education: 最低学历，如"本科"、"硕士及以上"
+        min_experience_years: 最低工作年限
+        skills: 必须全部具备的技能（按标准名称匹配）
+
+    Returns:
+        Dict: MongoDB查询条件，未识别出对应字段的简历不会被选中
+    """
+    query: Dict[str, Any] = {}
+    required_rank = education_rank(education) if education else 0
+    if required_rank:
+        query["education_rank"] = {"$gte": required_rank}
+    if min_experience_years:
+        query["experience_years"] = {"$gte": min_experience_years}
+    if skills:
+        query["skills"] = {"$all": [normalize_skill(skill) for skill in skills]}
+    return query
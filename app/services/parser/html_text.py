@@ -0,0 +1,204 @@
+import re
+import codecs
+import logging
+from functools import lru_cache
+from html.parser import HTMLParser
+from typing import BinaryIO, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# 读取文件的分块大小
+READ_CHUNK_SIZE = 64 * 1024
+# 在文件开头的多少字节内查找<meta charset>
+SNIFF_SIZE = 4096
+
+# 结束后换行的块级元素
+BLOCK_TAGS = frozenset((
+    "address", "article", "aside", "blockquote", "body", "br", "dd", "div", "dl", "dt", "fieldset",
+    "figcaption", "figure", "footer", "form", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr",
+    "li", "main", "nav", "ol", "p", "pre", "section", "table", "tbody", "tfoot", "thead",
+    "title", "tr", "ul",
+))
+# 表格单元格之间用空格分隔，同一行的单元格（如时间、学校、专业）留在同一行
+CELL_TAGS = frozenset(("td", "th"))
+# 内容不属于正文的元素
+SKIP_TAGS = frozenset(("script", "style", "noscript", "template"))
+
+_BOMS = (
+    (codecs.BOM_UTF32_LE, "utf-32"),
+    (codecs.BOM_UTF32_BE, "utf-32"),
+    (codecs.BOM_UTF8, "utf-8-sig"),
+    (codecs.BOM_UTF16_LE, "utf-16"),
+    (codecs.BOM_UTF16_BE, "utf-16"),
+)
+_META_CHARSET_RE = re.compile(rb"""<meta[^>]+charset\s*=\s*["']?\s*([A-Za-z0-9_\-]+)""", re.IGNORECASE)
+# GBK和GB2312都是GB18030的子集，统一按GB18030解码，避免生僻字解码失败
+_CHARSET_ALIASES = {"gbk": "gb18030", "gb2312": "gb18030", "x-gbk": "gb18030", "cp936": "gb18030"}
+_WHITESPACE_RE = re.compile(r"\s+")
+
+def detect_encoding(head: bytes) -> Optional[str]:
+    """
+    根据文件开头的字节判断编码：先看BOM，再看<meta charset>
+
+    Args:
+        head: 文件开头的字节
+
+    Returns:
+        Optional[str]: 编码名称，无法判断时返回None
+    """
+    for bom, encoding in _BOMS:
+        if head.startswith(bom):
+            return encoding
+    match = _META_CHARSET_RE.search(head[:SNIFF_SIZE])
+    if match:
+        charset = match.group(1).decode("ascii").lower()
+        charset = _CHARSET_ALIASES.get(charset, charset)
+        try:
+            return codecs.lookup(charset).name
+        except LookupError:
+            logger.warning(f"未知的HTML编码声明: {charset}")
+    return None
+
+def guess_encoding(data: bytes) -> str:
+    """未声明编码时的猜测：能按UTF-8解码就用UTF-8，否则按GB18030（国内招聘网站导出的页面大多是GBK）"""
+    try:
+        # 分块读取时末尾可能截断了一个多字节字符，增量解码器会暂存不完整的末尾而不报错
+        codecs.getincrementaldecoder("utf-8")().decode(data)
+        return "utf-8"
+    except UnicodeDecodeError:
+        return "gb18030"
+
+def iter_decoded(stream: BinaryIO, encoding: Optional[str] = None, chunk_size: int = READ_CHUNK_SIZE):
+    """
+    分块读取并增量解码二进制流
+
+    Args:
+        stream: 二进制文件对象
+        encoding: 编码，未指定时根据BOM、<meta charset>和内容判断
+        chunk_size: 分块大小
+
+    Yields:
+        str: 解码后的文本块
+    """
+    head = stream.read(chunk_size)
+    if encoding is None:
+        encoding = detect_encoding(head) or guess_encoding(head)
+    decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+    chunk = head
+    while chunk:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+        chunk = stream.read(chunk_size)
+    tail = decoder.decode(b"", final=True)
+    if tail:
+        yield tail
+
+def read_text(file_path: str, encoding: Optional[str] = None) -> str:
+    """按检测到的编码读取整个文本文件"""
+    with open(file_path, "rb") as file:
+        return "".join(iter_decoded(file, encoding))
+
+class TextCollector:
+    """
+    HTML解析事件的接收者，收集正文文本
+
+    同时作为lxml解析器的target和标准库HTMLParser的回调：跳过script/style等元素，
+    在块级元素边界换行，表格的一行合并为一行，行内连续空白合并为一个空格。
+    """
+
+    def __init__(self):
+        self.lines: List[str] = []
+        self._line: List[str] = []
+        self._skip_depth = 0
+
+    def start(self, tag: str, attrib=None):
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in BLOCK_TAGS:
+            self._break()
+        elif tag in CELL_TAGS:
+            self._line.append(" ")
+
+    def end(self, tag: str):
+        tag = tag.lower()
+        if tag in SKIP_TAGS:
+            self._skip_depth = max(self._skip_depth - 1, 0)
+        elif tag in BLOCK_TAGS:
+            self._break()
+
+    def data(self, data: str):
+        if not self._skip_depth:
+            self._line.append(data)
+
+    def comment(self, text: str):
+        pass
+
+    def close(self) -> str:
+        self._break()
+        return "\n".join(self.lines)
+
+    def _break(self):
+        if self._line:
+            line = _WHITESPACE_RE.sub(" ", "".join(self._line)).strip()
+            if line:
+                self.lines.append(line)
+            self._line = []
+
+class _StdlibHTMLParser(HTMLParser):
+    """未安装lxml时使用的标准库解析器，把事件转交给TextCollector"""
+
+    def __init__(self, collector: TextCollector):
+        super().__init__(convert_charrefs=True)
+        self.collector = collector
+
+    def handle_starttag(self, tag, attrs):
+        self.collector.start(tag)
+
+    def handle_startendtag(self, tag, attrs):
+        # <br/>等自闭合标签没有结束事件，只处理开始事件
+        self.collector.start(tag)
+
+    def handle_endtag(self, tag):
+        self.collector.end(tag)
+
+    def handle_data(self, data):
+        self.collector.data(data)
+
+@lru_cache(maxsize=None)
+def lxml_available() -> bool:
+    """是否已安装lxml"""
+    try:
+        import lxml.etree  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+def extract_html_text(stream: BinaryIO, encoding: Optional[str] = None, use_lxml: Optional[bool] = None) -> str:
+    """
+    流式解码并提取HTML正文文本，安装了lxml时使用lxml（C实现），否则使用标准库html.parser
+
+    Args:
+        stream: 二进制文件对象
+        encoding: 编码，未指定时自动检测
+        use_lxml: 是否使用lxml，默认在已安装时使用
+
+    Returns:
+        str: 正文文本，每个块级元素一行
+    """
+    if use_lxml is None:
+        use_lxml = lxml_available()
+    collector = TextCollector()
+    if use_lxml:
+        from lxml import etree
+        parser = etree.HTMLParser(target=collector)
+        for text in iter_decoded(stream, encoding):
+            parser.feed(text)
+        return parser.close()
+
+    parser = _StdlibHTMLParser(collector)
+    for text in iter_decoded(stream, encoding):
+        parser.feed(text)
+    parser.close()
+    return collector.close()
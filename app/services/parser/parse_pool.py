@@ -0,0 +1,173 @@
+import asyncio
+import logging
+import weakref
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+class ParsePoolBusyError(Exception):
+    """解析进程池的等待队列已满"""
+
+class ParseError(Exception):
+    """解析进程中抛出的错误（可以跨进程传递）"""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+class ParsePool:
+    """
+    文档解析进程池
+
+    PDF、HTML、DOCX解析都是CPU密集型操作，放到独立进程中执行，避免阻塞事件循环。
+    正在执行和排队的任务总数有上限，超过时立即拒绝；每个子进程执行一定数量的任务后
+    会被替换，防止解析库的内存泄漏累积。解析超时时结束进程池的全部子进程并重建，
+    卡住的解析不会一直占用子进程；同一进程池中被连带结束的任务会在新进程池中重新执行一次。
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 2,
+        max_queue: int = 32,
+        max_tasks_per_child: int = 100,
+        timeout: float = 60.0,
+        enabled: bool = True
+    ):
+        """
+        初始化进程池（子进程在首次提交任务时启动）
+
+        Args:
+            max_workers: 解析进程数
+            max_queue: 所有进程都忙时允许排队的任务数
+            max_tasks_per_child: 每个子进程执行多少个任务后被替换
+            timeout: 单个解析任务的超时时间（秒）
+            enabled: 是否启用进程池，禁用时在线程池中解析
+        """
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.max_tasks_per_child = max_tasks_per_child
+        self.timeout = timeout
+        self.enabled = enabled
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._in_flight = 0
+        self._submitted = 0
+        self._recycles_children = False
+        # 因解析超时被强制结束的进程池
+        self._killed = weakref.WeakSet()
+
+    @property
+    def in_flight(self) -> int:
+        """正在执行和排队的任务数"""
+        return self._in_flight
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # 使用spawn启动子进程，避免fork时复制事件循环、数据库连接等状态
+            context = multiprocessing.get_context("spawn")
+            try:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    max_tasks_per_child=self.max_tasks_per_child
+                )
+                self._recycles_children = True
+            except TypeError:
+                # Python 3.11之前不支持max_tasks_per_child，由_maybe_recycle整体替换进程池
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=context)
+                self._recycles_children = False
+            self._submitted = 0
+            logger.info(f"解析进程池已启动，进程数: {self.max_workers}")
+        return self._executor
+
+    def _maybe_recycle(self):
+        """不支持按子进程回收时，在执行足够多任务后整体替换进程池"""
+        if self._executor is None or self._recycles_children:
+            return
+        if self._submitted < self.max_workers * self.max_tasks_per_child:
+            return
+        # 已提交的任务在旧进程池中继续执行完
+        old, self._executor = self._executor, None
+        old.shutdown(wait=False)
+
+    async def run(self, func: Callable[..., Any], *args) -> Any:
+        """
+        在解析进程中执行函数
+
+        Args:
+            func: 模块级函数（需要可以被pickle）
+            *args: 函数参数
+
+        Returns:
+            Any: 函数返回值
+
+        Raises:
+            ParsePoolBusyError: 排队任务已满
+            asyncio.TimeoutError: 解析超时
+        """
+        if self._in_flight >= self.max_workers + self.max_queue:
+            raise ParsePoolBusyError(f"解析队列已满（{self._in_flight} 个任务）")
+
+        self._in_flight += 1
+        try:
+            if not self.enabled:
+                return await asyncio.wait_for(asyncio.to_thread(func, *args), self.timeout)
+
+            loop = asyncio.get_running_loop()
+            for attempt in range(2):
+                self._maybe_recycle()
+                executor = self._get_executor()
+                future = loop.run_in_executor(executor, func, *args)
+                self._submitted += 1
+                try:
+                    return await asyncio.wait_for(future, self.timeout)
+                except asyncio.TimeoutError:
+                    # 取消只对asyncio的等待有效，子进程仍在执行，只能结束子进程；
+                    # 子进程真正退出后才释放名额，排队上限始终反映实际占用的进程
+                    logger.error(f"解析超时（{self.timeout}秒），结束解析进程并重建进程池")
+                    await asyncio.to_thread(self._kill_executor, executor)
+                    raise
+                except BrokenProcessPool:
+                    if self._executor is executor:
+                        self._executor = None
+                    if executor in self._killed and attempt == 0:
+                        logger.warning("进程池因其他任务解析超时被结束，在新进程池中重新执行")
+                        continue
+                    # 子进程异常退出（如内存耗尽），丢弃进程池，下次提交时重建
+                    logger.error("解析进程异常退出，重建进程池")
+                    raise
+        finally:
+            self._in_flight -= 1
+
+    def _kill_executor(self, executor: ProcessPoolExecutor, join_timeout: float = 5.0):
+        """强制结束进程池的全部子进程并等待退出（在线程中调用）"""
+        if self._executor is executor:
+            self._executor = None
+        self._killed.add(executor)
+        # ProcessPoolExecutor没有公开结束子进程的接口
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        for process in processes:
+            if process.is_alive():
+                process.kill()
+        for process in processes:
+            process.join(join_timeout)
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    def shutdown(self, wait: bool = True):
+        """关闭进程池"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+# 创建默认解析进程池
+default_parse_pool = ParsePool(
+    max_workers=settings.PARSE_POOL_WORKERS,
+    max_queue=settings.PARSE_POOL_MAX_QUEUE,
+    max_tasks_per_child=settings.PARSE_POOL_MAX_TASKS_PER_CHILD,
+    timeout=settings.PARSE_TIMEOUT,
+    enabled=settings.PARSE_POOL_ENABLED
+)
@@ -0,0 +1,137 @@
+import logging
+from typing import BinaryIO, Dict, List, Optional, Tuple, Union
+
+logger = logging.getLogger(__name__)
+
+PDFSource = Union[str, BinaryIO]
+
+class PDFEngineError(Exception):
+    """所有PDF引擎都无法提取出文本"""
+
+class PDFEngine:
+    """PDF文本提取引擎"""
+
+    name = ""
+
+    def available(self) -> bool:
+        """引擎依赖的库是否已安装"""
+        raise NotImplementedError
+
+    def extract_pages(self, source: PDFSource) -> List[str]:
+        """
+        提取每一页的文本
+
+        Args:
+            source: 文件路径或二进制文件对象
+
+        Returns:
+            List[str]: 每页的文本
+        """
+        raise NotImplementedError
+
+    @staticmethod
+    def _module_available(module: str) -> bool:
+        try:
+            __import__(module)
+            return True
+        except ImportError:
+            return False
+
+class PyPDF2Engine(PDFEngine):
+    """PyPDF2：纯Python实现，速度一般"""
+
+    name = "pypdf2"
+
+    def available(self) -> bool:
+        return self._module_available("PyPDF2")
+
+    def extract_pages(self, source: PDFSource) -> List[str]:
+        import PyPDF2
+        reader = PyPDF2.PdfReader(source)
+        return [page.extract_text() or "" for page in reader.pages]
+
+class PdfMinerEngine(PDFEngine):
+    """pdfminer.six：按版面分析提取，对多栏排版和CJK文本效果较好，速度较慢"""
+
+    name = "pdfminer"
+
+    def available(self) -> bool:
+        return self._module_available("pdfminer.high_level")
+
+    def extract_pages(self, source: PDFSource) -> List[str]:
+        from pdfminer.high_level import extract_pages
+        from pdfminer.layout import LTTextContainer
+        # extract_pages逐页做版面分析，只需遍历一次文档
+        return [
+            "".join(element.get_text() for element in page if isinstance(element, LTTextContainer))
+            for page in extract_pages(source)
+        ]
+
+class PdfiumEngine(PDFEngine):
+    """pypdfium2（可选）：基于PDFium的C实现，速度最快"""
+
+    name = "pdfium"
+
+    def available(self) -> bool:
+        return self._module_available("pypdfium2")
+
+    def extract_pages(self, source: PDFSource) -> List[str]:
+        import pypdfium2 as pdfium
+        document = pdfium.PdfDocument(source)
+        try:
+            pages = []
+            for index in range(len(document)):
+                page = document[index]
+                text_page = page.get_textpage()
+                pages.append(text_page.get_text_range())
+                text_page.close()
+                page.close()
+            return pages
+        finally:
+            document.close()
+
+# 已注册的引擎
+PDF_ENGINES: Dict[str, PDFEngine] = {
+    engine.name: engine for engine in (PyPDF2Engine(), PdfMinerEngine(), PdfiumEngine())
+}
+
+def get_engine(name: str) -> Optional[PDFEngine]:
+    """按名称获取已安装的引擎，未注册或未安装时返回None"""
+    engine = PDF_ENGINES.get(name)
+    if engine is None or not engine.available():
+        return None
+    return engine
+
+def extract_pdf_text(source: PDFSource, engine_names: List[str]) -> Tuple[str, str]:
+    """
+    按配置的顺序尝试各个引擎提取PDF文本，引擎出错或提取结果为空时换下一个
+
+    Args:
+        source: 文件路径或二进制文件对象
+        engine_names: 引擎名称列表（按优先级排序）
+
+    Returns:
+        Tuple[str, str]: (文本, 实际使用的引擎名称)
+
+    Raises:
+        PDFEngineError: 所有引擎都失败或提取不到文本
+    """
+    errors = []
+    for name in engine_names:
+        engine = get_engine(name)
+        if engine is None:
+            errors.append(f"{name}: 未安装")
+            continue
+        if not isinstance(source, str):
+            source.seek(0)
+        try:
+            text = "\n".join(engine.extract_pages(source))
+        except Exception as e:
+            logger.warning(f"PDF引擎 {name} 提取失败: {e}")
+            errors.append(f"{name}: {e}")
+            continue
+        if text.strip():
+            return text, name
+        logger.info(f"PDF引擎 {name} 未提取到文本，尝试下一个引擎")
+        errors.append(f"{name}: 文本为空")
+    raise PDFEngineError(f"无法提取PDF文本（{'; '.join(errors)}）")
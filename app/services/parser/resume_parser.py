@@ -1,53 +1,203 @@
 import os
-import PyPDF2
-from bs4 import BeautifulSoup
-import html2text
+import uuid
+import hashlib
+from contextlib import closing
 from fastapi import UploadFile, HTTPException
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, BinaryIO
+import asyncio
 import logging
+from app.core.config import settings
+from app.services.parser.parse_pool import ParsePool, ParseError, ParsePoolBusyError, default_parse_pool
+from app.services.parser.pdf_engines import extract_pdf_text
+from app.services.parser.field_extractor import extract_fields
+from app.services.parser.html_text import extract_html_text, read_text
+from app.services.storage.base import FileStorage, StorageNotFoundError, storage_key
+from app.services.storage.factory import default_storage
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 解析器版本，修改解析逻辑后需要更新，使已保存的解析结果失效
+PARSER_VERSION = "4"
+
 class ResumeParser:
     """简历解析类，支持多种格式的简历"""
 
-    def __init__(self, upload_dir: str):
+    def __init__(
+        self,
+        upload_dir: str,
+        parse_pool: ParsePool = None,
+        pdf_engines: List[str] = None,
+        storage: FileStorage = None
+    ):
         """
         初始化简历解析器
         
         Args:
-            upload_dir: 文件上传目录
+            upload_dir: 本地临时文件目录，上传的文件先写到这里，计算出哈希后再保存到存储后端
+            parse_pool: 解析进程池，默认使用全局进程池
+            pdf_engines: PDF提取引擎的尝试顺序，默认使用配置中的PDF_ENGINES
+            storage: 文件存储后端，默认使用全局存储（见STORAGE_BACKEND）
         """
         self.upload_dir = upload_dir
+        self.parse_pool = parse_pool if parse_pool is not None else default_parse_pool
+        self.pdf_engines = pdf_engines or settings.pdf_engine_order
+        self.storage = storage if storage is not None else default_storage
         os.makedirs(upload_dir, exist_ok=True)
         
-    async def save_upload_file(self, upload_file: UploadFile) -> str:
+    async def spool_upload_file(self, upload_file: UploadFile, max_size: int = None) -> Dict[str, Any]:
         """
-        保存上传的文件
+        以固定大小的分块将上传的文件写入本地临时文件，同时计算SHA-256，超过大小限制时立即中止
         
         Args:
             upload_file: 上传的文件对象
+            max_size: 允许的最大字节数，默认使用配置中的MAX_UPLOAD_SIZE
             
         Returns:
-            str: 保存的文件路径
+            Dict: 临时文件路径(path)、SHA-256(sha256)和字节数(size)，调用方负责删除临时文件
         """
-        file_path = os.path.join(self.upload_dir, upload_file.filename)
+        max_size = max_size or settings.MAX_UPLOAD_SIZE
+        
+        # 客户端声明了大小时，不读取内容直接拒绝
+        declared_size = getattr(upload_file, "size", None)
+        if declared_size is not None and declared_size > max_size:
+            raise HTTPException(status_code=413, detail=f"文件大小超过限制 ({max_size} 字节)")
+        
+        temp_path = os.path.join(self.upload_dir, f"{uuid.uuid4().hex}.part")
+        digest = hashlib.sha256()
+        size = 0
+        
+        def write_chunk(buffer, chunk: bytes):
+            digest.update(chunk)
+            buffer.write(chunk)
         
         try:
-            with open(file_path, "wb") as buffer:
-                content = await upload_file.read()
-                buffer.write(content)
-            return file_path
+            with open(temp_path, "wb") as buffer:
+                while True:
+                    chunk = await upload_file.read(settings.UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_size:
+                        raise HTTPException(status_code=413, detail=f"文件大小超过限制 ({max_size} 字节)")
+                    # 哈希和写盘在线程中执行，不阻塞事件循环
+                    await asyncio.to_thread(write_chunk, buffer, chunk)
+            return {"path": temp_path, "sha256": digest.hexdigest(), "size": size}
         except Exception as e:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            if isinstance(e, HTTPException):
+                raise
             logger.error(f"保存文件失败: {e}")
             raise HTTPException(status_code=500, detail=f"保存文件失败: {e}")
 
+    async def save_upload_file(self, upload_file: UploadFile, max_size: int = None) -> Dict[str, Any]:
+        """
+        流式保存上传的文件到存储后端
+        
+        文件先写入本地临时文件，完整写入后按内容哈希保存（见storage_key），相同文件只保存一份。
+        
+        Args:
+            upload_file: 上传的文件对象
+            max_size: 允许的最大字节数，默认使用配置中的MAX_UPLOAD_SIZE
+            
+        Returns:
+            Dict: 存储键(key)、SHA-256(sha256)、字节数(size)，以及是否为新文件(created)
+        """
+        spooled = await self.spool_upload_file(upload_file, max_size)
+        file_ext = Path(upload_file.filename).suffix.lower()
+        try:
+            return await asyncio.to_thread(
+                self._store_temp_file, spooled["path"], spooled["sha256"], spooled["size"], file_ext
+            )
+        except Exception as e:
+            logger.error(f"保存文件失败: {e}")
+            raise HTTPException(status_code=500, detail=f"保存文件失败: {e}")
+        finally:
+            if os.path.exists(spooled["path"]):
+                os.remove(spooled["path"])
+
+    def save_stream(self, stream: BinaryIO, file_ext: str, max_size: int = None) -> Dict[str, Any]:
+        """
+        从二进制流（如ZIP压缩包中的文件）分块保存文件，同步执行，需要在线程中调用
+        
+        Args:
+            stream: 二进制文件对象
+            file_ext: 文件扩展名（包含点）
+            max_size: 允许的最大字节数，默认使用配置中的MAX_UPLOAD_SIZE
+            
+        Returns:
+            Dict: 与save_upload_file相同
+        """
+        max_size = max_size or settings.MAX_UPLOAD_SIZE
+        temp_path = os.path.join(self.upload_dir, f"{uuid.uuid4().hex}.part")
+        digest = hashlib.sha256()
+        size = 0
+        
+        try:
+            with open(temp_path, "wb") as buffer:
+                while True:
+                    chunk = stream.read(settings.UPLOAD_CHUNK_SIZE)
+                    if not chunk:
+                        break
+                    size += len(chunk)
+                    if size > max_size:
+                        raise HTTPException(status_code=413, detail=f"文件大小超过限制 ({max_size} 字节)")
+                    digest.update(chunk)
+                    buffer.write(chunk)
+            return self._store_temp_file(temp_path, digest.hexdigest(), size, file_ext)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def _store_temp_file(self, temp_path: str, sha256: str, size: int, file_ext: str) -> Dict[str, Any]:
+        """按内容哈希保存到存储后端，相同文件只保存一份，不同文件也不会因为重名而互相覆盖"""
+        key = storage_key(sha256, file_ext)
+        created = not self.storage.exists(key)
+        if created:
+            self.storage.save_file(key, temp_path)
+        return {"key": key, "sha256": sha256, "size": size, "created": created}
+
+    def hash_stored(self, key: str) -> Dict[str, Any]:
+        """
+        流式读取存储后端中的文件，计算SHA-256和字节数（同步执行，需要在线程中调用）
+        
+        Args:
+            key: 存储键
+            
+        Returns:
+            Dict: sha256和size
+        """
+        digest = hashlib.sha256()
+        size = 0
+        with closing(self.storage.open(key)) as stream:
+            while True:
+                chunk = stream.read(settings.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size += len(chunk)
+                digest.update(chunk)
+        return {"sha256": digest.hexdigest(), "size": size}
+
+    def parse_stored(self, key: str) -> Dict[str, Any]:
+        """
+        解析存储后端中的简历文件，远程存储的文件先下载到本地临时文件
+        
+        Args:
+            key: 存储键
+            
+        Returns:
+            Dict: 解析后的简历数据
+        """
+        try:
+            with self.storage.local_copy(key) as file_path:
+                return self.parse_resume(file_path)
+        except StorageNotFoundError:
+            raise HTTPException(status_code=404, detail=f"文件不存在: {key}")
+
     def parse_resume(self, file_path: str) -> Dict[str, Any]:
         """
-        解析简历文件
+        解析简历文件，并从文本中提取学历、工作年限、技能和联系方式等结构化字段
         
         Args:
             file_path: 文件路径
@@ -59,31 +209,50 @@ class ResumeParser:
         
         try:
             if file_ext == '.pdf':
-                return self._parse_pdf(file_path)
+                parsed = self._parse_pdf(file_path)
             elif file_ext == '.html':
-                return self._parse_html(file_path)
+                parsed = self._parse_html(file_path)
             elif file_ext == '.txt':
-                return self._parse_txt(file_path)
+                parsed = self._parse_txt(file_path)
             elif file_ext == '.docx':
-                return self._parse_docx(file_path)
+                parsed = self._parse_docx(file_path)
             else:
                 raise HTTPException(status_code=400, detail=f"不支持的文件格式: {file_ext}")
+            parsed["fields"] = extract_fields(parsed["content"])
+            return parsed
         except Exception as e:
             logger.error(f"解析文件失败: {e}")
             raise HTTPException(status_code=500, detail=f"解析文件失败: {e}")
 
+    async def parse_resume_async(self, key: str) -> Dict[str, Any]:
+        """
+        在解析进程池中解析存储后端中的简历文件，不阻塞事件循环
+        
+        Args:
+            key: 存储键
+            
+        Returns:
+            Dict: 解析后的简历数据
+        """
+        try:
+            return await self.parse_pool.run(parse_stored_file, key)
+        except ParseError as e:
+            raise HTTPException(status_code=e.status_code, detail=e.detail)
+        except ParsePoolBusyError as e:
+            logger.warning(f"解析队列已满，拒绝解析 {key}: {e}")
+            raise HTTPException(status_code=503, detail="解析服务繁忙，请稍后重试")
+        except asyncio.TimeoutError:
+            logger.error(f"解析文件超时: {key}")
+            raise HTTPException(status_code=504, detail="解析文件超时")
+
     def _parse_pdf(self, file_path: str) -> Dict[str, Any]:
-        """解析PDF格式的简历"""
+        """解析PDF格式的简历，按PDF_ENGINES配置的顺序选择提取引擎"""
         try:
-            text = ""
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                for page in pdf_reader.pages:
-                    text += page.extract_text()
-                    
+            text, engine = extract_pdf_text(file_path, self.pdf_engines)
             return {
                 "content": text,
                 "format": "pdf",
+                "engine": engine,
                 "path": file_path
             }
         except Exception as e:
@@ -91,23 +260,10 @@ class ResumeParser:
             raise HTTPException(status_code=500, detail=f"PDF解析错误: {e}")
 
     def _parse_html(self, file_path: str) -> Dict[str, Any]:
-        """解析HTML格式的简历"""
+        """解析HTML格式的简历，按BOM、<meta charset>或内容检测编码，安装了lxml时使用lxml"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                html_content = file.read()
-                
-            soup = BeautifulSoup(html_content, 'html.parser')
-            
-            # 移除script和style元素
-            for script in soup(["script", "style"]):
-                script.extract()
-                
-            text = soup.get_text()
-            
-            # 处理文本，删除多余空白
-            lines = (line.strip() for line in text.splitlines())
-            chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
-            text = '\n'.join(chunk for chunk in chunks if chunk)
+            with open(file_path, 'rb') as file:
+                text = extract_html_text(file)
             
             return {
                 "content": text,
@@ -119,10 +275,9 @@ class ResumeParser:
             raise HTTPException(status_code=500, detail=f"HTML解析错误: {e}")
 
     def _parse_txt(self, file_path: str) -> Dict[str, Any]:
-        """解析纯文本格式的简历"""
+        """解析纯文本格式的简历，编码检测与HTML相同（UTF-8或GB18030）"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as file:
-                text = file.read()
+            text = read_text(file_path)
                 
             return {
                 "content": text,
@@ -155,5 +310,15 @@ class ResumeParser:
             raise HTTPException(status_code=500, detail=f"DOCX解析错误: {e}")
 
 # 创建默认解析器实例
-from app.core.config import settings
-default_parser = ResumeParser(settings.UPLOAD_DIR) 
\ No newline at end of file
+default_parser = ResumeParser(settings.UPLOAD_DIR)
+
+def parse_stored_file(key: str) -> Dict[str, Any]:
+    """
+    在解析进程中执行的解析函数，通过存储后端读取文件，任何节点都可以解析任何简历
+
+    HTTPException不一定能跨进程传递，这里转换为ParseError，由parse_resume_async还原
+    """
+    try:
+        return default_parser.parse_stored(key)
+    except HTTPException as e:
+        raise ParseError(e.status_code, str(e.detail)) 
\ No newline at end of file
@@ -0,0 +1,111 @@
+import os
+import shutil
+import logging
+import tempfile
+from contextlib import closing, contextmanager
+from typing import BinaryIO, Iterator
+
+logger = logging.getLogger(__name__)
+
+# 流式复制的分块大小
+COPY_CHUNK_SIZE = 1024 * 1024
+
+class StorageError(Exception):
+    """存储后端读写失败"""
+
+class StorageNotFoundError(StorageError):
+    """文件不存在"""
+
+def storage_key(sha256: str, file_ext: str) -> str:
+    """
+    按内容哈希生成文件的存储键: ab/cd/<sha256><扩展名>
+
+    Args:
+        sha256: 文件的SHA-256
+        file_ext: 文件扩展名（包含点）
+
+    Returns:
+        str: 存储键，各个后端通用
+    """
+    return f"{sha256[:2]}/{sha256[2:4]}/{sha256}{file_ext}"
+
+class FileStorage:
+    """
+    文件存储接口（同步），上传的简历按存储键保存，任何节点都可以通过同一个键读取
+
+    接口是同步的，解析进程和Celery worker直接调用；在事件循环中使用时需要放到线程中执行。
+    """
+
+    name = ""
+
+    def open(self, key: str) -> BinaryIO:
+        """
+        以流的方式打开文件，调用方负责关闭
+
+        Raises:
+            StorageNotFoundError: 文件不存在
+        """
+        raise NotImplementedError
+
+    def save(self, key: str, stream: BinaryIO) -> None:
+        """从二进制流分块写入文件，已存在时覆盖"""
+        raise NotImplementedError
+
+    def exists(self, key: str) -> bool:
+        """文件是否存在"""
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        """删除文件，不存在时忽略"""
+        raise NotImplementedError
+
+    def size(self, key: str) -> int:
+        """
+        文件字节数
+
+        Raises:
+            StorageNotFoundError: 文件不存在
+        """
+        raise NotImplementedError
+
+    def presigned_put_url(self, key: str, expires_in: int, content_type: str = None) -> str:
+        """
+        生成客户端直接上传文件用的预签名PUT地址，文件内容不经过API服务器
+
+        Args:
+            key: 存储键
+            expires_in: 有效期（秒）
+            content_type: 上传时必须使用的Content-Type
+
+        Raises:
+            StorageError: 存储后端不支持预签名上传
+        """
+        raise StorageError(f"存储后端 {self.name} 不支持预签名上传")
+
+    def save_file(self, key: str, file_path: str) -> None:
+        """
+        保存本地文件，本地后端会直接移动文件，调用方不应再使用file_path
+
+        Args:
+            key: 存储键
+            file_path: 本地文件路径
+        """
+        with open(file_path, "rb") as stream:
+            self.save(key, stream)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        """
+        获取文件的本地路径，供只能读取路径的解析库使用；远程后端会先下载到临时文件，退出时删除
+
+        Yields:
+            str: 本地文件路径
+        """
+        suffix = os.path.splitext(key)[1]
+        fd, temp_path = tempfile.mkstemp(suffix=suffix)
+        try:
+            with os.fdopen(fd, "wb") as buffer, closing(self.open(key)) as stream:
+                shutil.copyfileobj(stream, buffer, COPY_CHUNK_SIZE)
+            yield temp_path
+        finally:
+            os.remove(temp_path)
@@ -0,0 +1,34 @@
+from app.core.config import settings
+from app.services.storage.base import FileStorage
+from app.services.storage.local_storage import LocalStorage
+from app.services.storage.gridfs_storage import GridFSStorage
+from app.services.storage.s3_storage import S3Storage
+
+def create_storage(backend: str = None) -> FileStorage:
+    """
+    按配置创建存储后端
+
+    Args:
+        backend: local, gridfs 或 s3，默认使用配置中的STORAGE_BACKEND
+
+    Returns:
+        FileStorage: 存储后端
+    """
+    backend = (backend or settings.STORAGE_BACKEND).lower()
+    if backend == "local":
+        return LocalStorage(settings.UPLOAD_DIR)
+    if backend == "gridfs":
+        return GridFSStorage(settings.MONGODB_URL, settings.MONGODB_DB, bucket=settings.GRIDFS_BUCKET)
+    if backend == "s3":
+        return S3Storage(
+            settings.S3_BUCKET,
+            prefix=settings.S3_PREFIX,
+            endpoint_url=settings.S3_ENDPOINT_URL,
+            access_key_id=settings.S3_ACCESS_KEY_ID,
+            secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+            region=settings.S3_REGION
+        )
+    raise ValueError(f"不支持的存储后端: {backend}")
+
+# 创建默认存储实例（各后端的连接在首次使用时建立）
+default_storage = create_storage()
@@ -0,0 +1,73 @@
+import os
+from typing import BinaryIO
+from app.services.storage.base import FileStorage, StorageNotFoundError
+
+class GridFSStorage(FileStorage):
+    """
+    MongoDB GridFS存储，文件以存储键作为filename
+
+    MongoClient在首次使用时创建，解析子进程和Celery worker各自建立连接。
+    """
+
+    name = "gridfs"
+
+    def __init__(self, mongodb_url: str, database: str, bucket: str = "uploads", chunk_size: int = 1024 * 1024):
+        """
+        初始化GridFS存储
+
+        Args:
+            mongodb_url: MongoDB连接地址
+            database: 数据库名称
+            bucket: GridFS bucket名称
+            chunk_size: GridFS分块大小（字节）
+        """
+        self.mongodb_url = mongodb_url
+        self.database = database
+        self.bucket_name = bucket
+        self.chunk_size = chunk_size
+        self._bucket = None
+        self._files = None
+        self._pid = None
+
+    def _connect(self):
+        """建立连接并返回(GridFSBucket, files集合)，fork之后在子进程中重新连接"""
+        if self._bucket is None or self._pid != os.getpid():
+            import gridfs
+            from pymongo import MongoClient
+            db = MongoClient(self.mongodb_url)[self.database]
+            self._bucket = gridfs.GridFSBucket(db, bucket_name=self.bucket_name, chunk_size_bytes=self.chunk_size)
+            self._files = db[f"{self.bucket_name}.files"]
+            self._pid = os.getpid()
+        return self._bucket, self._files
+
+    def open(self, key: str) -> BinaryIO:
+        import gridfs
+        bucket, _ = self._connect()
+        try:
+            return bucket.open_download_stream_by_name(key)
+        except gridfs.errors.NoFile:
+            raise StorageNotFoundError(key)
+
+    def save(self, key: str, stream: BinaryIO) -> None:
+        bucket, files = self._connect()
+        # 先写入新版本再删除旧版本，读取方总能读到完整的文件
+        old_ids = [doc["_id"] for doc in files.find({"filename": key}, {"_id": 1})]
+        bucket.upload_from_stream(key, stream)
+        for file_id in old_ids:
+            bucket.delete(file_id)
+
+    def exists(self, key: str) -> bool:
+        _, files = self._connect()
+        return files.find_one({"filename": key}, {"_id": 1}) is not None
+
+    def size(self, key: str) -> int:
+        _, files = self._connect()
+        document = files.find_one({"filename": key}, {"length": 1}, sort=[("uploadDate", -1)])
+        if document is None:
+            raise StorageNotFoundError(key)
+        return document["length"]
+
+    def delete(self, key: str) -> None:
+        bucket, files = self._connect()
+        for doc in files.find({"filename": key}, {"_id": 1}):
+            bucket.delete(doc["_id"])
@@ -0,0 +1,70 @@
+import os
+import shutil
+from contextlib import contextmanager
+from typing import BinaryIO, Iterator
+from app.services.storage.base import FileStorage, StorageNotFoundError, COPY_CHUNK_SIZE
+
+class LocalStorage(FileStorage):
+    """本地磁盘存储，存储键中的ab/cd/前缀作为两级子目录，避免单个目录下文件过多"""
+
+    name = "local"
+
+    def __init__(self, root: str):
+        """
+        初始化本地存储
+
+        Args:
+            root: 存储根目录
+        """
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def path(self, key: str) -> str:
+        """存储键对应的本地路径"""
+        return os.path.join(self.root, *key.split("/"))
+
+    def open(self, key: str) -> BinaryIO:
+        try:
+            return open(self.path(key), "rb")
+        except FileNotFoundError:
+            raise StorageNotFoundError(key)
+
+    def save(self, key: str, stream: BinaryIO) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # 先写临时文件再重命名，读取方不会看到写了一半的文件
+        temp_path = f"{path}.{os.getpid()}.part"
+        try:
+            with open(temp_path, "wb") as buffer:
+                shutil.copyfileobj(stream, buffer, COPY_CHUNK_SIZE)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def save_file(self, key: str, file_path: str) -> None:
+        path = self.path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        os.replace(file_path, path)
+
+    def exists(self, key: str) -> bool:
+        return os.path.exists(self.path(key))
+
+    def delete(self, key: str) -> None:
+        try:
+            os.remove(self.path(key))
+        except FileNotFoundError:
+            pass
+
+    def size(self, key: str) -> int:
+        try:
+            return os.path.getsize(self.path(key))
+        except FileNotFoundError:
+            raise StorageNotFoundError(key)
+
+    @contextmanager
+    def local_copy(self, key: str) -> Iterator[str]:
+        path = self.path(key)
+        if not os.path.exists(path):
+            raise StorageNotFoundError(key)
+        yield path
@@ -0,0 +1,106 @@
+import os
+from typing import BinaryIO, Optional
+from app.services.storage.base import FileStorage, StorageError, StorageNotFoundError
+
+class S3Storage(FileStorage):
+    """
+    S3兼容对象存储（AWS S3、MinIO等），依赖可选的boto3
+
+    指定endpoint_url时使用path-style寻址，可以直接对接本地的MinIO。
+    """
+
+    name = "s3"
+
+    def __init__(
+        self,
+        bucket: str,
+        prefix: str = "",
+        endpoint_url: Optional[str] = None,
+        access_key_id: Optional[str] = None,
+        secret_access_key: Optional[str] = None,
+        region: Optional[str] = None
+    ):
+        """
+        初始化S3存储
+
+        Args:
+            bucket: bucket名称
+            prefix: 对象键前缀
+            endpoint_url: S3兼容服务地址（如 http://localhost:9000），为空时使用AWS
+            access_key_id: 访问密钥ID，为空时使用boto3的默认凭证链
+            secret_access_key: 访问密钥
+            region: 区域
+        """
+        self.bucket = bucket
+        self.prefix = prefix.strip("/")
+        self.endpoint_url = endpoint_url or None
+        self.access_key_id = access_key_id or None
+        self.secret_access_key = secret_access_key or None
+        self.region = region or None
+        self._client = None
+        self._pid = None
+
+    @property
+    def client(self):
+        """boto3客户端，fork之后在子进程中重新创建"""
+        if self._client is None or self._pid != os.getpid():
+            try:
+                import boto3
+                from botocore.config import Config
+            except ImportError:
+                raise StorageError("使用S3存储需要安装boto3")
+            self._client = boto3.client(
+                "s3",
+                endpoint_url=self.endpoint_url,
+                aws_access_key_id=self.access_key_id,
+                aws_secret_access_key=self.secret_access_key,
+                region_name=self.region,
+                config=Config(s3={"addressing_style": "path" if self.endpoint_url else "auto"})
+            )
+            self._pid = os.getpid()
+        return self._client
+
+    def object_key(self, key: str) -> str:
+        return f"{self.prefix}/{key}" if self.prefix else key
+
+    def open(self, key: str) -> BinaryIO:
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.get_object(Bucket=self.bucket, Key=self.object_key(key))["Body"]
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404"):
+                raise StorageNotFoundError(key)
+            raise StorageError(str(e))
+
+    def save(self, key: str, stream: BinaryIO) -> None:
+        # upload_fileobj按分块上传，大文件自动使用multipart
+        self.client.upload_fileobj(stream, self.bucket, self.object_key(key))
+
+    def _head(self, key: str) -> Optional[dict]:
+        """获取对象元数据，对象不存在时返回None"""
+        from botocore.exceptions import ClientError
+        try:
+            return self.client.head_object(Bucket=self.bucket, Key=self.object_key(key))
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in ("NoSuchKey", "404", "NotFound"):
+                return None
+            raise StorageError(str(e))
+
+    def exists(self, key: str) -> bool:
+        return self._head(key) is not None
+
+    def size(self, key: str) -> int:
+        head = self._head(key)
+        if head is None:
+            raise StorageNotFoundError(key)
+        return head["ContentLength"]
+
+    def presigned_put_url(self, key: str, expires_in: int, content_type: str = None) -> str:
+        # 只做本地签名计算，不访问存储服务
+        params = {"Bucket": self.bucket, "Key": self.object_key(key)}
+        if content_type:
+            params["ContentType"] = content_type
+        return self.client.generate_presigned_url("put_object", Params=params, ExpiresIn=expires_in)
+
+    def delete(self, key: str) -> None:
+        self.client.delete_object(Bucket=self.bucket, Key=self.object_key(key))
@@ -1,125 +1,567 @@
 from app.core.celery_app import celery_app
-from app.services.parser.resume_parser import default_parser
-from app.services.analyzer.resume_analyzer import default_analyzer
+from app.services.parser.document_store import document_store
+from app.services.parser.field_extractor import stored_fields
+from app.services.parser.direct_upload import direct_upload_service
+from app.services.analyzer.bulk_screening import bulk_screening_service
+from app.services.analyzer.resume_analyzer import get_default_analyzer
+from app.services.analyzer.rate_limiter import LLMUnavailableError
+from app.services.analyzer.idempotency import analysis_idempotency_key, analysis_deduplicator
 from app.services.notifier.notification_service import notification_service
-from app.models.database import get_database
+from app.core.worker_runtime import worker_runtime
+from app.core.fair_dispatch import LANES, LANE_PRIORITIES, fair_dispatcher
+from app.core.worker_autoscaler import inflight_tracker
+from celery import chain
+from celery.signals import (
+    worker_init, worker_ready, worker_process_init, worker_process_shutdown, worker_shutdown, task_success, task_failure,
+    task_prerun, task_postrun
+)
+import time
+import uuid
 import logging
-import asyncio
-from motor.motor_asyncio import AsyncIOMotorClient
 from app.core.config import settings
 from datetime import datetime
+from bson.objectid import ObjectId
 
-# 配置日志
-logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@celery_app.task(name="app.tasks.resume_tasks.analyze_resume_task")
-def analyze_resume_task(resume_id: str, requirements: dict, user_id: str):
+# 分析流水线的阶段，依次路由到parse（CPU）、llm（I/O）和notify（外发通知）队列
+ANALYSIS_STAGES = ("parse", "llm", "notify")
+
+def stage_task_id(pipeline_id: str, stage: str) -> str:
+    """流水线中某个阶段任务的ID，任务状态接口据此按流水线ID找到各阶段的结果"""
+    return f"{pipeline_id}-{stage}"
+
+def enqueue_resume_analysis(
+    resume_id: str,
+    requirements: dict,
+    user_id: str,
+    pipeline_id: str = None,
+    lane: str = "interactive"
+) -> str:
     """
-    异步分析简历任务
+    提交简历分析流水线：准备（预筛选、缓存、压缩）→ LLM分析 → 通知
+    
+    Args:
+        resume_id: 简历ID
+        requirements: 职位要求
+        user_id: 用户ID，同时作为公平调度的租户
+        pipeline_id: 流水线ID，默认随机生成
+        lane: 优先级通道，interactive（用户等待结果）、bulk（批量导入）或 backfill（后台补跑）
+        
+    Returns:
+        str: 流水线ID，可通过 GET /api/v1/tasks/{pipeline_id} 查询进度；
+             同一简历和职位要求版本的分析已在进行时，返回已有流水线的ID，不重复提交
+    """
+    if lane not in LANES:
+        raise ValueError(f"未知的优先级通道: {lane}")
+    pipeline_id = pipeline_id or str(uuid.uuid4())
+    idempotency_key = analysis_idempotency_key(resume_id, requirements)
+    owner = analysis_deduplicator.claim(idempotency_key, pipeline_id)
+    if owner is not None:
+        logger.info(f"简历 {resume_id} 的相同分析已在流水线 {owner} 中，不重复提交")
+        return owner
+    job = {
+        "pipeline_id": pipeline_id,
+        "resume_id": resume_id,
+        "requirements": requirements,
+        "user_id": user_id,
+        "lane": lane,
+        "enqueued_at": time.time(),
+        "idempotency_key": idempotency_key,
+    }
+    fair_dispatcher.submit(lane, user_id, job, _send_job)
+    return job["pipeline_id"]
+
+def _send_job(job: dict):
+    """公平调度器把任务提交到Celery的回调，按任务类型提交分析流水线或批量筛选分组"""
+    if job.get("kind") == "screening":
+        _start_screening_chunk(job)
+    else:
+        _start_pipeline(job)
+
+def _start_pipeline(job: dict):
+    """把流水线提交到Celery，三个阶段使用通道对应的消息优先级"""
+    pipeline_id, priority = job["pipeline_id"], LANE_PRIORITIES[job["lane"]]
+    chain(
+        prepare_analysis_task.s(
+            job["resume_id"], job["requirements"], job["user_id"],
+            lane=job["lane"], enqueued_at=job["enqueued_at"], idempotency_key=job.get("idempotency_key")
+        ).set(task_id=stage_task_id(pipeline_id, "parse"), priority=priority),
+        llm_analysis_task.s().set(task_id=stage_task_id(pipeline_id, "llm"), priority=priority),
+        notify_analysis_task.s().set(task_id=stage_task_id(pipeline_id, "notify"), priority=priority),
+    ).apply_async()
+
+@celery_app.task(name="app.tasks.resume_tasks.prepare_analysis_task", bind=True)
+def prepare_analysis_task(
+    self,
+    resume_id: str,
+    requirements: dict,
+    user_id: str,
+    lane: str = "interactive",
+    enqueued_at: float = None,
+    idempotency_key: str = None
+):
+    """
+    分析流水线第一阶段：读取简历，规则预筛选、查询缓存并压缩简历内容
     
     Args:
         resume_id: 简历ID
         requirements: 职位要求
         user_id: 用户ID
+        lane: 优先级通道
+        enqueued_at: 提交时间（时间戳），用于统计等待时间
+        idempotency_key: 幂等键，已有相同分析结果时后续阶段直接复用
     """
-    logger.info(f"开始分析简历: {resume_id}")
+    if enqueued_at is not None:
+        fair_dispatcher.record_wait(lane, user_id, time.time() - enqueued_at)
+    started_at = datetime.now().isoformat()
+    # 记录开始时间，供任务状态接口计算排队和执行耗时
+    self.update_state(state="STARTED", meta={"resume_id": resume_id, "started_at": started_at})
+    payload = worker_runtime.run(
+        _prepare_analysis_async(resume_id, requirements, user_id),
+        timeout=settings.WORKER_TASK_TIMEOUT
+    )
+    payload["started_at"] = started_at
+    payload["idempotency_key"] = idempotency_key
+    return payload
+
+@celery_app.task(
+    name="app.tasks.resume_tasks.llm_analysis_task",
+    bind=True,
+    max_retries=settings.LLM_TASK_MAX_RETRIES,
+    default_retry_delay=settings.LLM_TASK_RETRY_DELAY
+)
+def llm_analysis_task(self, payload: dict):
+    """分析流水线第二阶段：调用LLM并保存分析结果"""
+    try:
+        next_payload = worker_runtime.run(_llm_analysis_async(payload), timeout=settings.WORKER_TASK_TIMEOUT)
+    except LLMUnavailableError as e:
+        # AI提供商全部不可用，稍后重试而不是写入0分结果
+        logger.warning(f"分析简历 {payload['resume_id']} 时AI服务不可用，稍后重试: {e}")
+        raise self.retry(exc=e)
+    idempotency_key = next_payload.get("idempotency_key")
+    if idempotency_key and next_payload["result"].get("failed"):
+        # 出错的结果没有按幂等键保存，释放认领，允许立即重新提交
+        analysis_deduplicator.release(idempotency_key, self.request.id.rsplit("-", 1)[0])
+    return next_payload
+
+@celery_app.task(name="app.tasks.resume_tasks.notify_analysis_task", bind=True)
+def notify_analysis_task(self, payload: dict):
+    """分析流水线第三阶段：匹配度高时通知用户"""
+    return worker_runtime.run(_notify_analysis_async(payload), timeout=settings.WORKER_TASK_TIMEOUT)
+
+@celery_app.task(
+    name="app.tasks.resume_tasks.analyze_resume_task",
+    bind=True,
+    max_retries=settings.LLM_TASK_MAX_RETRIES,
+    default_retry_delay=settings.LLM_TASK_RETRY_DELAY
+)
+def analyze_resume_task(self, resume_id: str, requirements: dict, user_id: str):
+    """
+    在一个任务中依次执行分析流水线的全部阶段（兼容升级前已提交到resume_analysis队列的任务，
+    新任务请使用enqueue_resume_analysis）
     
-    # 创建事件循环
-    loop = asyncio.get_event_loop()
+    Args:
+        resume_id: 简历ID
+        requirements: 职位要求
+        user_id: 用户ID
+    """
+    logger.info(f"开始分析简历: {resume_id}")
+    started_at = datetime.now()
+    self.update_state(state="STARTED", meta={"resume_id": resume_id, "started_at": started_at.isoformat()})
     
     try:
-        # 执行异步分析
-        analysis_result = loop.run_until_complete(
-            _analyze_resume_async(resume_id, requirements, user_id)
+        # 在进程内常驻的事件循环中执行异步分析，多个任务线程共享同一个循环和客户端
+        summary = worker_runtime.run(
+            _analyze_resume_async(resume_id, requirements, user_id),
+            timeout=settings.WORKER_TASK_TIMEOUT
         )
-        
-        logger.info(f"简历 {resume_id} 分析完成，匹配分数: {analysis_result.match_score}")
         return {
-            "resume_id": resume_id,
-            "success": True,
-            "match_score": analysis_result.match_score,
-            "matches_requirements": analysis_result.matches_requirements
+            **summary,
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round((datetime.now() - started_at).total_seconds(), 3)
         }
+    except LLMUnavailableError as e:
+        logger.warning(f"分析简历 {resume_id} 时AI服务不可用，稍后重试: {e}")
+        raise self.retry(exc=e)
     except Exception as e:
         logger.error(f"分析简历 {resume_id} 失败: {e}")
         return {
             "resume_id": resume_id,
             "success": False,
-            "error": str(e)
+            "error": str(e),
+            "started_at": started_at.isoformat(),
+            "duration_seconds": round((datetime.now() - started_at).total_seconds(), 3)
         }
 
 async def _analyze_resume_async(resume_id: str, requirements: dict, user_id: str):
+    """在当前任务中依次执行三个阶段"""
+    payload = await _prepare_analysis_async(resume_id, requirements, user_id)
+    payload["idempotency_key"] = analysis_idempotency_key(resume_id, requirements)
+    payload = await _llm_analysis_async(payload)
+    return await _notify_analysis_async(payload)
+
+async def _prepare_analysis_async(resume_id: str, requirements: dict, user_id: str) -> dict:
     """
-    异步执行简历分析流程
+    读取简历内容并完成LLM调用前的准备
+    
+    Returns:
+        Dict: 传给下一阶段的数据（只包含可JSON序列化的值）
     """
-    # 创建MongoDB客户端
-    client = AsyncIOMotorClient(settings.MONGODB_URL)
-    db = client[settings.MONGODB_DB]
+    # 使用运行时共享的MongoDB客户端
+    db = await worker_runtime.get_database()
     
-    try:
-        # 查询简历
-        resume = await db["resumes"].find_one({"_id": resume_id})
-        if not resume:
-            raise ValueError(f"找不到指定的简历: {resume_id}")
-        
-        # 分析简历
-        analysis_result = await default_analyzer.analyze_resume(
-            resume_content=resume["content"],
-            requirements=requirements
-        )
-        
-        # 将分析结果保存到数据库
-        analysis_data = {
-            "resume_id": resume_id,
-            "requirements": requirements,
-            "result": analysis_result.dict(),
-            "user_id": user_id,
-            "created_at": datetime.now()
-        }
-        
+    # 查询简历
+    resume = await db["resumes"].find_one({"_id": resume_id})
+    if not resume:
+        raise ValueError(f"找不到指定的简历: {resume_id}")
+    
+    prepared = await get_default_analyzer().prepare_analysis(
+        resume_content=await document_store.load_content(db, resume),
+        requirements=requirements,
+        fields=stored_fields(resume)
+    )
+    return {
+        "resume_id": resume_id,
+        "requirements": requirements,
+        "user_id": user_id,
+        "candidate_name": resume["candidate_name"],
+        "position": resume["position"],
+        "prepared": prepared,
+    }
+
+async def _llm_analysis_async(payload: dict) -> dict:
+    """调用LLM分析简历，保存分析结果并更新简历状态；相同分析已有结果时直接复用"""
+    db = await worker_runtime.get_database()
+    resume_id = payload["resume_id"]
+    idempotency_key = payload.get("idempotency_key")
+    # 压缩后的简历内容不再需要，不传给通知阶段
+    next_payload = {key: value for key, value in payload.items() if key != "prepared"}
+    
+    # 重复提交或消息重新投递时，已保存的结果直接复用，不再调用LLM
+    if idempotency_key:
+        existing = await analysis_deduplicator.find_existing(db, idempotency_key)
+        if existing is not None:
+            await analysis_deduplicator.stats.incr("reused_results")
+            logger.info(f"简历 {resume_id} 已有相同的分析结果 {existing['_id']}，跳过LLM调用")
+            next_payload.update(analysis_id=existing["_id"], result=existing["result"], deduplicated=True)
+            return next_payload
+    
+    analysis_result = await get_default_analyzer().complete_analysis(payload["prepared"])
+    
+    # 将分析结果保存到数据库
+    analysis_id = str(ObjectId())
+    analysis_data = {
+        "_id": analysis_id,
+        "resume_id": resume_id,
+        "requirements": payload["requirements"],
+        "result": analysis_result.dict(),
+        "user_id": payload["user_id"],
+        "created_at": datetime.now()
+    }
+    
+    if idempotency_key:
+        analysis_id, created = await analysis_deduplicator.save(db, idempotency_key, analysis_data)
+        if not created:
+            # 并发执行的重复任务先保存了结果，以它为准，不重复通知
+            existing = await db["analyses"].find_one({"_id": analysis_id})
+            next_payload.update(analysis_id=analysis_id, result=existing["result"], deduplicated=True)
+            return next_payload
+    else:
         await db["analyses"].insert_one(analysis_data)
+    
+    # 更新简历状态
+    update_data = {
+        "status": "analyzed", 
+        "last_analyzed_at": datetime.now(),
+        "matches_requirements": analysis_result.matches_requirements,
+        "match_score": analysis_result.match_score
+    }
+    
+    await db["resumes"].update_one(
+        {"_id": resume_id},
+        {"$set": update_data}
+    )
+    
+    logger.info(f"简历 {resume_id} 分析完成，匹配分数: {analysis_result.match_score}")
+    next_payload.update(analysis_id=analysis_id, result=analysis_result.dict())
+    return next_payload
+
+async def _notify_analysis_async(payload: dict) -> dict:
+    """匹配度高时通知用户，并将简历状态更新为匹配"""
+    resume_id, user_id, result = payload["resume_id"], payload["user_id"], payload["result"]
+    notified = False
+    
+    # 如果匹配度高，发送通知（复用已有结果时已经通知过）
+    if result["match_score"] >= 70 and not payload.get("deduplicated"):  # 可以配置阈值
+        db = await worker_runtime.get_database()
         
-        # 更新简历状态
-        update_data = {
-            "status": "analyzed", 
-            "last_analyzed_at": datetime.now(),
-            "matches_requirements": analysis_result.matches_requirements,
-            "match_score": analysis_result.match_score
-        }
+        # 获取用户邮箱
+        user = await db["users"].find_one({"_id": user_id})
+        user_email = user.get("email") if user else None
         
+        # 发送通知
+        await notification_service.notify_resume_match(
+            user_id=user_id,
+            user_email=user_email,
+            resume_data={
+                "id": resume_id,
+                "candidate_name": payload["candidate_name"],
+                "position": payload["position"],
+                "timestamp": datetime.now().isoformat()
+            },
+            analysis_result=result
+        )
+        
+        # 更新简历状态为匹配
         await db["resumes"].update_one(
             {"_id": resume_id},
-            {"$set": update_data}
+            {"$set": {"status": "matched"}}
         )
-        
-        # 如果匹配度高，发送通知
-        if analysis_result.match_score >= 70:  # 可以配置阈值
-            # 获取用户邮箱
-            user = await db["users"].find_one({"_id": user_id})
-            user_email = user.get("email") if user else None
-            
-            # 发送通知
-            await notification_service.notify_resume_match(
-                user_id=user_id,
-                user_email=user_email,
-                resume_data={
-                    "id": resume_id,
-                    "candidate_name": resume["candidate_name"],
-                    "position": resume["position"],
-                    "timestamp": datetime.now().isoformat()
-                },
-                analysis_result=analysis_result.dict()
-            )
-            
-            # 更新简历状态为匹配
-            await db["resumes"].update_one(
-                {"_id": resume_id},
-                {"$set": {"status": "matched"}}
-            )
-        
-        return analysis_result
+        notified = True
     
+    return {
+        "resume_id": resume_id,
+        "success": True,
+        "analysis_id": payload["analysis_id"],
+        "match_score": result["match_score"],
+        "matches_requirements": result["matches_requirements"],
+        "notified": notified,
+        "deduplicated": bool(payload.get("deduplicated")),
+        "started_at": payload.get("started_at"),
+        "duration_seconds": _elapsed_seconds(payload.get("started_at")),
+    }
+
+def _elapsed_seconds(started_at: str = None):
+    """从流水线开始到现在的秒数"""
+    if not started_at:
+        return None
+    return round((datetime.now() - datetime.fromisoformat(started_at)).total_seconds(), 3)
+
+@celery_app.task(name="app.tasks.resume_tasks.parse_uploaded_resume_task", bind=True)
+def parse_uploaded_resume_task(self, upload_id: str):
+    """
+    解析客户端直传到对象存储的简历并创建简历记录
+    
+    Args:
+        upload_id: 直传上传ID
+    """
+    logger.info(f"开始解析直传简历: {upload_id}")
+    return worker_runtime.run(
+        _parse_uploaded_resume_async(upload_id),
+        timeout=settings.WORKER_TASK_TIMEOUT
+    )
+
+async def _parse_uploaded_resume_async(upload_id: str):
+    db = await worker_runtime.get_database()
+    return await direct_upload_service.process_upload(db, upload_id)
+
+def start_screening_job(job: dict, lane: str = "bulk"):
+    """
+    提交批量筛选任务：同时提交并发数个分组，每组完成后提交第 i+并发数 组
+
+    分组经过公平调度器提交，与ZIP批量导入共享bulk通道的窗口和按用户的轮转，
+    大批量筛选不会占满LLM队列、挤占交互式分析和其他用户的任务。
+
+    Args:
+        job: bulk_screening_service.create_job 返回的任务文档
+        lane: 优先级通道
+    """
+    if lane not in LANES:
+        raise ValueError(f"未知的优先级通道: {lane}")
+    stride = min(job["concurrency"], job["chunks"])
+    for chunk_index in range(stride):
+        _submit_screening_chunk(job["_id"], job["user_id"], chunk_index, stride, job["chunks"], lane)
+
+def _submit_screening_chunk(job_id: str, user_id: str, chunk_index: int, stride: int, chunks: int, lane: str):
+    fair_dispatcher.submit(lane, user_id, {
+        "kind": "screening",
+        "pipeline_id": f"screen-{job_id}-{chunk_index}",
+        "job_id": job_id,
+        "chunk_index": chunk_index,
+        "stride": stride,
+        "chunks": chunks,
+        "user_id": user_id,
+        "lane": lane,
+        "enqueued_at": time.time(),
+    }, _send_job)
+
+def _start_screening_chunk(job: dict):
+    """把批量筛选分组提交到Celery，使用通道对应的消息优先级"""
+    screen_chunk_task.apply_async(
+        args=(job["job_id"], job["chunk_index"], job["stride"], job["chunks"]),
+        kwargs={"lane": job["lane"], "user_id": job["user_id"], "enqueued_at": job["enqueued_at"]},
+        task_id=job["pipeline_id"],
+        priority=LANE_PRIORITIES[job["lane"]]
+    )
+
+@celery_app.task(
+    name="app.tasks.resume_tasks.screen_chunk_task",
+    bind=True,
+    max_retries=settings.LLM_TASK_MAX_RETRIES,
+    default_retry_delay=settings.LLM_TASK_RETRY_DELAY
+)
+def screen_chunk_task(
+    self,
+    job_id: str,
+    chunk_index: int,
+    stride: int,
+    chunks: int,
+    lane: str = "bulk",
+    user_id: str = None,
+    enqueued_at: float = None
+):
+    """
+    分析批量筛选任务中的一组简历并写入结果，然后提交同一并发槽位的下一组
+    
+    出错时（AI服务不可用、超时、数据库或存储错误）稍后重试，重试期间保留公平调度的名额；
+    重试耗尽后这一组中没有结果的简历计为失败，同样提交下一组，任务总能完成并通知用户。
+    
+    Args:
+        job_id: 批量筛选任务ID
+        chunk_index: 组序号
+        stride: 任务的并发数，第 chunk_index+stride 组由本任务提交
+        chunks: 任务的总组数
+        lane: 优先级通道
+        user_id: 用户ID（公平调度的租户）
+        enqueued_at: 提交时间（时间戳），用于统计等待时间
+    """
+    if enqueued_at is not None and not self.request.retries:
+        fair_dispatcher.record_wait(lane, user_id, time.time() - enqueued_at)
+    retrying = False
+    job_exists = True
+    try:
+        job = worker_runtime.run(
+            _screen_chunk_async(job_id, chunk_index),
+            timeout=settings.WORKER_TASK_TIMEOUT
+        )
+        if job is None:
+            logger.warning(f"批量筛选任务 {job_id} 不存在")
+            job_exists = False
+            return None
+        return {"job_id": job_id, "chunk_index": chunk_index}
+    except Exception as e:
+        if self.request.retries < self.max_retries:
+            logger.warning(f"批量筛选任务 {job_id} 第 {chunk_index} 组失败，稍后重试: {e}")
+            retrying = True
+            raise self.retry(exc=e)
+        worker_runtime.run(
+            _fail_screening_chunk_async(job_id, chunk_index, str(e) or type(e).__name__),
+            timeout=settings.WORKER_TASK_TIMEOUT
+        )
+        return {"job_id": job_id, "chunk_index": chunk_index, "failed": True}
+    finally:
+        if not retrying:
+            _continue_screening(self.request.id, job_id, user_id, chunk_index, stride, chunks, lane, job_exists)
+
+def _continue_screening(
+    task_id: str,
+    job_id: str,
+    user_id: str,
+    chunk_index: int,
+    stride: int,
+    chunks: int,
+    lane: str,
+    job_exists: bool
+):
+    """一组结束（成功或重试耗尽）后提交同一并发槽位的下一组，并释放本组占用的名额"""
+    try:
+        # 已处理过的组（消息重新投递）也要提交下一组，避免上次提交前中断导致后续分组丢失
+        next_index = chunk_index + stride
+        if job_exists and next_index < chunks:
+            _submit_screening_chunk(job_id, user_id, next_index, stride, chunks, lane)
     finally:
-        # 关闭MongoDB连接
-        client.close() 
\ No newline at end of file
+        # 先提交下一组再释放名额，释放时补充名额可以直接提交它
+        _release_dispatched(task_id)
+
+async def _screen_chunk_async(job_id: str, chunk_index: int):
+    db = await worker_runtime.get_database()
+    return await bulk_screening_service.screen_chunk(db, job_id, chunk_index)
+
+async def _fail_screening_chunk_async(job_id: str, chunk_index: int, error: str):
+    db = await worker_runtime.get_database()
+    return await bulk_screening_service.fail_chunk(db, job_id, chunk_index, error)
+
+@task_success.connect(sender=notify_analysis_task)
+def _release_finished_pipeline(sender=None, **kwargs):
+    """流水线完成后释放公平调度的名额，并提交下一批任务"""
+    _release_pipeline(sender.request.id)
+
+@task_failure.connect
+def _release_failed_pipeline(sender=None, task_id=None, args=None, kwargs=None, **extra):
+    """流水线任一阶段失败（重试耗尽）时同样释放名额，并释放幂等键的认领，允许重新提交"""
+    if sender is None or sender.name not in _STAGE_TASK_NAMES:
+        return
+    _release_pipeline(task_id)
+    # 第一阶段的幂等键在关键字参数中，后续阶段在上一阶段传来的数据中
+    idempotency_key = (kwargs or {}).get("idempotency_key")
+    if idempotency_key is None and args and isinstance(args[0], dict):
+        idempotency_key = args[0].get("idempotency_key")
+    if idempotency_key:
+        analysis_deduplicator.release(idempotency_key, task_id.rsplit("-", 1)[0])
+
+_STAGE_TASK_NAMES = {
+    "app.tasks.resume_tasks.prepare_analysis_task",
+    "app.tasks.resume_tasks.llm_analysis_task",
+    "app.tasks.resume_tasks.notify_analysis_task",
+}
+
+def _release_pipeline(stage_id: str):
+    _release_dispatched(stage_id.rsplit("-", 1)[0])
+
+def _release_dispatched(pipeline_id: str):
+    """释放公平调度的名额并补充提交同一通道的任务"""
+    try:
+        lane = fair_dispatcher.release(pipeline_id)
+        if lane is not None:
+            fair_dispatcher.refill(lane, _send_job)
+    except Exception as e:
+        logger.error(f"释放任务 {pipeline_id} 的调度名额失败: {e}")
+
+def _task_queue(task) -> str:
+    delivery_info = getattr(task.request, "delivery_info", None) or {}
+    return delivery_info.get("routing_key")
+
+@task_prerun.connect
+def _track_task_started(task_id=None, task=None, **kwargs):
+    """记录各队列正在执行的任务，供自动扩缩容计算负载"""
+    inflight_tracker.started(_task_queue(task), task_id)
+
+@task_postrun.connect
+def _track_task_finished(task_id=None, task=None, **kwargs):
+    inflight_tracker.finished(_task_queue(task), task_id)
+
+@worker_process_shutdown.connect
+@worker_shutdown.connect
+def _stop_worker_runtime(**kwargs):
+    """Worker进程退出时关闭常驻事件循环和共享客户端"""
+    worker_runtime.stop()
+
+def _warm_up_worker():
+    """在Worker的常驻事件循环中预热分析器"""
+    if not settings.WARM_UP_ON_STARTUP:
+        return
+    try:
+        worker_runtime.run(
+            get_default_analyzer().warm_up(timeout=settings.WARM_UP_TIMEOUT),
+            timeout=settings.WARM_UP_TIMEOUT * 2
+        )
+    except Exception as e:
+        logger.error(f"Worker预热失败，请检查AI提供商配置: {e}")
+
+_worker_state = {"prefork": False}
+
+@worker_init.connect
+def _record_worker_pool(sender=None, **kwargs):
+    """记录执行池类型：prefork池在子进程中预热，其他执行池在主进程中预热"""
+    pool_cls = getattr(sender, "pool_cls", None)
+    _worker_state["prefork"] = "prefork" in getattr(pool_cls, "__module__", str(pool_cls))
+
+@worker_process_init.connect
+def _warm_up_worker_process(**kwargs):
+    _warm_up_worker()
+
+@worker_ready.connect
+def _warm_up_worker_main(**kwargs):
+    if not _worker_state["prefork"]:
+        _warm_up_worker()
@@ -0,0 +1,87 @@
+"""
+HTML简历解析基准：原实现（BeautifulSoup html.parser + 逐行拆分）与流式提取
+（标准库html.parser / lxml）的耗时对比
+
+用法:
+    python benchmarks/bench_html_parser.py [--sizes 1 5 20] [--repeat 3] [--json]
+
+用 benchmarks/corpus.py 生成招聘网站导出格式的大HTML文件（UTF-8和GBK各一份），
+未安装的实现会被跳过。原实现固定按UTF-8读取，GBK文件会解析失败。
+"""
+import io
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import make_html
+from app.services.parser.html_text import extract_html_text, lxml_available
+
+# 每个经历段落约0.9KB，按目标大小换算段落数
+SECTION_BYTES = 900
+
+def legacy_extract(data: bytes) -> str:
+    """原实现：BeautifulSoup(html.parser)，按UTF-8解码后逐行、按双空格拆分"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(data.decode("utf-8"), "html.parser")
+    for script in soup(["script", "style"]):
+        script.extract()
+    text = soup.get_text()
+    lines = (line.strip() for line in text.splitlines())
+    chunks = (phrase.strip() for line in lines for phrase in line.split("  "))
+    return "\n".join(chunk for chunk in chunks if chunk)
+
+def implementations():
+    """可用的实现：名称 -> 提取函数"""
+    result = {}
+    try:
+        import bs4  # noqa: F401
+        result["bs4(原实现)"] = legacy_extract
+    except ImportError:
+        pass
+    result["html.parser"] = lambda data: extract_html_text(io.BytesIO(data), use_lxml=False)
+    if lxml_available():
+        result["lxml"] = lambda data: extract_html_text(io.BytesIO(data), use_lxml=True)
+    return result
+
+def main():
+    parser = argparse.ArgumentParser(description="HTML简历解析基准")
+    parser.add_argument("--sizes", type=float, nargs="+", default=[1, 5, 20], help="HTML文件大小（MB）")
+    parser.add_argument("--repeat", type=int, default=3, help="重复次数")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    args = parser.parse_args()
+
+    results = []
+    for size_mb in args.sizes:
+        sections = max(int(size_mb * 1024 * 1024 / SECTION_BYTES), 1)
+        for encoding in ("utf-8", "gbk"):
+            data = make_html(sections, seed=sections, encoding=encoding)
+            for name, extract in implementations().items():
+                result = {"implementation": name, "encoding": encoding, "size_mb": round(len(data) / 1024 / 1024, 2)}
+                try:
+                    started = time.perf_counter()
+                    for _ in range(args.repeat):
+                        text = extract(data)
+                    elapsed = (time.perf_counter() - started) / args.repeat
+                    result.update(seconds=round(elapsed, 4), mb_per_second=round(len(data) / 1024 / 1024 / elapsed, 1), chars=len(text))
+                except Exception as e:
+                    result["error"] = f"{type(e).__name__}: {e}"
+                results.append(result)
+
+    if args.json:
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'实现':<14}{'编码':<8}{'大小(MB)':>10}{'耗时(s)':>10}{'MB/s':>8}{'字符数':>10}")
+    for result in results:
+        if "error" in result:
+            print(f"{result['implementation']:<14}{result['encoding']:<8}{result['size_mb']:>10.2f}  失败: {result['error'][:60]}")
+            continue
+        print(f"{result['implementation']:<14}{result['encoding']:<8}{result['size_mb']:>10.2f}"
+              f"{result['seconds']:>10.3f}{result['mb_per_second']:>8.1f}{result['chars']:>10}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+LLM输出解析的回归检查和吞吐量基准
+
+用法:
+    python benchmarks/bench_output_parser.py [--iterations 2000]
+
+先用 benchmarks/data/llm_outputs.json 中收集的LLM输出逐条检查解析结果（任何一条不符合预期时以非0退出），
+再分别测量一次性解析和按流式片段增量解析的吞吐量。
+"""
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from app.services.analyzer.resume_analyzer import PydanticParser
+from app.services.analyzer.streaming import StreamingFieldExtractor
+
+CORPUS_PATH = Path(__file__).parent / "data" / "llm_outputs.json"
+
+def check_corpus(parser: PydanticParser, corpus) -> int:
+    """逐条检查回归语料，返回失败条数"""
+    failures = 0
+    for case in corpus:
+        try:
+            result = parser.parse_strict(case["text"])
+            outcome = "ok"
+        except Exception as e:
+            result, outcome = None, "error"
+            error = e
+
+        passed = outcome == case["expect"]
+        if passed and result is not None and "match_score" in case:
+            passed = result.match_score == case["match_score"]
+        if not passed:
+            failures += 1
+            detail = f"match_score={result.match_score}" if result is not None else f"{type(error).__name__}: {error}"
+            print(f"  FAIL {case['name']}: 期望 {case['expect']}，实际 {outcome} ({detail})")
+        else:
+            print(f"  ok   {case['name']}")
+    return failures
+
+def bench(label: str, func, texts, iterations: int):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for text in texts:
+            func(text)
+    elapsed = time.perf_counter() - start
+    total = iterations * len(texts)
+    print(f"  {label:<28} {total / elapsed:>10.0f} 次/秒  ({elapsed * 1e6 / total:.1f} us/次)")
+
+def parse_quietly(parser: PydanticParser):
+    def run(text):
+        try:
+            parser.parse_strict(text)
+        except Exception:
+            pass
+    return run
+
+def stream(text, chunk_size: int = 4):
+    extractor = StreamingFieldExtractor()
+    for i in range(0, len(text), chunk_size):
+        extractor.feed(text[i:i + chunk_size])
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="LLM输出解析的回归检查和吞吐量基准")
+    arg_parser.add_argument("--iterations", type=int, default=2000, help="每条语料的重复次数")
+    args = arg_parser.parse_args()
+
+    corpus = json.loads(CORPUS_PATH.read_text(encoding="utf-8"))
+    parser = PydanticParser()
+
+    print(f"回归检查（{len(corpus)} 条）:")
+    failures = check_corpus(parser, corpus)
+
+    valid_texts = [case["text"] for case in corpus if case["expect"] == "ok"]
+    clean_texts = [case["text"] for case in corpus if case["name"] in ("plain_object", "fenced_json_block")]
+    print("\n吞吐量:")
+    bench("完整JSON（快速路径）", parse_quietly(parser), clean_texts, args.iterations)
+    bench("全部可解析语料", parse_quietly(parser), valid_texts, args.iterations)
+    bench("全部语料（含失败）", parse_quietly(parser), [case["text"] for case in corpus], args.iterations)
+    bench("流式增量提取（4字符/片段）", stream, valid_texts, max(args.iterations // 20, 1))
+
+    if failures:
+        print(f"\n{failures} 条语料解析结果不符合预期")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+ResumeParser各格式解析性能基准：docs/sec、MB/sec、p50/p99延迟和峰值内存
+
+用法:
+    python benchmarks/bench_parser.py [--formats pdf docx html txt] [--pages 1 2 5 10 30]
+                                      [--repeat 3] [--output result.json] [--compare baseline.json]
+
+用 benchmarks/corpus.py 生成可复现的语料（中英文各一份、1~30页），每种格式在独立子进程中
+直接调用对应的 ResumeParser._parse_* 方法，峰值内存互不影响。结果以JSON输出，
+指定 --compare 时与之前保存的结果对比，吞吐量下降或p99延迟上升超过 --threshold 时以非0状态退出。
+"""
+import sys
+import json
+import time
+import argparse
+import platform
+import resource
+import tempfile
+import statistics
+import subprocess
+from datetime import datetime
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import write_corpus
+
+FORMATS = ("pdf", "docx", "html", "txt")
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+def peak_rss_mb() -> float:
+    # Linux上ru_maxrss的单位是KB
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def run_format(file_format: str, files, repeat: int):
+    """在当前进程中解析一种格式的全部文件（由子进程调用）"""
+    from app.services.parser.resume_parser import ResumeParser
+
+    parser = ResumeParser(tempfile.mkdtemp())
+    parse = getattr(parser, f"_parse_{file_format}")
+    baseline_rss = peak_rss_mb()
+
+    # 预热：加载解析库，不计入结果
+    parse(files[0]["path"])
+
+    latencies = []
+    total_bytes = 0
+    started = time.perf_counter()
+    for _ in range(repeat):
+        for item in files:
+            file_started = time.perf_counter()
+            parse(item["path"])
+            latencies.append((time.perf_counter() - file_started) * 1000)
+            total_bytes += item["bytes"]
+    elapsed = time.perf_counter() - started
+
+    return {
+        "format": file_format,
+        "docs": len(latencies),
+        "docs_per_second": round(len(latencies) / elapsed, 2),
+        "mb_per_second": round(total_bytes / 1024 / 1024 / elapsed, 3),
+        "p50_ms": round(statistics.median(latencies), 2),
+        "p99_ms": round(percentile(latencies, 0.99), 2),
+        "max_ms": round(max(latencies), 2),
+        "baseline_rss_mb": round(baseline_rss, 1),
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+def git_commit() -> str:
+    proc = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                          cwd=Path(__file__).resolve().parent)
+    return proc.stdout.strip() or "unknown"
+
+def compare(current, baseline, threshold: float) -> bool:
+    """打印与基线结果的对比，存在超过阈值的退化时返回False"""
+    baseline_results = {result["format"]: result for result in baseline["results"] if "error" not in result}
+    ok = True
+    print(f"与基线 {baseline['meta'].get('commit')} 对比:", file=sys.stderr)
+    for result in current["results"]:
+        base = baseline_results.get(result["format"])
+        if base is None or "error" in result:
+            continue
+        throughput = result["docs_per_second"] / base["docs_per_second"] - 1
+        p99 = result["p99_ms"] / base["p99_ms"] - 1
+        regressed = throughput < -threshold or p99 > threshold
+        ok = ok and not regressed
+        print(f"  {result['format']:<6} docs/s {throughput:+.1%}  p99 {p99:+.1%}{'  退化' if regressed else ''}", file=sys.stderr)
+    return ok
+
+def main():
+    parser = argparse.ArgumentParser(description="简历解析性能基准")
+    parser.add_argument("--formats", nargs="+", default=list(FORMATS), choices=FORMATS, help="要测试的格式")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 2, 5, 10, 30], help="生成的简历页数")
+    parser.add_argument("--scripts", nargs="+", default=["latin", "cjk"], choices=["latin", "cjk"], help="简历文字")
+    parser.add_argument("--repeat", type=int, default=3, help="每个文件的解析次数")
+    parser.add_argument("--seed", type=int, default=0, help="语料随机种子")
+    parser.add_argument("--output", help="将JSON结果写入文件（默认输出到标准输出）")
+    parser.add_argument("--compare", help="与之前保存的JSON结果对比")
+    parser.add_argument("--threshold", type=float, default=0.2, help="判定为退化的相对变化幅度")
+    parser.add_argument("--run-format", help=argparse.SUPPRESS)
+    parser.add_argument("--files", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # 子进程模式：解析一种格式并输出JSON
+    if args.run_format:
+        print(json.dumps(run_format(args.run_format, json.loads(args.files), args.repeat)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        manifest = write_corpus(Path(tmp), args.formats, args.pages, args.scripts, seed=args.seed)
+        results = []
+        for file_format in args.formats:
+            files = [item for item in manifest if item["format"] == file_format]
+            proc = subprocess.run(
+                [sys.executable, __file__, "--run-format", file_format, "--files", json.dumps(files), "--repeat", str(args.repeat)],
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                error = proc.stderr.strip().splitlines()
+                results.append({"format": file_format, "error": error[-1] if error else f"退出码 {proc.returncode}"})
+                continue
+            result = json.loads(proc.stdout)
+            result["corpus_mb"] = round(sum(item["bytes"] for item in files) / 1024 / 1024, 3)
+            results.append(result)
+
+    report = {
+        "meta": {
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "pages": args.pages,
+            "scripts": args.scripts,
+            "repeat": args.repeat,
+            "seed": args.seed,
+        },
+        "results": results,
+    }
+
+    output = json.dumps(report, ensure_ascii=False, indent=2)
+    if args.output:
+        Path(args.output).write_text(output, encoding="utf-8")
+    else:
+        print(output)
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        if not compare(report, baseline, args.threshold):
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
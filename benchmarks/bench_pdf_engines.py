@@ -0,0 +1,101 @@
+"""
+PDF提取引擎基准：吞吐量（页/秒）、峰值内存和提取质量
+
+用法:
+    python benchmarks/bench_pdf_engines.py [--pages 1 5 30] [--repeat 3] [--json]
+
+用 benchmarks/corpus.py 生成不同页数的合成PDF，每个引擎在独立子进程中运行，
+分别统计页/秒、进程峰值RSS，以及提取文本对原始单词的召回率（质量）。
+"""
+import sys
+import json
+import time
+import argparse
+import resource
+import tempfile
+import subprocess
+from collections import Counter
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.corpus import resume_lines, write_pdf
+from app.services.parser.pdf_engines import PDF_ENGINES, get_engine
+
+LINES_PER_PAGE = 45
+
+def word_recall(expected: str, actual: str) -> float:
+    """提取文本中找回的原始单词比例（按出现次数计）"""
+    expected_words = Counter(expected.split())
+    actual_words = Counter(actual.split())
+    found = sum(min(count, actual_words[word]) for word, count in expected_words.items())
+    return found / max(sum(expected_words.values()), 1)
+
+def run_engine(name: str, files, repeat: int):
+    """在当前进程中运行单个引擎（由子进程调用）"""
+    engine = get_engine(name)
+    results = []
+    for path, pages, seed in files:
+        expected = "\n".join(resume_lines(pages * LINES_PER_PAGE, seed))
+        started = time.perf_counter()
+        for _ in range(repeat):
+            text = "\n".join(engine.extract_pages(path))
+        elapsed = time.perf_counter() - started
+        results.append({
+            "pages": pages,
+            "pages_per_second": round(pages * repeat / elapsed, 1),
+            "recall": round(word_recall(expected, text), 4),
+        })
+    # Linux上ru_maxrss的单位是KB
+    peak_rss_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    return {"engine": name, "peak_rss_mb": round(peak_rss_mb, 1), "results": results}
+
+def main():
+    parser = argparse.ArgumentParser(description="PDF提取引擎基准")
+    parser.add_argument("--pages", type=int, nargs="+", default=[1, 5, 30], help="生成的PDF页数")
+    parser.add_argument("--repeat", type=int, default=3, help="每个文件的重复提取次数")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    parser.add_argument("--engine", help=argparse.SUPPRESS)
+    parser.add_argument("--files", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    # 子进程模式：运行单个引擎并输出JSON
+    if args.engine:
+        print(json.dumps(run_engine(args.engine, json.loads(args.files), args.repeat)))
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        files = [
+            (str(write_pdf(Path(tmp) / f"resume_{pages}p.pdf", pages, seed=pages)), pages, pages)
+            for pages in args.pages
+        ]
+        reports = []
+        for name in PDF_ENGINES:
+            if get_engine(name) is None:
+                reports.append({"engine": name, "skipped": "未安装"})
+                continue
+            proc = subprocess.run(
+                [sys.executable, __file__, "--engine", name, "--files", json.dumps(files), "--repeat", str(args.repeat)],
+                capture_output=True,
+                text=True,
+            )
+            if proc.returncode != 0:
+                reports.append({"engine": name, "skipped": proc.stderr.strip().splitlines()[-1]})
+                continue
+            reports.append(json.loads(proc.stdout))
+
+    if args.json:
+        print(json.dumps(reports, ensure_ascii=False, indent=2))
+        return
+
+    print(f"{'引擎':<10}{'页数':>6}{'页/秒':>10}{'召回率':>10}{'峰值RSS(MB)':>14}")
+    for report in reports:
+        if "skipped" in report:
+            print(f"{report['engine']:<10}  跳过: {report['skipped']}")
+            continue
+        for result in report["results"]:
+            print(f"{report['engine']:<10}{result['pages']:>6}{result['pages_per_second']:>10.1f}"
+                  f"{result['recall']:>10.2%}{report['peak_rss_mb']:>14.1f}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+API和Worker进程的冷启动导入耗时基准
+
+用法:
+    python benchmarks/bench_startup.py [--top 20] [--json]
+
+在独立的子进程中以 `python -X importtime` 导入各进程的入口模块，
+汇总总耗时和累计耗时最长的模块，用于发现拖慢冷启动的导入。
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import subprocess
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# 各进程的入口模块
+TARGETS = {
+    "api": "app.main",
+    "worker": "app.tasks.resume_tasks",
+}
+
+def measure(module: str):
+    """
+    在子进程中导入模块并解析 -X importtime 的输出
+
+    Returns:
+        Dict: 墙钟耗时（秒）和各模块的累计导入耗时（微秒）
+    """
+    started = time.perf_counter()
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        env={**os.environ, "PYTHONDONTWRITEBYTECODE": "1"},
+    )
+    wall = time.perf_counter() - started
+
+    modules = []
+    for line in proc.stderr.splitlines():
+        # 格式: "import time:   self [us] |  cumulative | imported package"
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3:
+            continue
+        try:
+            modules.append({
+                "module": parts[2][1:].rstrip(),
+                "self_us": int(parts[0]),
+                "cumulative_us": int(parts[1]),
+            })
+        except ValueError:
+            continue
+
+    errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+    top_level = [m for m in modules if not m["module"].startswith(" ")]
+    return {
+        "module": module,
+        "ok": proc.returncode == 0,
+        "wall_seconds": round(wall, 3),
+        "import_seconds": round(sum(m["cumulative_us"] for m in top_level) / 1e6, 3),
+        "module_count": len(modules),
+        "modules": modules,
+        "error": "\n".join(errors[-5:]) if proc.returncode != 0 else None,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="API和Worker进程的冷启动导入耗时基准")
+    parser.add_argument("--top", type=int, default=20, help="显示累计耗时最长的模块数")
+    parser.add_argument("--json", action="store_true", help="以JSON格式输出结果")
+    args = parser.parse_args()
+
+    results = {name: measure(module) for name, module in TARGETS.items()}
+
+    if args.json:
+        for result in results.values():
+            result["modules"] = sorted(result["modules"], key=lambda m: -m["cumulative_us"])[:args.top]
+        print(json.dumps(results, ensure_ascii=False, indent=2))
+        return
+
+    for name, result in results.items():
+        status = "ok" if result["ok"] else "失败"
+        print(f"[{name}] import {result['module']}: {status}，墙钟 {result['wall_seconds']:.3f}s，"
+              f"导入 {result['import_seconds']:.3f}s，模块数 {result['module_count']}")
+        if result["error"]:
+            print(f"  {result['error']}")
+        for item in sorted(result["modules"], key=lambda m: -m["cumulative_us"])[:args.top]:
+            print(f"  {item['cumulative_us'] / 1000:>9.1f} ms  {item['module'].strip()}")
+        print()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+上传高峰期间无关接口的延迟基准
+
+用法:
+    python benchmarks/bench_upload_latency.py [--uploads 20] [--pages 30] [--workers 2]
+
+在同一个事件循环中运行一个最小的FastAPI应用：/parse 解析一份多页PDF，/ping 立即返回。
+并发发起一批解析请求的同时持续请求 /ping，分别统计在事件循环中直接解析（原实现）
+和通过解析进程池解析时 /ping 的p50/p99/最大延迟。
+"""
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import httpx
+from fastapi import FastAPI
+
+from benchmarks.corpus import write_pdf
+from app.services.parser.parse_pool import ParsePool
+from app.services.parser.resume_parser import ResumeParser
+
+def build_app(parser: ResumeParser, file_path: str, key: str) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @app.post("/parse/inline")
+    async def parse_inline():
+        return {"length": len(parser.parse_resume(file_path)["content"])}
+
+    @app.post("/parse/pool")
+    async def parse_pool():
+        return {"length": len((await parser.parse_resume_async(key))["content"])}
+
+    return app
+
+def percentile(values, q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(int(len(ordered) * q), len(ordered) - 1)]
+
+async def run_burst(app: FastAPI, mode: str, uploads: int, ping_interval: float):
+    """并发发起解析请求，同时测量 /ping 的延迟（毫秒）"""
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        latencies = []
+        done = asyncio.Event()
+
+        async def pinger():
+            while not done.is_set():
+                started = time.perf_counter()
+                await client.get("/ping")
+                latencies.append((time.perf_counter() - started) * 1000)
+                await asyncio.sleep(ping_interval)
+
+        ping_task = asyncio.create_task(pinger())
+        started = time.perf_counter()
+        responses = await asyncio.gather(*[client.post(f"/parse/{mode}") for _ in range(uploads)])
+        elapsed = time.perf_counter() - started
+        done.set()
+        await ping_task
+
+    failed = sum(1 for response in responses if response.status_code != 200)
+    return {
+        "mode": mode,
+        "uploads": uploads,
+        "failed": failed,
+        "burst_seconds": elapsed,
+        "pings": len(latencies),
+        "p50_ms": statistics.median(latencies),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": max(latencies),
+    }
+
+async def main():
+    arg_parser = argparse.ArgumentParser(description="上传高峰期间无关接口的延迟基准")
+    arg_parser.add_argument("--uploads", type=int, default=20, help="并发解析请求数")
+    arg_parser.add_argument("--pages", type=int, default=30, help="PDF页数")
+    arg_parser.add_argument("--workers", type=int, default=2, help="解析进程数")
+    arg_parser.add_argument("--ping-interval", type=float, default=0.005, help="/ping请求间隔（秒）")
+    args = arg_parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = str(write_pdf(Path(tmp) / "resume.pdf", args.pages))
+        pool = ParsePool(max_workers=args.workers, max_queue=args.uploads, timeout=300)
+        parser = ResumeParser(tmp, parse_pool=pool)
+        # 解析进程通过默认存储读取文件，先把PDF保存到默认存储
+        with open(file_path, "rb") as stream:
+            saved = parser.save_stream(stream, ".pdf")
+        key = saved["key"]
+        app = build_app(parser, file_path, key)
+
+        # 预先启动解析进程，不把进程启动时间计入结果
+        await parser.parse_resume_async(key)
+
+        print(f"{args.uploads} 个并发解析请求，{args.pages} 页PDF，解析进程数 {args.workers}")
+        print(f"{'模式':<8}{'耗时(s)':>10}{'ping数':>8}{'p50(ms)':>10}{'p99(ms)':>10}{'max(ms)':>10}{'失败':>6}")
+        for mode in ("inline", "pool"):
+            result = await run_burst(app, mode, args.uploads, args.ping_interval)
+            print(f"{mode:<8}{result['burst_seconds']:>10.2f}{result['pings']:>8}{result['p50_ms']:>10.1f}"
+                  f"{result['p99_ms']:>10.1f}{result['max_ms']:>10.1f}{result['failed']:>6}")
+        pool.shutdown()
+        if saved["created"]:
+            parser.storage.delete(key)
+
+if __name__ == "__main__":
+    asyncio.run(main())
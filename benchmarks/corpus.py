@@ -0,0 +1,252 @@
+"""
+基准测试使用的合成简历文件
+
+不依赖第三方库直接写出PDF、DOCX、HTML和TXT简历：英文PDF使用标准Helvetica字体，
+中文PDF使用无需嵌入的STSong-Light（Adobe-GB1）字体，DOCX只包含最小的OOXML部件。
+相同参数和随机种子总是生成相同的文件，不同提交之间的基准结果可以直接比较。
+"""
+import io
+import json
+import random
+import zipfile
+from pathlib import Path
+from typing import Any, Dict, List, Sequence
+from xml.sax.saxutils import escape as xml_escape
+
+WORDS = (
+    "python fastapi mongodb redis celery docker kubernetes backend developer "
+    "experience project team lead design system performance api service cloud "
+    "university bachelor master engineer data analysis machine learning"
+).split()
+
+CJK_WORDS = (
+    "负责 后端 开发 熟悉 分布式 系统 设计 项目 经验 团队 数据库 优化 性能 "
+    "本科 硕士 大学 计算机 工程师 架构 微服务 缓存 消息队列 高并发"
+).split()
+
+# 每页行数（PDF以外的格式按同样的行数换算页数）
+LINES_PER_PAGE = 45
+
+def resume_lines(count: int, seed: int = 0, script: str = "latin") -> List[str]:
+    """
+    生成指定行数的简历文本
+
+    Args:
+        count: 行数
+        seed: 随机种子
+        script: latin（英文）或 cjk（中文为主，夹杂英文技能名）
+    """
+    rng = random.Random(seed)
+    lines = []
+    for index in range(count):
+        if script == "cjk":
+            if index % 12 == 0:
+                lines.append(f"工作经历 {index // 12 + 1}：2018.01 - 2023.06")
+            else:
+                lines.append("".join(rng.choice(CJK_WORDS + WORDS[:8]) for _ in range(rng.randint(8, 16))))
+        elif index % 12 == 0:
+            lines.append(f"Section {index // 12 + 1}: Work Experience 2018-2023")
+        else:
+            lines.append(" ".join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))))
+    return lines
+
+def _escape(text: str) -> str:
+    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+
+def make_pdf(pages: int, lines_per_page: int = LINES_PER_PAGE, seed: int = 0, script: str = "latin") -> bytes:
+    """
+    生成多页文本PDF
+
+    Args:
+        pages: 页数
+        lines_per_page: 每页行数
+        seed: 随机种子
+        script: latin 或 cjk
+
+    Returns:
+        bytes: PDF文件内容
+    """
+    lines = resume_lines(pages * lines_per_page, seed, script)
+    # 对象1: Catalog，对象2: Pages，对象3: 字体，之后每页两个对象（Page和内容流），中文字体的附属对象放在最后
+    objects = {1: b"<< /Type /Catalog /Pages 2 0 R >>"}
+    if script == "cjk":
+        cid_font_id, descriptor_id = 4 + pages * 2, 5 + pages * 2
+        objects[3] = f"<< /Type /Font /Subtype /Type0 /BaseFont /STSong-Light /Encoding /UniGB-UCS2-H /DescendantFonts [{cid_font_id} 0 R] >>".encode()
+        objects[cid_font_id] = (
+            f"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /STSong-Light "
+            f"/CIDSystemInfo << /Registry (Adobe) /Ordering (GB1) /Supplement 2 >> /FontDescriptor {descriptor_id} 0 R /DW 1000 >>"
+        ).encode()
+        objects[descriptor_id] = (
+            b"<< /Type /FontDescriptor /FontName /STSong-Light /Flags 6 /FontBBox [-25 -254 1000 880] "
+            b"/ItalicAngle 0 /Ascent 880 /Descent -120 /CapHeight 880 /StemV 93 >>"
+        )
+    else:
+        objects[3] = b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"
+    kids = []
+    for page in range(pages):
+        page_id, content_id = 4 + page * 2, 5 + page * 2
+        kids.append(f"{page_id} 0 R")
+        text_ops = ["BT", "/F1 10 Tf", "14 TL", "50 800 Td"]
+        for line in lines[page * lines_per_page:(page + 1) * lines_per_page]:
+            if script == "cjk":
+                text_ops.append(f"<{line.encode('utf-16-be').hex()}> Tj T*")
+            else:
+                text_ops.append(f"({_escape(line)}) Tj T*")
+        text_ops.append("ET")
+        stream = "\n".join(text_ops).encode("latin-1")
+        objects[page_id] = (
+            f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            f"/Resources << /Font << /F1 3 0 R >> >> /Contents {content_id} 0 R >>"
+        ).encode()
+        objects[content_id] = b"<< /Length %d >>\nstream\n" % len(stream) + stream + b"\nendstream"
+    objects[2] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {pages} >>".encode()
+
+    output = bytearray(b"%PDF-1.4\n")
+    offsets = {}
+    for object_id in sorted(objects):
+        offsets[object_id] = len(output)
+        output += b"%d 0 obj\n" % object_id + objects[object_id] + b"\nendobj\n"
+    xref_offset = len(output)
+    size = max(objects) + 1
+    output += b"xref\n0 %d\n0000000000 65535 f \n" % size
+    for object_id in range(1, size):
+        output += b"%010d 00000 n \n" % offsets[object_id]
+    output += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (size, xref_offset)
+    return bytes(output)
+
+def write_pdf(path: Path, pages: int, seed: int = 0) -> Path:
+    """生成PDF并写入文件"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(make_pdf(pages, seed=seed))
+    return path
+
+def make_html(sections: int, seed: int = 0, encoding: str = "utf-8", script: str = "cjk") -> bytes:
+    """
+    生成招聘网站导出格式的HTML简历：大量内联样式、嵌套div、表格和脚本，中英文混排
+
+    Args:
+        sections: 经历段落数（每段约0.9KB）
+        seed: 随机种子
+        encoding: 输出编码，同时写入<meta charset>
+        script: cjk（中英文混排）或 latin（正文只有英文）
+
+    Returns:
+        bytes: HTML文件内容
+    """
+    rng = random.Random(seed)
+    vocabulary = WORDS if script == "latin" else CJK_WORDS + WORDS
+    parts = [
+        f'<!DOCTYPE html><html><head><meta http-equiv="Content-Type" content="text/html; charset={encoding}">',
+        "<title>简历</title><style>.item{margin:0 8px;font-size:12px}</style>",
+        "<script>window.__INITIAL_STATE__={\"tracking\":true};</script></head><body>",
+    ]
+    for index in range(sections):
+        start = 2000 + rng.randint(0, 20)
+        words = " ".join(rng.choice(vocabulary) for _ in range(rng.randint(40, 80)))
+        parts.append(
+            f'<div class="item" style="padding:4px;border-bottom:1px solid #eee"><div class="hd">'
+            f'<span style="font-weight:bold">经历 {index + 1}</span>&nbsp;&nbsp;'
+            f'<span class="time">{start}.0{rng.randint(1, 9)} - {start + rng.randint(1, 3)}.0{rng.randint(1, 9)}</span></div>'
+            f'<table class="detail"><tr><td class="k">公司</td><td class="v">某科技有限公司 {index}</td></tr>'
+            f'<tr><td class="k">描述</td><td class="v"><p>{words}</p></td></tr></table>'
+            f'<!-- tracking {index} --><script>track({index});</script></div>'
+        )
+    parts.append("</body></html>")
+    return "".join(parts).encode(encoding)
+
+_DOCX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/word/document.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.wordprocessingml.document.main+xml"/>'
+    '</Types>'
+)
+_DOCX_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="word/document.xml"/>'
+    '</Relationships>'
+)
+
+def make_docx(pages: int, seed: int = 0, script: str = "latin") -> bytes:
+    """生成DOCX简历，每行一个段落，每页之后插入分页符"""
+    lines = resume_lines(pages * LINES_PER_PAGE, seed, script)
+    paragraphs = []
+    for index, line in enumerate(lines):
+        paragraphs.append(f"<w:p><w:r><w:t xml:space=\"preserve\">{xml_escape(line)}</w:t></w:r></w:p>")
+        if (index + 1) % LINES_PER_PAGE == 0 and index + 1 < len(lines):
+            paragraphs.append('<w:p><w:r><w:br w:type="page"/></w:r></w:p>')
+    document = (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+        '<w:document xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main"><w:body>'
+        + "".join(paragraphs)
+        + "</w:body></w:document>"
+    )
+    buffer = io.BytesIO()
+    # 固定时间戳，保证相同参数生成的文件字节完全相同
+    with zipfile.ZipFile(buffer, "w", zipfile.ZIP_DEFLATED) as archive:
+        for name, content in (("[Content_Types].xml", _DOCX_CONTENT_TYPES), ("_rels/.rels", _DOCX_RELS), ("word/document.xml", document)):
+            archive.writestr(zipfile.ZipInfo(name, date_time=(2020, 1, 1, 0, 0, 0)), content)
+    return buffer.getvalue()
+
+def make_text(pages: int, seed: int = 0, script: str = "latin") -> bytes:
+    """生成TXT简历（UTF-8）"""
+    return "\n".join(resume_lines(pages * LINES_PER_PAGE, seed, script)).encode("utf-8")
+
+def make_document(file_format: str, pages: int, seed: int = 0, script: str = "latin") -> bytes:
+    """
+    生成指定格式的简历
+
+    Args:
+        file_format: pdf, docx, html 或 txt
+        pages: 页数（HTML约每页45行，即3个经历段落）
+        seed: 随机种子
+        script: latin 或 cjk
+
+    Returns:
+        bytes: 文件内容
+    """
+    if file_format == "pdf":
+        return make_pdf(pages, seed=seed, script=script)
+    if file_format == "docx":
+        return make_docx(pages, seed=seed, script=script)
+    if file_format == "html":
+        return make_html(pages * 3, seed=seed, script=script)
+    if file_format == "txt":
+        return make_text(pages, seed=seed, script=script)
+    raise ValueError(f"不支持的格式: {file_format}")
+
+def write_corpus(
+    directory: Path,
+    formats: Sequence[str] = ("pdf", "docx", "html", "txt"),
+    page_counts: Sequence[int] = (1, 2, 5, 10, 30),
+    scripts: Sequence[str] = ("latin", "cjk"),
+    seed: int = 0
+) -> List[Dict[str, Any]]:
+    """
+    生成完整的语料目录，并写出manifest.json
+
+    Returns:
+        List[Dict]: 每个文件的格式、页数、文字、大小和路径
+    """
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    manifest = []
+    for file_format in formats:
+        for script in scripts:
+            for pages in page_counts:
+                data = make_document(file_format, pages, seed=seed + pages, script=script)
+                path = directory / f"resume_{script}_{pages}p.{file_format}"
+                path.write_bytes(data)
+                manifest.append({
+                    "format": file_format,
+                    "script": script,
+                    "pages": pages,
+                    "bytes": len(data),
+                    "path": str(path),
+                })
+    (directory / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False, indent=2), encoding="utf-8")
+    return manifest
@@ -0,0 +1,96 @@
+import os
+import sys
+import json
+import asyncio
+import argparse
+from app.core.config import settings
+from app.core.logging_config import setup_logging
+from app.models.database import connect_to_mongodb, close_mongodb_connection
+from app.services.parser.bulk_ingest import bulk_ingest_service
+from app.services.parser.resume_parser import default_parser
+
+async def ingest(zip_path, position, requirement_id=None, user_id=None, lane="bulk"):
+    """导入ZIP压缩包中的简历并返回导入报告"""
+    db = await connect_to_mongodb()
+    try:
+        requirement = None
+        if requirement_id:
+            requirement = await db["requirements"].find_one({"_id": requirement_id})
+            if not requirement:
+                raise SystemExit(f"找不到指定的职位要求: {requirement_id}")
+        return await bulk_ingest_service.ingest_zip(
+            db,
+            zip_path,
+            position,
+            requirement=requirement,
+            user_id=user_id,
+            lane=lane
+        )
+    finally:
+        default_parser.parse_pool.shutdown()
+        await close_mongodb_connection()
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="批量导入ZIP压缩包中的简历")
+
+    parser.add_argument(
+        "zip_path",
+        type=str,
+        help="ZIP压缩包路径"
+    )
+
+    parser.add_argument(
+        "--position",
+        type=str,
+        required=True,
+        help="应聘职位"
+    )
+
+    parser.add_argument(
+        "--requirement-id",
+        type=str,
+        default=None,
+        help="职位要求ID，指定时为导入成功的简历提交分析任务"
+    )
+
+    parser.add_argument(
+        "--user-id",
+        type=str,
+        default=None,
+        help="接收分析结果通知的用户ID"
+    )
+
+    parser.add_argument(
+        "--backfill",
+        action="store_true",
+        help="以最低优先级（backfill通道）提交分析任务，不影响线上的批量导入"
+    )
+
+    parser.add_argument(
+        "--report",
+        type=str,
+        default=None,
+        help="将完整的导入报告（JSON）写入指定文件"
+    )
+
+    args = parser.parse_args()
+
+    if not os.path.isfile(args.zip_path):
+        print(f"文件不存在: {args.zip_path}")
+        sys.exit(1)
+
+    setup_logging()
+    print(f"导入 {args.zip_path}，职位: {args.position}，解析进程数: {settings.PARSE_POOL_WORKERS}...")
+    lane = "backfill" if args.backfill else "bulk"
+    report = asyncio.run(ingest(args.zip_path, args.position, args.requirement_id, args.user_id, lane))
+
+    print(f"共 {report['total']} 个文件，成功 {report['succeeded']}，跳过 {report['skipped']}，失败 {report['failed']}，"
+          f"提交分析任务 {report['analysis_enqueued']} 个")
+    for item in report["files"]:
+        if item["status"] == "failed":
+            print(f"  失败: {item['file_name']}: {item['error']}")
+
+    if args.report:
+        with open(args.report, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"导入报告已写入: {args.report}")
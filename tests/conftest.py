@@ -0,0 +1,5 @@
+import sys
+from pathlib import Path
+
+# 与benchmarks脚本一样，直接从仓库根目录导入app包
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
@@ -0,0 +1,226 @@
+import asyncio
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+import app.core.metrics as metrics
+import app.tasks.resume_tasks as resume_tasks
+from app.services.analyzer.bulk_screening import BulkScreeningService
+from app.services.analyzer.idempotency import analysis_idempotency_key, analysis_deduplicator
+from app.services.analyzer.rate_limiter import LLMUnavailableError
+from app.services.analyzer.resume_analyzer import ResumeAnalysisResult
+from app.services.notifier.notification_service import notification_service
+
+REQUIREMENT = {
+    "_id": "req1",
+    "version": 2,
+    "job_title": "后端工程师",
+    "experience_years": 3,
+    "education": "本科",
+    "skills": ["Python"],
+}
+
+def analysis_result(score, failed=False):
+    return ResumeAnalysisResult(
+        matches_requirements=score >= 70,
+        match_score=score,
+        reasoning="",
+        skills_match={},
+        experience_match=True,
+        education_match=True,
+        strengths=[],
+        weaknesses=[],
+        summary="",
+        failed=failed
+    )
+
+class StubAnalyzer:
+    """按简历ID返回预设结果的分析器，结果为异常时整组分析抛出该异常"""
+
+    def __init__(self, results):
+        self.results = results
+        self.analyzed = []
+
+    async def analyze_resumes_batch(self, resumes, requirements):
+        self.analyzed.append([resume["id"] for resume in resumes])
+        for resume in resumes:
+            if isinstance(self.results.get(resume["id"]), Exception):
+                raise self.results[resume["id"]]
+        return {resume["id"]: self.results[resume["id"]] for resume in resumes if resume["id"] in self.results}
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    def unavailable():
+        raise ConnectionError("测试中不连接Redis")
+
+    monkeypatch.setattr(metrics, "get_redis", unavailable)
+    monkeypatch.setattr(metrics, "get_sync_redis", unavailable)
+
+@pytest.fixture
+def messages(monkeypatch):
+    sent = []
+
+    async def send_personal_message(message, user_id):
+        sent.append((user_id, message))
+
+    monkeypatch.setattr(notification_service.connection_manager, "send_personal_message", send_personal_message)
+    return sent
+
+@pytest.fixture
+def db():
+    db = AsyncMongoMockClient()["test"]
+    asyncio.run(db["resumes"].insert_many([
+        {"_id": f"r{i}", "content": f"简历{i} Python", "status": "uploaded"} for i in range(5)
+    ]))
+    return db
+
+def run(coro):
+    return asyncio.run(coro)
+
+def create_job(service, db):
+    return run(service.create_job(db, REQUIREMENT, "u1", {}, concurrency=2))
+
+def test_chunks_are_recorded_once(db, messages):
+    service = BulkScreeningService(analyzer=StubAnalyzer({f"r{i}": analysis_result(80) for i in range(5)}), chunk_size=2)
+    job = create_job(service, db)
+    assert (job["chunks"], job["status"]) == (3, "pending")
+
+    for chunk_index in (0, 1, 0, 2):
+        run(service.screen_chunk(db, job["_id"], chunk_index))
+
+    progress = run(service.get_progress(db, job["_id"]))
+    assert (progress["status"], progress["done"], progress["failed"], progress["pending"]) == ("completed", 5, 0, 0)
+    assert run(db["analyses"].count_documents({"job_id": job["_id"]})) == 5
+    assert service.analyzer.analyzed == [["r0", "r1"], ["r2", "r3"], ["r4"]]
+    assert [message["type"] for _, message in messages] == ["screening_completed"]
+
+def test_failed_chunk_still_completes_job(db, messages):
+    service = BulkScreeningService(analyzer=StubAnalyzer({"r0": analysis_result(80), "r1": analysis_result(60)}), chunk_size=2)
+    job = create_job(service, db)
+    run(service.screen_chunk(db, job["_id"], 0))
+
+    run(service.fail_chunk(db, job["_id"], 1, "超时"))
+    # 重复的失败记录不重复计数
+    run(service.fail_chunk(db, job["_id"], 1, "超时"))
+    assert run(service.get_progress(db, job["_id"]))["status"] == "running"
+
+    run(service.fail_chunk(db, job["_id"], 2, "超时"))
+    progress = run(service.get_progress(db, job["_id"]))
+    assert (progress["status"], progress["done"], progress["failed"]) == ("completed", 2, 3)
+    assert progress["failed_resume_ids"] == ["r2", "r3", "r4"]
+    assert len(messages) == 1
+
+def test_failed_results_are_not_stored(db, messages):
+    service = BulkScreeningService(
+        analyzer=StubAnalyzer({"r0": analysis_result(80), "r1": analysis_result(0, failed=True)}),
+        chunk_size=2
+    )
+    job = create_job(service, db)
+    run(service.screen_chunk(db, job["_id"], 0))
+
+    progress = run(service.get_progress(db, job["_id"]))
+    assert (progress["done"], progress["failed"], progress["failed_resume_ids"]) == (1, 1, ["r1"])
+    assert run(db["analyses"].distinct("resume_id")) == ["r0"]
+    assert run(db["resumes"].find_one({"_id": "r0"}))["status"] == "matched"
+    assert run(db["resumes"].find_one({"_id": "r1"}))["status"] == "uploaded"
+
+def test_unavailable_provider_propagates_for_retry(db, messages):
+    service = BulkScreeningService(analyzer=StubAnalyzer({"r0": LLMUnavailableError("调用额度已用尽")}), chunk_size=2)
+    job = create_job(service, db)
+    with pytest.raises(LLMUnavailableError):
+        run(service.screen_chunk(db, job["_id"], 0))
+
+    # 这一组没有记录任何进度，重试时重新分析
+    progress = run(service.get_progress(db, job["_id"]))
+    assert (progress["done"], progress["failed"]) == (0, 0)
+    assert run(db["screening_jobs"].find_one({"_id": job["_id"]}))["done_chunks"] == []
+    assert run(db["analyses"].count_documents({})) == 0
+
+def test_existing_analyses_are_reused(db, messages):
+    # 单份分析已保存了r0的结果
+    key = analysis_idempotency_key("r0", BulkScreeningService.requirement_to_dict(REQUIREMENT))
+    run(analysis_deduplicator.save(db, key, {"_id": "a0", "resume_id": "r0", "result": analysis_result(90).dict()}))
+    service = BulkScreeningService(analyzer=StubAnalyzer({"r1": analysis_result(60)}), chunk_size=2)
+    job = create_job(service, db)
+    run(service.screen_chunk(db, job["_id"], 0))
+
+    assert service.analyzer.analyzed == [["r1"]]
+    progress = run(service.get_progress(db, job["_id"]))
+    assert (progress["done"], progress["failed"]) == (2, 0)
+    assert run(db["analyses"].count_documents({"resume_id": "r0"})) == 1
+
+def test_screening_results_are_found_by_idempotency_key(db, messages):
+    service = BulkScreeningService(analyzer=StubAnalyzer({"r0": analysis_result(80)}), chunk_size=1)
+    job = create_job(service, db)
+    run(service.screen_chunk(db, job["_id"], 0))
+
+    key = analysis_idempotency_key("r0", BulkScreeningService.requirement_to_dict(REQUIREMENT))
+    existing = run(analysis_deduplicator.find_existing(db, key))
+    assert (existing["resume_id"], existing["job_id"]) == ("r0", job["_id"])
+    assert existing["result"]["match_score"] == 80
+
+class ScreeningTaskHarness:
+    """在当前线程中执行screen_chunk_task，记录提交的下一组和释放的名额"""
+
+    def __init__(self, monkeypatch, outcomes):
+        self.outcomes = list(outcomes)
+        self.screened = []
+        self.failed = []
+        self.submitted = []
+        self.released = []
+        monkeypatch.setattr(resume_tasks.worker_runtime, "run", lambda coro, timeout=None: asyncio.run(coro))
+        monkeypatch.setattr(resume_tasks, "_screen_chunk_async", self.screen)
+        monkeypatch.setattr(resume_tasks, "_fail_screening_chunk_async", self.fail)
+        monkeypatch.setattr(resume_tasks, "_submit_screening_chunk", lambda *args: self.submitted.append(args))
+        monkeypatch.setattr(resume_tasks, "_release_dispatched", self.released.append)
+
+    async def screen(self, job_id, chunk_index):
+        self.screened.append(chunk_index)
+        outcome = self.outcomes.pop(0)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def fail(self, job_id, chunk_index, error):
+        self.failed.append((chunk_index, error))
+
+    def apply(self, chunk_index=0, stride=2, chunks=5):
+        return resume_tasks.screen_chunk_task.apply(
+            args=("job1", chunk_index, stride, chunks),
+            kwargs={"lane": "bulk", "user_id": "u1"},
+            task_id=f"screen-job1-{chunk_index}"
+        )
+
+def test_screening_task_submits_next_chunk(monkeypatch):
+    harness = ScreeningTaskHarness(monkeypatch, [{"_id": "job1"}])
+    assert harness.apply(chunk_index=1).get() == {"job_id": "job1", "chunk_index": 1}
+    assert harness.submitted == [("job1", "u1", 3, 2, 5, "bulk")]
+    assert harness.released == ["screen-job1-1"]
+
+    # 最后一组不再提交
+    harness = ScreeningTaskHarness(monkeypatch, [{"_id": "job1"}])
+    harness.apply(chunk_index=4)
+    assert harness.submitted == []
+    assert harness.released == ["screen-job1-4"]
+
+def test_screening_task_retries_then_continues(monkeypatch):
+    harness = ScreeningTaskHarness(monkeypatch, [TimeoutError(), {"_id": "job1"}])
+    harness.apply()
+    assert harness.screened == [0, 0]
+    assert harness.failed == []
+    # 重试期间不提交下一组、不释放名额，最终只提交和释放一次
+    assert harness.submitted == [("job1", "u1", 2, 2, 5, "bulk")]
+    assert harness.released == ["screen-job1-0"]
+
+def test_screening_task_marks_chunk_failed_after_retries(monkeypatch):
+    attempts = resume_tasks.screen_chunk_task.max_retries + 1
+    harness = ScreeningTaskHarness(monkeypatch, [ConnectionError("mongo down")] * attempts)
+    harness.apply()
+    assert harness.screened == [0] * attempts
+    assert harness.failed == [(0, "mongo down")]
+    assert harness.submitted == [("job1", "u1", 2, 2, 5, "bulk")]
+    assert harness.released == ["screen-job1-0"]
+
+def test_screening_task_stops_when_job_is_gone(monkeypatch):
+    harness = ScreeningTaskHarness(monkeypatch, [None])
+    harness.apply()
+    assert harness.submitted == []
+    assert harness.released == ["screen-job1-0"]
@@ -0,0 +1,116 @@
+import pytest
+import fakeredis
+import app.core.fair_dispatch as fair_dispatch
+from app.core.fair_dispatch import FairDispatcher
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(fair_dispatch, "get_sync_redis", lambda: client)
+    return client
+
+class Celery:
+    """记录提交顺序的假Celery"""
+
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, job):
+        self.sent.append(job["pipeline_id"])
+
+def submit(dispatcher, celery, tenant, *pipeline_ids, lane="bulk"):
+    for pipeline_id in pipeline_ids:
+        dispatcher.submit(lane, tenant, {"pipeline_id": pipeline_id}, celery)
+
+def finish(dispatcher, celery, pipeline_id, lane="bulk"):
+    dispatcher.release(pipeline_id)
+    dispatcher.refill(lane, celery)
+
+def test_unthrottled_lane_sends_directly(redis):
+    dispatcher = FairDispatcher(windows={"bulk": 1})
+    celery = Celery()
+    submit(dispatcher, celery, "a", "i1", "i2", lane="interactive")
+    assert celery.sent == ["i1", "i2"]
+    assert redis.keys("fair:interactive:*") == []
+
+def test_window_limits_inflight_jobs(redis):
+    dispatcher = FairDispatcher(windows={"bulk": 3})
+    celery = Celery()
+    submit(dispatcher, celery, "a", *[f"a{i}" for i in range(5)])
+    assert celery.sent == ["a0", "a1", "a2"]
+
+    finish(dispatcher, celery, "a1")
+    assert celery.sent == ["a0", "a1", "a2", "a3"]
+    # 不占用名额的任务释放时不影响窗口
+    assert dispatcher.release("unknown") is None
+    dispatcher.refill("bulk", celery)
+    assert len(celery.sent) == 4
+
+def test_weighted_round_robin_order(redis):
+    dispatcher = FairDispatcher(windows={"bulk": 1}, weights={"a": 2})
+    celery = Celery()
+    submit(dispatcher, celery, "x", "x0")
+    submit(dispatcher, celery, "a", "a1", "a2", "a3", "a4")
+    submit(dispatcher, celery, "b", "b1", "b2", "b3", "b4")
+    assert celery.sent == ["x0"]
+
+    while len(celery.sent) < 9:
+        finish(dispatcher, celery, celery.sent[-1])
+    # 权重为2的租户每轮提交两个任务，窗口占满中断时保留剩余额度
+    assert celery.sent == ["x0", "a1", "a2", "b1", "a3", "a4", "b2", "b3", "b4"]
+    assert redis.lrange("fair:bulk:ring", 0, -1) == []
+    assert redis.hgetall("fair:bulk:deficit") == {}
+
+def test_tiny_weight_still_makes_progress(redis):
+    dispatcher = FairDispatcher(windows={"bulk": 2}, weights={"a": 0})
+    celery = Celery()
+    submit(dispatcher, celery, "a", "a1")
+    assert celery.sent == ["a1"]
+
+def test_refill_requested_while_locked_runs_again(redis):
+    dispatcher = FairDispatcher(windows={"bulk": 1})
+    celery = Celery()
+    submit(dispatcher, celery, "a", "a1", "a2")
+    assert celery.sent == ["a1"]
+
+    refill_locked = dispatcher._refill_locked
+
+    def finish_during_refill(*args):
+        sent = refill_locked(*args)
+        if "a2" not in celery.sent:
+            # 持有锁的进程已检查过容量，此时另一个Worker的任务结束，拿不到锁只能留下补充请求
+            assert dispatcher.release("a1") == "bulk"
+            assert dispatcher.refill("bulk", celery) == 0
+        return sent
+
+    dispatcher._refill_locked = finish_during_refill
+    dispatcher.refill("bulk", celery)
+    assert celery.sent == ["a1", "a2"]
+    assert not redis.exists("fair:bulk:refill_requested")
+
+def test_failed_send_requeues_job(redis):
+    dispatcher = FairDispatcher(windows={"bulk": 2})
+    celery = Celery()
+
+    def broken(job):
+        raise ConnectionError("broker down")
+
+    submit(dispatcher, broken, "a", "a1")
+    assert redis.lrange("fair:bulk:queue:a", 0, -1) == ['{"pipeline_id": "a1"}']
+    assert redis.zcard("fair:bulk:inflight") == 0
+
+    dispatcher.refill("bulk", celery)
+    assert celery.sent == ["a1"]
+
+def test_snapshot_counts_pending_and_inflight(redis):
+    dispatcher = FairDispatcher(windows={"bulk": 1})
+    celery = Celery()
+    submit(dispatcher, celery, "a", "a1", "a2")
+    submit(dispatcher, celery, None, "n1")
+    dispatcher.record_wait("bulk", "a", 0.25)
+
+    bulk = dispatcher.snapshot()["bulk"]
+    assert (bulk["inflight"], bulk["pending"]) == (1, 2)
+    assert bulk["tenants"]["a"] == {"pending": 1, "inflight": 1, "count": 1, "avg_wait_ms": 250.0}
+    assert bulk["tenants"]["anonymous"] == {"pending": 1, "inflight": 0}
+    assert bulk["wait_ms"] == {"samples": 1, "p50": 250, "p95": 250, "max": 250}
@@ -0,0 +1,123 @@
+from app.services.parser.field_extractor import (
+    education_rank,
+    education_level_name,
+    estimate_experience_years,
+    extract_skills,
+    extract_emails,
+    extract_phones,
+    extract_fields,
+    normalize_skill,
+    skill_in_text,
+    resume_fields,
+    stored_fields,
+    build_field_query,
+)
+
+RESUME = """张三
+邮箱: ZhangSan@Example.com  电话: +86 138-1234-5678
+教育经历
+2015.09 - 2019.06 北京大学 计算机科学 本科
+2019.09-2021.06 清华大学 硕士
+工作经历
+2021.07 - 2023.06 某科技公司 后端工程师 Python, Django, MySQL
+2022.01 - 2023.12 开源项目维护 Vue.js、k8s
+"""
+
+def test_education_rank_takes_highest_level():
+    assert education_rank("本科毕业，后取得硕士学位") == 4
+    assert education_rank("Ph.D in Physics") == 5
+    assert education_rank("自学成才") == 0
+    assert education_rank(None) == 0
+    assert education_level_name(3) == "本科"
+    assert education_level_name(0) is None
+
+def test_experience_merges_overlapping_ranges_and_skips_education():
+    # 2021.07-2023.06与2022.01-2023.12重叠，合并为2021.07-2023.12共30个月
+    assert estimate_experience_years(RESUME) == 2.5
+
+def test_english_degrees_need_degree_context():
+    assert education_rank("Master's degree or above") == 4
+    assert education_rank("Masters of Science, MSc, M.S. in CS, MBA项目") == 4
+    assert education_rank("Bachelor") == 3
+    assert education_rank("B.Eng in Software") == 3
+    assert education_rank("Scrum Master") == 0
+    assert education_rank("mastered Python, merged to master branch") == 0
+    assert education_rank("Zhang Meng, MS Office") == 0
+
+def test_experience_keeps_work_lines_that_mention_degree_words():
+    text = "2015.03 - 2023.06 Acme公司 Scrum Master\n2020.01 - 2021.12 Acme公司 MBA项目组"
+    assert round(estimate_experience_years(text), 2) == 8.33
+
+def test_experience_uses_section_headings():
+    text = "\n".join([
+        "【教育背景】",
+        "2011.09 - 2015.06 某理工学校 计算机",
+        "工作经历：",
+        "2015.07 - 2018.06 Springfield High School 计算机教师",
+        "2018.07 - 2019.06 北京大学 实验室工程师",
+    ])
+    assert estimate_experience_years(text) == 4.0
+    # 没有段落标题时，包含院校名称的行视为教育经历
+    assert estimate_experience_years("2011.09 - 2015.06 北京大学\n2015.07 - 2016.06 某公司") == 1.0
+
+def test_experience_prefers_larger_explicit_years():
+    assert estimate_experience_years("5年以上工作经验\n2021.01-2021.12 某公司") == 5.0
+    assert estimate_experience_years("3+ years of backend experience") == 3.0
+    assert estimate_experience_years("2021.01-2022.12 某公司") == 2.0
+    assert estimate_experience_years("没有日期") is None
+
+def test_extract_skills_normalizes_aliases_in_order():
+    assert extract_skills("熟悉golang、K8S和vue.js，了解ES6") == ["Go", "Kubernetes", "Vue", "JavaScript"]
+    assert extract_skills("Java开发") == ["Java"]
+    assert extract_skills("JavaScript开发") == ["JavaScript"]
+    assert extract_skills("C++和C#") == ["C++", "C#"]
+
+def test_common_english_words_need_tech_context():
+    assert extract_skills("ready to go live with node and spring, git gud") == []
+    assert extract_skills("Go/Rust developer, Spring Boot, Git") == ["Go", "Rust", "Spring", "Git"]
+    assert extract_skills("熟悉go、node开发") == ["Go", "Node.js"]
+    assert extract_skills("skills: python, go, docker") == ["Python", "Go", "Docker"]
+    assert extract_skills("Let's go, python devs") == ["Python"]
+    assert extract_skills("node.js and spring boot") == ["Node.js", "Spring"]
+    assert not skill_in_text("Go", "ready to go live")
+    assert skill_in_text("go", "熟悉go开发")
+    assert normalize_skill("go") == "Go"
+
+def test_skill_matching_respects_word_boundaries():
+    assert skill_in_text("Java", "熟悉Java和Spring")
+    assert not skill_in_text("Java", "熟悉JavaScript")
+    assert not skill_in_text("  ", "任意文本")
+    assert normalize_skill(" k8s ") == "Kubernetes"
+    assert normalize_skill("Figma") == "Figma"
+
+def test_extract_contacts():
+    assert extract_emails("A@B.com, a@b.com; c.d@e.org.cn") == ["a@b.com", "c.d@e.org.cn"]
+    assert extract_phones("手机 +86 138-1234-5678 / 13812345678") == ["13812345678"]
+    assert extract_phones("Tel: +1 415 555 2671") == ["+14155552671"]
+    assert extract_phones("编号 2023123456789") == []
+
+def test_extract_fields():
+    fields = extract_fields(RESUME)
+    assert fields["education_rank"] == 4
+    assert fields["education_level"] == "硕士"
+    assert fields["experience_years"] == 2.5
+    assert fields["skills"] == ["Python", "Django", "MySQL", "Vue", "Kubernetes"]
+    assert fields["emails"] == ["zhangsan@example.com"]
+    assert fields["phones"] == ["13812345678"]
+
+def test_resume_and_stored_fields():
+    parsed = {"fields": {"education_rank": 3, "skills": ["Python"], "other": 1}}
+    assert resume_fields(parsed) == {"education_rank": 3, "skills": ["Python"]}
+    assert resume_fields({}) == {}
+    assert stored_fields({"_id": "r1", "skills": []}) == {"skills": []}
+    assert stored_fields({"_id": "r1"}) is None
+
+def test_build_field_query():
+    assert build_field_query() == {}
+    assert build_field_query(education="硕士及以上", min_experience_years=3, skills=["golang", "Python"]) == {
+        "education_rank": {"$gte": 4},
+        "experience_years": {"$gte": 3},
+        "skills": {"$all": ["Go", "Python"]},
+    }
+    # 无法识别的学历不作为条件
+    assert build_field_query(education="不限") == {}
@@ -0,0 +1,67 @@
+import io
+import codecs
+import pytest
+from app.services.parser.html_text import (
+    detect_encoding,
+    guess_encoding,
+    iter_decoded,
+    extract_html_text,
+    lxml_available,
+)
+
+HTML = """<html><head><meta charset="{charset}"><title>简历</title>
+<style>body {{ color: red; }}</style><script>var a = "<p>不是正文</p>";</script></head>
+<body><h1>张三</h1>
+<p>邮箱：  zhangsan@example.com</p>
+<table><tr><td>2015-2019</td><td>北京大学</td><td>计算机</td></tr></table>
+<div>熟悉Python<br/>熟悉Go</div>
+</body></html>"""
+
+EXPECTED = "简历\n张三\n邮箱： zhangsan@example.com\n2015-2019 北京大学 计算机\n熟悉Python\n熟悉Go"
+
+def test_detect_encoding_from_bom():
+    assert detect_encoding(codecs.BOM_UTF8 + b"<html>") == "utf-8-sig"
+    assert detect_encoding(codecs.BOM_UTF16_LE + "<html>".encode("utf-16-le")) == "utf-16"
+    assert detect_encoding(codecs.BOM_UTF32_LE + "<html>".encode("utf-32-le")) == "utf-32"
+
+def test_detect_encoding_from_meta_charset():
+    assert detect_encoding(b'<meta charset="UTF-8">') == "utf-8"
+    assert detect_encoding(b'<meta http-equiv="Content-Type" content="text/html; charset=gb2312">') == "gb18030"
+    assert detect_encoding(b"<meta charset='GBK' />") == "gb18030"
+    assert detect_encoding(b'<meta charset="no-such-charset">') is None
+    assert detect_encoding(b"<html><body>") is None
+    # 只在文件开头查找声明
+    assert detect_encoding(b" " * 5000 + b'<meta charset="gbk">') is None
+
+def test_guess_encoding():
+    assert guess_encoding("中文简历".encode("utf-8")) == "utf-8"
+    assert guess_encoding("中文简历".encode("gbk")) == "gb18030"
+    # 末尾被截断的多字节字符不影响判断
+    data = ("中文简历" * 20000).encode("utf-8")
+    assert [guess_encoding(data[:size]) for size in (65534, 65535, 65536)] == ["utf-8"] * 3
+
+def test_iter_decoded_keeps_characters_split_across_chunks():
+    # 第一块包含<meta charset>，之后每块的边界都落在双字节字符中间
+    data = b'<meta charset="gbk">' + "张三，北京大学".encode("gbk")
+    chunks = list(iter_decoded(io.BytesIO(data), chunk_size=21))
+    assert len(chunks) > 1
+    assert "".join(chunks) == '<meta charset="gbk">张三，北京大学'
+
+def test_iter_decoded_with_explicit_encoding():
+    data = "张三".encode("utf-16-le")
+    assert "".join(iter_decoded(io.BytesIO(data), encoding="utf-16-le")) == "张三"
+
+@pytest.mark.parametrize("charset", ["utf-8", "gbk"])
+def test_extract_html_text_with_stdlib_parser(charset):
+    data = HTML.format(charset=charset).encode(charset)
+    assert extract_html_text(io.BytesIO(data), use_lxml=False) == EXPECTED
+
+@pytest.mark.skipif(not lxml_available(), reason="未安装lxml")
+@pytest.mark.parametrize("charset", ["utf-8", "gbk"])
+def test_extract_html_text_with_lxml(charset):
+    data = HTML.format(charset=charset).encode(charset)
+    assert extract_html_text(io.BytesIO(data), use_lxml=True) == EXPECTED
+
+def test_extract_html_text_without_declared_charset():
+    data = "<p>工作经历</p><p>某公司</p>".encode("gbk")
+    assert extract_html_text(io.BytesIO(data), use_lxml=False) == "工作经历\n某公司"
@@ -0,0 +1,110 @@
+import asyncio
+import pytest
+import fakeredis
+from mongomock_motor import AsyncMongoMockClient
+import app.core.metrics as metrics
+import app.services.analyzer.idempotency as idempotency
+from app.services.analyzer.idempotency import AnalysisDeduplicator, analysis_idempotency_key
+
+@pytest.fixture
+def redis(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(idempotency, "get_sync_redis", lambda: client)
+    monkeypatch.setattr(metrics, "get_sync_redis", lambda: client)
+    return client
+
+@pytest.fixture
+def deduplicator(redis):
+    return AnalysisDeduplicator(claim_ttl=60)
+
+@pytest.fixture
+def db():
+    return AsyncMongoMockClient()["test"]
+
+def run(coro):
+    return asyncio.run(coro)
+
+def analysis(analysis_id, score=80, failed=False):
+    return {"_id": analysis_id, "resume_id": "r1", "result": {"score": score, "failed": failed}}
+
+def test_key_uses_requirement_id_version_and_content():
+    requirements = {"id": "req1", "version": 3, "title": "后端"}
+    key = analysis_idempotency_key("r1", requirements)
+    assert key.startswith("r1:req1:v3:")
+    assert analysis_idempotency_key("r1", {"id": "req1", "title": "后端"}).startswith("r1:req1:v1:")
+    assert analysis_idempotency_key("r2", requirements) != key
+    assert analysis_idempotency_key("r1", {**requirements, "version": 4}) != key
+    # 带着已有id提交修改过的要求内容时不复用旧结果
+    assert analysis_idempotency_key("r1", {**requirements, "title": "前端"}) != key
+
+def test_key_ignores_missing_optional_fields():
+    # 批量筛选保存的要求中description为None，接口请求中可能没有该字段
+    assert analysis_idempotency_key("r1", {"id": "req1", "title": "后端", "description": None}) == \
+        analysis_idempotency_key("r1", {"id": "req1", "title": "后端"})
+
+def test_key_hashes_content_without_requirement_id():
+    first = analysis_idempotency_key("r1", {"title": "后端", "skills": ["Python"], "years": 3})
+    reordered = analysis_idempotency_key("r1", {"years": 3, "skills": ["Python"], "title": "后端"})
+    changed = analysis_idempotency_key("r1", {"title": "后端", "skills": ["Python"], "years": 5})
+    assert first.startswith("r1:sha256:")
+    assert first == reordered
+    assert first != changed
+
+def test_claim_returns_existing_owner_until_released(deduplicator):
+    assert deduplicator.claim("k", "p1") is None
+    assert deduplicator.claim("k", "p2") == "p1"
+    assert deduplicator.owner("k") == "p1"
+
+    # 只释放自己持有的认领
+    deduplicator.release("k", "p2")
+    assert deduplicator.owner("k") == "p1"
+    deduplicator.release("k", "p1")
+    assert deduplicator.owner("k") is None
+    assert deduplicator.claim("k", "p2") is None
+
+def test_claim_expires(deduplicator, redis):
+    deduplicator.claim("k", "p1")
+    assert 0 < redis.ttl("analysis_claim:k") <= 60
+
+def test_save_keeps_first_result(deduplicator, db):
+    assert run(deduplicator.save(db, "k", analysis("a1", score=80))) == ("a1", True)
+    assert run(deduplicator.save(db, "k", analysis("a2", score=60))) == ("a1", False)
+    existing = run(deduplicator.find_existing(db, "k"))
+    assert existing["result"]["score"] == 80
+    assert run(db["analyses"].count_documents({})) == 1
+
+def test_failed_results_are_not_reused(deduplicator, db):
+    assert run(deduplicator.save(db, "k", analysis("a1", score=0, failed=True))) == ("a1", True)
+    assert run(deduplicator.find_existing(db, "k")) is None
+
+    # 重试成功的结果按幂等键保存，出错的结果仍保留为历史记录
+    assert run(deduplicator.save(db, "k", analysis("a2"))) == ("a2", True)
+    assert run(deduplicator.find_existing(db, "k"))["_id"] == "a2"
+    assert run(db["analyses"].count_documents({})) == 2
+
+def test_wait_for_result_returns_saved_result(deduplicator, db):
+    deduplicator.claim("k", "p1")
+
+    async def scenario():
+        waiting = asyncio.ensure_future(deduplicator.wait_for_result(db, "k", timeout=5, poll_interval=0.01))
+        await asyncio.sleep(0.05)
+        await deduplicator.save(db, "k", analysis("a1"))
+        return await waiting
+
+    assert run(scenario())["_id"] == "a1"
+
+def test_wait_for_result_stops_when_owner_gives_up(deduplicator, db):
+    deduplicator.claim("k", "p1")
+
+    async def scenario():
+        waiting = asyncio.ensure_future(deduplicator.wait_for_result(db, "k", timeout=5, poll_interval=0.01))
+        await asyncio.sleep(0.05)
+        await deduplicator.save(db, "k", analysis("a1", score=0, failed=True))
+        deduplicator.release("k", "p1")
+        return await waiting
+
+    assert run(scenario()) is None
+
+def test_wait_for_result_times_out(deduplicator, db):
+    deduplicator.claim("k", "p1")
+    assert run(deduplicator.wait_for_result(db, "k", timeout=0.05, poll_interval=0.01)) is None
@@ -0,0 +1,67 @@
+from typing import List
+import pytest
+from pydantic import BaseModel
+from app.services.analyzer.output_parser import IncrementalJSONParser, OutputParseError, loads_lenient, parse_model
+
+class Item(BaseModel):
+    name: str
+    tags: List[str] = []
+
+def test_plain_json_surrounded_by_prose():
+    text = '好的，分析结果如下：\n```json\n{"score": 80, "ok": true}\n```\n以上。'
+    assert loads_lenient(text) == {"score": 80, "ok": True}
+
+@pytest.mark.parametrize("text, expected", [
+    ("{'name': 'a', 'tags': ['x',],}", {"name": "a", "tags": ["x"]}),
+    ('{"ok": True, "value": None}', {"ok": True, "value": None}),
+    ('{"a": 1, // 说明\n "b": /* 注释 */ 2}', {"a": 1, "b": 2}),
+    ('{"summary": "第一行\n第二行"}', {"summary": "第一行\n第二行"}),
+    ("{'quote': 'say \"hi\"', 'it': 'it\\'s'}", {"quote": 'say "hi"', "it": "it's"}),
+    ('{"a": 1,, "b": 2}', {"a": 1, "b": 2}),
+])
+def test_common_llm_mistakes_are_repaired(text, expected):
+    assert loads_lenient(text) == expected
+
+def test_truncated_output_is_closed():
+    assert loads_lenient('{"name": "张三", "tags": ["Python", "Re') == {"name": "张三", "tags": ["Python", "Re"]}
+
+def test_text_after_top_level_value_is_ignored():
+    assert loads_lenient("{'a': 1} 另外 {'b': 2}") == {"a": 1}
+
+def test_missing_json_raises():
+    with pytest.raises(OutputParseError):
+        loads_lenient("无法完成分析")
+
+def test_incremental_feed_matches_single_pass():
+    text = "结果：{'name': 'a', // 注释\n 'tags': ['x', 'y'], 'ok': True}"
+    parser = IncrementalJSONParser()
+    for i in range(0, len(text), 3):
+        parser.feed(text[i:i + 3])
+    parser.feed("", final=True)
+
+    assert parser.done
+    assert parser.value() == {"name": "a", "tags": ["x", "y"], "ok": True}
+
+def test_complete_only_drops_partial_values():
+    parser = IncrementalJSONParser()
+    parser.feed('{"name": "a", "tags": ["x", "y')
+
+    assert parser.value() == {"name": "a", "tags": ["x", "y"]}
+    assert parser.value(complete_only=True) == {"name": "a", "tags": ["x"]}
+    assert parser.value(complete_only=True, top_level=True) == {"name": "a"}
+
+def test_partial_literal_waits_for_next_chunk():
+    parser = IncrementalJSONParser()
+    parser.feed('{"ok": Tr')
+    parser.feed('ue}')
+
+    assert parser.value() == {"ok": True}
+
+def test_value_before_json_starts_raises():
+    parser = IncrementalJSONParser()
+    parser.feed("正在分析")
+    with pytest.raises(OutputParseError):
+        parser.value()
+
+def test_parse_model_validates():
+    assert parse_model("输出：{'name': 'a', 'tags': ['x']}", Item) == Item(name="a", tags=["x"])
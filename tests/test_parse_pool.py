@@ -0,0 +1,66 @@
+import time
+import asyncio
+import pytest
+from app.services.parser.parse_pool import ParsePool, ParsePoolBusyError
+
+def _echo(value):
+    return value
+
+def _sleep(seconds):
+    time.sleep(seconds)
+    return seconds
+
+def _fail():
+    raise ValueError("解析失败")
+
+def run(coro):
+    return asyncio.run(coro)
+
+@pytest.fixture
+def pool():
+    pool = ParsePool(max_workers=2, max_queue=1, timeout=3.0)
+    # 预先启动子进程，计时不包含spawn启动的时间
+    asyncio.run(pool.run(_echo, None))
+    yield pool
+    pool.shutdown()
+
+def test_runs_function_in_child_process(pool):
+    assert run(pool.run(_echo, "ok")) == "ok"
+    assert pool.in_flight == 0
+
+def test_exceptions_propagate(pool):
+    with pytest.raises(ValueError):
+        run(pool.run(_fail))
+    assert pool.in_flight == 0
+
+def test_rejects_when_queue_is_full(pool):
+    async def scenario():
+        running = [asyncio.ensure_future(pool.run(_sleep, 0.3)) for _ in range(3)]
+        await asyncio.sleep(0)
+        with pytest.raises(ParsePoolBusyError):
+            await pool.run(_echo, "extra")
+        return await asyncio.gather(*running)
+
+    assert run(scenario()) == [0.3, 0.3, 0.3]
+
+def test_timeout_kills_hung_parse_and_pool_recovers(pool):
+    async def scenario():
+        # 卡住的解析和同时在执行的解析：前者超时，后者在重建的进程池中重新执行
+        hung = asyncio.ensure_future(pool.run(_sleep, 30))
+        await asyncio.sleep(2.2)
+        slow = asyncio.ensure_future(pool.run(_sleep, 1.0))
+        results = await asyncio.gather(hung, slow, return_exceptions=True)
+        return results, pool.in_flight, await pool.run(_echo, "after")
+
+    started = time.monotonic()
+    (hung, slow), in_flight, after = run(scenario())
+
+    assert isinstance(hung, asyncio.TimeoutError)
+    assert slow == 1.0
+    assert in_flight == 0
+    assert after == "after"
+    assert time.monotonic() - started < 15
+
+def test_thread_mode_when_disabled():
+    pool = ParsePool(enabled=False, timeout=1.0)
+    assert run(pool.run(_echo, "thread")) == "thread"
@@ -0,0 +1,62 @@
+import asyncio
+import pytest
+from app.services.analyzer.prefilter import ResumePreFilter
+
+REQUIREMENTS = {
+    "job_title": "后端开发工程师",
+    "experience_years": 3,
+    "education": "本科及以上",
+    "skills": [{"name": "Python"}, {"name": "Redis"}],
+}
+
+@pytest.fixture
+def prefilter():
+    return ResumePreFilter(threshold=30.0)
+
+def test_matching_resume_scores_full_marks(prefilter):
+    resume = "张三\n本科 计算机科学\n2018.07 - 2023.06 某公司 后端开发\n熟悉 Python、Redis"
+    outcome = prefilter.score(resume, REQUIREMENTS)
+
+    assert outcome.passed
+    assert outcome.score == 100.0
+    assert outcome.skills_match == {"Python": True, "Redis": True}
+    assert outcome.education_match is True
+    assert outcome.experience_match is True
+
+def test_unqualified_resume_is_rejected(prefilter):
+    resume = "李四\n高中\n2023.01 - 2023.06 实习\n熟悉 Excel"
+    outcome = prefilter.score(resume, REQUIREMENTS)
+
+    assert not outcome.passed
+    assert outcome.missing_skills == ["Python", "Redis"]
+    assert outcome.education_match is False
+
+def test_unknown_education_and_experience_get_neutral_score(prefilter):
+    outcome = prefilter.score("熟悉 Python 和 Redis", REQUIREMENTS)
+
+    assert outcome.education_match is None
+    assert outcome.experience_match is None
+    # 技能满分，学历和年限各按一半计分
+    assert outcome.score == pytest.approx(100 * (0.6 + 0.2 * 0.5 + 0.2 * 0.5))
+
+def test_skill_match_respects_word_boundaries(prefilter):
+    requirements = {"skills": [{"name": "Java"}]}
+    assert prefilter.score("精通 JavaScript", requirements).skills_match == {"Java": False}
+    assert prefilter.score("精通 Java, Spring", requirements).skills_match == {"Java": True}
+
+def test_stored_fields_are_used_instead_of_scanning_text(prefilter):
+    fields = {"education_rank": 4, "experience_years": 5.0, "skills": ["Python", "Redis"]}
+    outcome = prefilter.score("", REQUIREMENTS, fields)
+
+    assert outcome.score == 100.0
+    assert outcome.experience_years == 5.0
+
+def test_partial_experience_is_scored_proportionally(prefilter):
+    fields = {"education_rank": 3, "experience_years": 1.5, "skills": ["Python", "Redis"]}
+    outcome = prefilter.score("", REQUIREMENTS, fields)
+
+    assert outcome.experience_match is False
+    assert outcome.score == pytest.approx(100 * (0.6 + 0.2 + 0.2 * 0.5))
+
+def test_disabled_prefilter_returns_none():
+    assert asyncio.run(ResumePreFilter(enabled=False).evaluate("任意内容", REQUIREMENTS)) is None
@@ -0,0 +1,138 @@
+import json
+import asyncio
+import pytest
+import app.core.metrics as metrics
+from app.services.analyzer.analysis_cache import AnalysisCache
+from app.services.analyzer.resume_analyzer import ResumeAnalyzer
+from app.services.analyzer.resume_compactor import ResumeCompactor
+from app.services.analyzer.rate_limiter import LLMUnavailableError
+
+MODEL = "test-model"
+REQUIREMENTS = {"job_title": "后端工程师", "skills": ["Python"]}
+
+def result_json(score=80, ref=None):
+    result = {
+        "matches_requirements": True,
+        "match_score": score,
+        "reasoning": "符合要求",
+        "skills_match": {"Python": True},
+        "experience_match": True,
+        "education_match": True,
+        "strengths": [],
+        "weaknesses": [],
+        "summary": "合适",
+    }
+    if ref:
+        result["resume_ref"] = ref
+    return result
+
+class StubCache:
+    """内存中的分析结果缓存"""
+
+    build_key = staticmethod(AnalysisCache.build_key)
+
+    def __init__(self):
+        self.values = {}
+
+    async def get(self, key):
+        return self.values.get(key)
+
+    async def set(self, key, value):
+        self.values[key] = value
+
+class NoPreFilter:
+    async def evaluate(self, resume_content, requirements, fields=None):
+        return None
+
+class StubLLM:
+    """按顺序返回预设应答的_invoke_llm"""
+
+    def __init__(self, *responses):
+        self.responses = list(responses)
+        self.calls = []
+
+    async def __call__(self, prompt_template, prompt_input, estimated_tokens, progress_callback=None):
+        self.calls.append(prompt_template)
+        response = self.responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+@pytest.fixture(autouse=True)
+def no_redis(monkeypatch):
+    def unavailable():
+        raise ConnectionError("测试中不连接Redis")
+
+    monkeypatch.setattr(metrics, "get_redis", unavailable)
+    monkeypatch.setattr(metrics, "get_sync_redis", unavailable)
+
+@pytest.fixture
+def analyzer():
+    compactor = ResumeCompactor(default_budget=2000)
+    # 不加载tiktoken编码，按字符数估算token
+    compactor._encodings[MODEL] = None
+    analyzer = ResumeAnalyzer(
+        api_key="test",
+        model_name=MODEL,
+        provider="openai",
+        cache=StubCache(),
+        prefilter=NoPreFilter(),
+        compactor=compactor,
+        batch_max_resumes=4,
+        batch_token_budget=2000,
+        batch_short_resume_tokens=500,
+        failover_enabled=True
+    )
+    # 提示模板由langchain创建，测试中用名称代替
+    analyzer.__dict__["prompt_template"] = "single"
+    analyzer.__dict__["batch_prompt_template"] = "batch"
+    return analyzer
+
+def run(coro):
+    return asyncio.run(coro)
+
+def test_primary_provider_result_is_cached(analyzer):
+    analyzer._invoke_llm = StubLLM((json.dumps(result_json()), "openai"))
+    result = run(analyzer.analyze_resume("张三 Python工程师", REQUIREMENTS))
+    assert result.match_score == 80
+    assert len(analyzer.cache.values) == 1
+
+    # 再次分析命中缓存，不调用LLM
+    assert run(analyzer.analyze_resume("张三 Python工程师", REQUIREMENTS)).match_score == 80
+
+def test_failover_result_is_not_cached(analyzer):
+    analyzer._invoke_llm = StubLLM((json.dumps(result_json()), "zhipuai"))
+    result = run(analyzer.analyze_resume("张三 Python工程师", REQUIREMENTS))
+    assert result.match_score == 80
+    assert analyzer.cache.values == {}
+
+def test_packed_results_are_cached_only_for_primary_provider(analyzer):
+    resumes = [{"id": "r1", "content": "张三 Python"}, {"id": "r2", "content": "李四 Python"}]
+    batch = json.dumps([result_json(70, "R1"), result_json(90, "R2")])
+
+    analyzer._invoke_llm = StubLLM((batch, "zhipuai"))
+    results = run(analyzer.analyze_resumes_batch(resumes, REQUIREMENTS))
+    assert {resume_id: result.match_score for resume_id, result in results.items()} == {"r1": 70, "r2": 90}
+    assert analyzer.cache.values == {}
+
+    analyzer._invoke_llm = StubLLM((batch, "openai"))
+    run(analyzer.analyze_resumes_batch(resumes, REQUIREMENTS))
+    assert len(analyzer.cache.values) == 2
+
+def test_packed_call_failure_falls_back_to_single_calls(analyzer):
+    resumes = [{"id": "r1", "content": "张三 Python"}, {"id": "r2", "content": "李四 Python"}]
+    analyzer._invoke_llm = StubLLM(
+        ("不是JSON", "openai"),
+        (json.dumps(result_json(60)), "openai"),
+        (json.dumps(result_json(65)), "openai"),
+    )
+    results = run(analyzer.analyze_resumes_batch(resumes, REQUIREMENTS))
+    assert analyzer._invoke_llm.calls == ["batch", "single", "single"]
+    assert {resume_id: result.match_score for resume_id, result in results.items()} == {"r1": 60, "r2": 65}
+
+def test_unavailable_provider_is_not_retried_per_resume(analyzer):
+    resumes = [{"id": "r1", "content": "张三 Python"}, {"id": "r2", "content": "李四 Python"}]
+    analyzer._invoke_llm = StubLLM(LLMUnavailableError("调用额度已用尽"))
+    with pytest.raises(LLMUnavailableError):
+        run(analyzer.analyze_resumes_batch(resumes, REQUIREMENTS))
+    assert analyzer._invoke_llm.calls == ["batch"]
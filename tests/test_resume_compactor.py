@@ -0,0 +1,65 @@
+import pytest
+from app.services.analyzer.resume_compactor import ResumeCompactor, TRUNCATION_MARKER, APPROX_CHARS_PER_TOKEN
+
+MODEL = "test-model"
+
+@pytest.fixture
+def compactor():
+    compactor = ResumeCompactor(default_budget=1000, budgets={"openai/gpt-4": 200, "glm-4": 300, "zhipuai": 400})
+    # 不加载tiktoken编码，按字符数估算token，测试结果与网络和编码版本无关
+    compactor._encodings[MODEL] = None
+    return compactor
+
+def test_budget_lookup_order(compactor):
+    assert compactor.budget_for("openai", "gpt-4") == 200
+    assert compactor.budget_for("zhipuai", "glm-4") == 300
+    assert compactor.budget_for("zhipuai", "glm-3") == 400
+    assert compactor.budget_for("other", "model") == 1000
+
+def test_whitespace_and_page_markers_are_removed(compactor):
+    text = "张三   后端开发\n\n\n\n第 1 页\n工作经历\n2019 - 2023   某公司\n2 / 3\n"
+    result = compactor.compact(text, "openai", MODEL)
+
+    assert result.content == "张三 后端开发\n\n工作经历\n2019 - 2023 某公司"
+    assert not result.truncated
+
+def test_repeated_headers_are_kept_once(compactor):
+    page = "张三的简历 | 机密\n{}\n"
+    text = "".join(page.format(f"第{i}段经历") for i in range(3))
+    result = compactor.compact(text, "openai", MODEL)
+
+    assert result.content.count("张三的简历 | 机密") == 1
+    assert "第2段经历" in result.content
+
+def test_low_value_sections_and_contact_lines_are_dropped(compactor):
+    text = "\n".join([
+        "电话：13800138000",
+        "zhangsan@example.com",
+        "专业技能",
+        "Python, Redis",
+        "兴趣爱好",
+        "篮球、旅行",
+        "自我评价",
+        "认真负责",
+    ])
+    result = compactor.compact(text, "openai", MODEL)
+
+    assert result.content == "专业技能\nPython, Redis\n自我评价\n认真负责"
+
+def test_content_over_budget_is_truncated_with_marker(compactor):
+    compactor.default_budget = 50
+    text = "\n".join(f"项目经历第{i}条：负责后端服务开发" for i in range(50))
+    result = compactor.compact(text, "other", MODEL)
+
+    assert result.truncated
+    assert result.content.endswith(TRUNCATION_MARKER)
+    assert len(result.content) <= 50 * APPROX_CHARS_PER_TOKEN + len(TRUNCATION_MARKER)
+    assert result.compacted_tokens < result.original_tokens
+
+def test_disabled_compactor_returns_text_unchanged(compactor):
+    compactor.enabled = False
+    text = "电话：13800138000\n\n\n第 1 页"
+    result = compactor.compact(text, "openai", MODEL)
+
+    assert result.content == text
+    assert result.tokens_saved == 0
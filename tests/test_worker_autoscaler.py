@@ -0,0 +1,148 @@
+import time
+import signal
+import pytest
+import fakeredis
+import app.core.worker_autoscaler as worker_autoscaler
+from app.core.worker_autoscaler import InflightTracker, StagePool, WorkerAutoscaler
+
+class FakePopen:
+    """不启动真实进程的Popen"""
+
+    next_pid = 1000
+
+    def __init__(self, command):
+        FakePopen.next_pid += 1
+        self.pid = FakePopen.next_pid
+        self.command = command
+        self.signals = []
+        self.returncode = None
+
+    def poll(self):
+        return self.returncode
+
+    def send_signal(self, signum):
+        self.signals.append(signum)
+
+    def kill(self):
+        self.returncode = -9
+
+    def wait(self, timeout=None):
+        return self.returncode
+
+@pytest.fixture(autouse=True)
+def fake_popen(monkeypatch):
+    monkeypatch.setattr(worker_autoscaler.subprocess, "Popen", FakePopen)
+
+@pytest.fixture
+def pool():
+    return StagePool("llm", ["llm"], concurrency=4, min_processes=1, max_processes=5)
+
+@pytest.fixture
+def autoscaler(pool):
+    autoscaler = WorkerAutoscaler(
+        [pool],
+        command_factory=lambda pool, index: ["celery", "worker", "-n", f"{pool.stage}-{index}"],
+        scale_down_delay=60,
+        scale_down_ratio=0.5,
+        tracker=InflightTracker()
+    )
+    autoscaler.load = 0
+    autoscaler.demand = lambda pool: {"queued": autoscaler.load, "inflight": 0}
+    return autoscaler
+
+def scale(autoscaler, pool, load, now):
+    autoscaler.load = load
+    autoscaler.scale(pool, now=now)
+    return len(pool.active)
+
+def test_desired_is_clamped_to_pool_limits(pool):
+    assert pool.desired(0) == 1
+    assert pool.desired(4) == 1
+    assert pool.desired(5) == 2
+    assert pool.desired(100) == 5
+
+def test_pool_limits_are_normalized():
+    pool = StagePool("parse", ["parse"], concurrency=0, min_processes=3, max_processes=2)
+    assert (pool.concurrency, pool.min_processes, pool.max_processes) == (1, 3, 3)
+    assert pool.desired(0) == 3
+
+def test_scales_up_immediately(autoscaler, pool):
+    assert scale(autoscaler, pool, 9, now=100) == 3
+    assert [worker.process.command[-1] for worker in pool.workers] == ["llm-0", "llm-1", "llm-2"]
+    assert scale(autoscaler, pool, 50, now=101) == 5
+
+def test_scale_down_waits_for_sustained_low_load(autoscaler, pool):
+    scale(autoscaler, pool, 12, now=100)
+
+    # 需求低于当前容量但高于缩容阈值（2个进程×4并发×0.5）：不缩容
+    assert scale(autoscaler, pool, 7, now=200) == 3
+    assert pool.low_since is None
+
+    assert scale(autoscaler, pool, 4, now=300) == 3
+    assert scale(autoscaler, pool, 4, now=330) == 3
+    # 负载回升打断计时
+    assert scale(autoscaler, pool, 5, now=340) == 3
+    assert scale(autoscaler, pool, 4, now=350) == 3
+    assert scale(autoscaler, pool, 4, now=409) == 3
+    assert scale(autoscaler, pool, 4, now=410) == 2
+
+    drained = [worker for worker in pool.workers if worker.draining_since is not None]
+    assert [worker.index for worker in drained] == [2]
+    assert drained[0].process.signals == [signal.SIGTERM]
+
+def test_scale_down_one_process_at_a_time_and_keeps_minimum(autoscaler, pool):
+    scale(autoscaler, pool, 12, now=100)
+    scale(autoscaler, pool, 0, now=200)
+    assert scale(autoscaler, pool, 0, now=260) == 2
+    assert scale(autoscaler, pool, 0, now=300) == 2
+    assert scale(autoscaler, pool, 0, now=320) == 1
+    assert scale(autoscaler, pool, 0, now=1000) == 1
+    assert pool.low_since is None
+
+def test_draining_workers_are_replaced_when_load_returns(autoscaler, pool):
+    scale(autoscaler, pool, 8, now=100)
+    scale(autoscaler, pool, 0, now=200)
+    assert scale(autoscaler, pool, 0, now=260) == 1
+    assert scale(autoscaler, pool, 8, now=270) == 2
+    assert len(pool.workers) == 3
+
+def test_reap_removes_exited_workers(autoscaler, pool):
+    scale(autoscaler, pool, 12, now=100)
+    first, second, third = pool.workers
+    second.process.returncode = 1
+    third.drain()
+    third.process.returncode = 0
+    autoscaler._reap(pool)
+    assert pool.workers == [first]
+    # 意外退出的进程由下一次scale补齐
+    assert scale(autoscaler, pool, 12, now=110) == 3
+
+def test_reap_kills_workers_that_drain_too_long(autoscaler, pool):
+    scale(autoscaler, pool, 4, now=100)
+    worker = pool.workers[0]
+    worker.drain()
+    worker.draining_since = time.time() - autoscaler.drain_timeout - 1
+    autoscaler._reap(pool)
+    assert worker.process.returncode == -9
+
+def test_queue_length_counts_all_priorities():
+    autoscaler = WorkerAutoscaler([], command_factory=lambda pool, index: [])
+    autoscaler._broker = fakeredis.FakeRedis()
+    autoscaler.broker.rpush("llm", "m1", "m2")
+    autoscaler.broker.rpush("llm:3", "m3")
+    autoscaler.broker.rpush("llm:9", "m4")
+    autoscaler.broker.rpush("parse", "m5")
+    assert autoscaler.queue_length("llm") == 4
+
+def test_inflight_tracker_ignores_stale_entries(monkeypatch):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    monkeypatch.setattr(worker_autoscaler, "get_sync_redis", lambda: client)
+    tracker = InflightTracker(max_age=60)
+    tracker.started("llm", "t1")
+    tracker.started("llm", "t2")
+    tracker.started(None, "t3")
+    client.zadd("autoscale:inflight:llm", {"stale": time.time() - 120})
+    assert tracker.count("llm") == 2
+    tracker.finished("llm", "t1")
+    assert tracker.count("llm") == 1
+    assert client.zrange("autoscale:inflight:llm", 0, -1) == ["t2"]
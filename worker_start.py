@@ -2,9 +2,17 @@ import subprocess
 import os
 import sys
 import argparse
+from app.core.config import settings
 
-def start_worker(queue_name=None, concurrency=2, loglevel="INFO"):
-    """启动Celery worker"""
+# 分析流水线的阶段及其监听的队列，llm阶段同时处理升级前提交到resume_analysis队列的任务
+STAGE_QUEUES = {
+    "parse": "parse",
+    "llm": "llm,resume_analysis",
+    "notify": "notify",
+}
+
+def worker_command(queue_name=None, concurrency=2, loglevel="INFO", pool=None, hostname=None):
+    """构造Celery worker启动命令"""
     command = [
         "celery", 
         "-A", 
@@ -16,14 +24,91 @@ def start_worker(queue_name=None, concurrency=2, loglevel="INFO"):
         loglevel
     ]
     
+    # 分析任务以I/O等待为主，默认使用threads池，由进程内的常驻事件循环并发执行
+    if pool:
+        command.extend(["--pool", pool])
+    
     # 如果指定了队列名称
     if queue_name:
         command.extend(["-Q", queue_name])
     
+    # 同一台主机上启动多个worker时需要不同的节点名
+    if hostname:
+        command.extend(["-n", hostname])
+    
+    return command
+
+def start_worker(queue_name=None, concurrency=2, loglevel="INFO", pool=None):
+    """启动Celery worker"""
+    command = worker_command(queue_name, concurrency, loglevel, pool)
+    
     # 执行命令启动worker
     print(f"启动Celery worker: {' '.join(command)}")
     subprocess.run(command)
 
+def start_stage_workers(stage_concurrency, loglevel="INFO", pool=None):
+    """
+    为分析流水线的每个阶段启动一个独立的Celery worker，各阶段的并发数分别设置
+    
+    Args:
+        stage_concurrency: 阶段名到并发数的映射
+        loglevel: 日志级别
+        pool: 执行池类型
+    """
+    processes = []
+    for stage, concurrency in stage_concurrency.items():
+        command = worker_command(STAGE_QUEUES[stage], concurrency, loglevel, pool, hostname=f"{stage}@%h")
+        print(f"启动 {stage} 阶段Worker: {' '.join(command)}")
+        processes.append(subprocess.Popen(command))
+    
+    try:
+        for process in processes:
+            process.wait()
+    except KeyboardInterrupt:
+        # Celery收到SIGTERM后会等待正在执行的任务完成再退出
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait()
+
+def start_autoscaler(stage_concurrency, loglevel="INFO", pool=None):
+    """
+    启动按队列长度自动扩缩容的Supervisor，每个阶段的Worker进程数在配置的上下限之间调整
+    
+    Args:
+        stage_concurrency: 阶段名到每个进程并发数的映射
+        loglevel: 日志级别
+        pool: 执行池类型
+    """
+    from app.core.logging_config import setup_logging
+    from app.core.worker_autoscaler import StagePool, WorkerAutoscaler
+    
+    setup_logging()
+    pools = [
+        StagePool(
+            stage,
+            STAGE_QUEUES[stage].split(","),
+            concurrency,
+            min_processes=settings.AUTOSCALE_MIN_PROCESSES.get(stage, 1),
+            max_processes=settings.AUTOSCALE_MAX_PROCESSES.get(stage, 1)
+        )
+        for stage, concurrency in stage_concurrency.items()
+    ]
+    
+    def command_factory(stage_pool, index):
+        return worker_command(
+            ",".join(stage_pool.queues), stage_pool.concurrency, loglevel, pool, hostname=f"{stage_pool.stage}{index}@%h"
+        )
+    
+    WorkerAutoscaler(
+        pools,
+        command_factory,
+        interval=settings.AUTOSCALE_INTERVAL,
+        scale_down_delay=settings.AUTOSCALE_SCALE_DOWN_DELAY,
+        scale_down_ratio=settings.AUTOSCALE_SCALE_DOWN_RATIO,
+        drain_timeout=settings.WORKER_TASK_TIMEOUT + 60
+    ).run()
+
 def start_flower(port=5555, loglevel="INFO"):
     """启动Flower监控"""
     command = [
@@ -47,15 +132,56 @@ if __name__ == "__main__":
     parser.add_argument(
         "--queue", 
         type=str, 
-        default="resume_analysis",
-        help="指定要监听的队列名称"
+        default="parse,llm,notify,resume_analysis",
+        help="指定要监听的队列名称（多个队列用逗号分隔）"
+    )
+    
+    parser.add_argument(
+        "--stages", 
+        nargs="+",
+        choices=list(STAGE_QUEUES),
+        help="按分析流水线阶段启动独立的Worker（每个阶段一个进程，并发数分别设置），指定时忽略--queue和--concurrency"
+    )
+    
+    parser.add_argument(
+        "--autoscale", 
+        action="store_true",
+        help="按队列长度自动调整各阶段的Worker进程数（范围见AUTOSCALE_MIN_PROCESSES/AUTOSCALE_MAX_PROCESSES），未指定--stages时管理全部阶段"
+    )
+    
+    parser.add_argument(
+        "--parse-concurrency", 
+        type=int, 
+        default=settings.WORKER_PARSE_CONCURRENCY,
+        help="parse阶段Worker的并发数"
+    )
+    
+    parser.add_argument(
+        "--llm-concurrency", 
+        type=int, 
+        default=settings.WORKER_LLM_CONCURRENCY,
+        help="llm阶段Worker的并发数"
+    )
+    
+    parser.add_argument(
+        "--notify-concurrency", 
+        type=int, 
+        default=settings.WORKER_NOTIFY_CONCURRENCY,
+        help="notify阶段Worker的并发数"
     )
     
     parser.add_argument(
         "--concurrency", 
         type=int, 
-        default=2,
-        help="Worker并发数量"
+        default=settings.WORKER_MAX_INFLIGHT,
+        help="Worker并发数量（threads池下为同时执行的任务数）"
+    )
+    
+    parser.add_argument(
+        "--pool", 
+        type=str, 
+        default=settings.WORKER_POOL,
+        help="Worker执行池类型 (threads, prefork, solo)"
     )
     
     parser.add_argument(
@@ -83,6 +209,15 @@ if __name__ == "__main__":
     if args.flower:
         print("启动Flower监控...")
         start_flower(port=args.flower_port, loglevel=args.loglevel)
+    elif args.autoscale:
+        stages = args.stages or list(STAGE_QUEUES)
+        stage_concurrency = {stage: getattr(args, f"{stage}_concurrency") for stage in stages}
+        print(f"启动Worker自动扩缩容，执行池: {args.pool}，每个进程的并发: {stage_concurrency}...")
+        start_autoscaler(stage_concurrency, loglevel=args.loglevel, pool=args.pool)
+    elif args.stages:
+        stage_concurrency = {stage: getattr(args, f"{stage}_concurrency") for stage in args.stages}
+        print(f"按阶段启动Celery worker，执行池: {args.pool}，并发: {stage_concurrency}...")
+        start_stage_workers(stage_concurrency, loglevel=args.loglevel, pool=args.pool)
     else:
-        print(f"启动Celery worker，队列: {args.queue}，并发: {args.concurrency}...")
-        start_worker(queue_name=args.queue, concurrency=args.concurrency, loglevel=args.loglevel) 
\ No newline at end of file
+        print(f"启动Celery worker，队列: {args.queue}，执行池: {args.pool}，并发: {args.concurrency}...")
+        start_worker(queue_name=args.queue, concurrency=args.concurrency, loglevel=args.loglevel, pool=args.pool) 
\ No newline at end of file